@@ -29,6 +29,9 @@ from ovos_config.config import Configuration
 from neon_utils.log_utils import init_log
 from ovos_utils.log import LOG
 
+from chatbot_core.utils.options import OptionsSnapshot
+from chatbot_core.utils.similarity import PromptSimilarityCache
+
 
 class ChatBotABC(ABC):
     """Abstract class gathering all the chatbot-related methods children should implement"""
@@ -44,6 +47,13 @@ class ChatBotABC(ABC):
                                                         {}).get(bot_id) or {}
         self.shout_queue = Queue(maxsize=256)
         self.__log = None
+        # Near-duplicate options are collapsed before discussion and voting
+        collapse = self.bot_config.get("collapse_duplicates")
+        self.duplicate_threshold: Optional[float] = \
+            (0.7 if collapse is True else float(collapse)) if collapse \
+            else None
+        # Scores of options for open prompts, shared by DISC and VOTE
+        self.similarity_cache = PromptSimilarityCache()
 
     @property
     def log(self):
@@ -160,7 +170,7 @@ class ChatBotABC(ABC):
     def ask_appraiser(self, options: dict) -> str:
         """
         Override in bot to handle selecting a response to the given prompt. Vote is for the name of the best responder.
-        :param options: proposed responses (botname: response)
+        :param options: read-only proposed responses (botname: response)
         :return: user selected from options or "abstain" for no vote
         """
         pass
@@ -169,11 +179,68 @@ class ChatBotABC(ABC):
     def ask_discusser(self, options: dict) -> str:
         """
         Override in bot to handle discussing options for the given prompt. Discussion can be anything.
-        :param options: proposed responses (botname: response)
+        :param options: read-only proposed responses (botname: response)
         :return: Discussion response for the current prompt
         """
         pass
 
+    def _collapse_options(self, options: OptionsSnapshot) -> OptionsSnapshot:
+        """
+        Gets the options to pass to `ask_discusser` or `ask_appraiser`. If
+        `collapse_duplicates` is configured, only one representative of each
+        group of near-duplicate options is included.
+        :param options: snapshot of proposed responses
+        :return: snapshot of options to discuss or vote on
+        """
+        if self.duplicate_threshold is None:
+            return options
+        return options.deduplicated(self.duplicate_threshold)
+
+    @property
+    def _similarity_prompt_id(self) -> Optional[str]:
+        """
+        ID of the prompt being handled, used to cache similarity scores
+        """
+        return None
+
+    def score_options(self, algorithm: str, sentence: str, options: dict,
+                      prompt_id: Optional[str] = None) -> Optional[dict]:
+        """
+        Scores options against a sentence (i.e. the prompt or this bot's
+        response). Scores are cached until the prompt is closed, so options
+        scored in `ask_discusser` are not scored again in `ask_appraiser`.
+        :param algorithm: name of a registered similarity algorithm
+        :param sentence: base sentence
+        :param options: proposed responses (botname: response)
+        :param prompt_id: ID of the prompt, default the prompt being handled
+        :return: dict of botname to score (higher is closer), None if the
+            algorithm is unknown or unavailable
+        """
+        prompt_id = prompt_id or self._similarity_prompt_id
+        if not prompt_id:
+            return self.similarity_cache.engine.score(algorithm, sentence,
+                                                      options)
+        return self.similarity_cache.score(prompt_id, algorithm, sentence,
+                                           options)
+
+    def closest_option(self, algorithm: str, sentence: str, options: dict,
+                       prompt_id: Optional[str] = None) -> Optional[str]:
+        """
+        Determines which option is most similar to a sentence, reusing
+        scores cached for the prompt (see `score_options`)
+        :param algorithm: name of a registered similarity algorithm
+        :param sentence: base sentence
+        :param options: proposed responses (botname: response)
+        :param prompt_id: ID of the prompt, default the prompt being handled
+        :return: botname of the closest option, None if none could be scored
+        """
+        prompt_id = prompt_id or self._similarity_prompt_id
+        if not prompt_id:
+            return self.similarity_cache.engine.closest(algorithm, sentence,
+                                                        options)
+        return self.similarity_cache.closest(prompt_id, algorithm, sentence,
+                                             options)
+
     @staticmethod
     def _shout_is_prompt(shout):
         """
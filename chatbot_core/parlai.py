@@ -18,8 +18,13 @@
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
 from abc import abstractmethod
-from threading import Event, Thread
+from os.path import join
+from threading import Event, Lock, Thread
+from typing import Optional
 from ovos_utils.log import LOG
+from ovos_utils.xdg_utils import xdg_state_home
+
+from chatbot_core.utils.response_cache import PersistentResponseCache
 
 
 class ParlaiBot:
@@ -27,13 +32,20 @@ class ParlaiBot:
 
     def __init__(self, interactive_script, response_timeout=25,
                  done_string: str = '[DONE]',
-                 exit_string: str = '[EXIT]'):
+                 exit_string: str = '[EXIT]',
+                 cache_path: Optional[str] = None,
+                 cache_size: int = 10000,
+                 cache_ttl: Optional[float] = None):
         """
             :param interactive_script: a script that creates a world within the ParlAI framework (for reference, see any
                                             ParlaiBot-extended class in the chatbots package, e.g. TuckerBot)
             :param response_timeout: timeout in seconds for ParlAI world to generate a response for a prompt
             :param done_string: string that signals about episode done
             :param exit_string: string that signals about the finish
+            :param cache_path: path to the sqlite database of cached responses, shared by bots on this node;
+                                default `neon/parlai_response_cache.db` in the XDG state home
+            :param cache_size: maximum number of responses to cache for this bot
+            :param cache_ttl: seconds after which cached responses expire, default never
         """
         import spacy
         self.nlp_engine = spacy.load("en_core_web_sm")
@@ -50,6 +62,10 @@ class ParlaiBot:
         self._response_timeout = response_timeout
         self.done_string = done_string
         self.exit_string = exit_string
+        self._cache_config = {"path": cache_path or join(xdg_state_home(), "neon", "parlai_response_cache.db"),
+                              "capacity": cache_size, "ttl": cache_ttl}
+        self._cache_lock = Lock()
+        self._response_cache = None
 
     # Agent-specific methods
     def observe(self, msg):
@@ -151,14 +167,50 @@ class ParlaiBot:
         """
         raise NotImplementedError
 
-    @abstractmethod
-    def _lookup_cache(self, key):
+    @property
+    def response_cache(self) -> PersistentResponseCache:
+        """
+        Persistent cache of generated responses, opened on first use
+        """
+        if self._response_cache is None:
+            with self._cache_lock:
+                if self._response_cache is None:
+                    self._response_cache = PersistentResponseCache(
+                        namespace=type(self).__name__, **self._cache_config)
+        return self._response_cache
+
+    def shutdown(self):
+        """
+        Close the response cache, then shut down any other base class
+        """
+        self._close_response_cache()
+        parent_shutdown = getattr(super(), "shutdown", None)
+        if parent_shutdown:
+            parent_shutdown()
+
+    def _close_response_cache(self):
+        """
+        Close the response cache database, if it was opened
+        """
+        lock = getattr(self, "_cache_lock", None)
+        if lock is None:
+            return
+        with lock:
+            if self._response_cache is not None:
+                self._response_cache.close()
+                self._response_cache = None
+
+    def __del__(self):
+        self._close_response_cache()
+
+    def _lookup_cache(self, key) -> Optional[str]:
         """
         Lookup cache for particular prompt:response pair
+        :param key: incoming prompt
+        :return: cached response for prompt or None
         """
-        pass
+        return self.response_cache.get(key)
 
-    @abstractmethod
     def _update_cache(self, prompt: str, resp: str) -> None:
         """
         Save the current prompt and resp to cache
@@ -166,4 +218,4 @@ class ParlaiBot:
         :param resp: generated response for prompt
         :return:
         """
-        pass
+        self.response_cache.put(prompt, resp)
@@ -25,11 +25,12 @@ import time
 import sys
 import yaml
 
-from typing import Optional, Callable, Dict, List
+from typing import Optional, Callable, Dict, List, Type
 from multiprocessing import Process, Event, synchronize
 from threading import Thread, current_thread
 from ovos_bus_client import Message, MessageBusClient
 from datetime import datetime
+from functools import partial
 from ovos_utils.xdg_utils import xdg_config_home
 from ovos_utils.log import LOG, log_deprecation
 from neon_utils.net_utils import get_ip_address
@@ -506,59 +507,11 @@ def find_closest_answer(algorithm: str = 'random', sentence: str = None,
     if not options or len(options.keys()) == 0:
         LOG.warning('No options provided')
         return None
-    if algorithm == 'random':
-        closest_answer = random.choice(list(options.keys()))
-    elif algorithm == 'bleu_score':
-        try:
-            import nltk
-            nltk.download('punkt')
-            from nltk import word_tokenize
-            from nltk.translate.bleu_score import sentence_bleu
-        except ImportError:
-            LOG.warning("`nltk` not installed. install "
-                        "`chatbot-core[lang]` to install NLU packages.")
-            return None
-        bleu_scores = []
-        response_tokenized = word_tokenize(sentence.lower())
-        for option in options.keys():
-            opinion_tokenized = word_tokenize(options[option].lower())
-            if len(opinion_tokenized) > 0:
-                if min(len(response_tokenized), len(opinion_tokenized)) < 4:
-                    weighting = 1.0 / min(len(response_tokenized),
-                                          len(opinion_tokenized))
-                    weights = tuple([weighting] * min(len(response_tokenized),
-                                                      len(opinion_tokenized)))
-                else:
-                    weights = (0.25, 0.25, 0.25, 0.25)
-                bleu_scores.append((option, sentence_bleu([response_tokenized],
-                                                          opinion_tokenized,
-                                                          weights=weights)))
-        max_score = max([x[1] for x in
-                         bleu_scores]) if len(bleu_scores) > 0 else 0
-        closest_answer = random.choice(list(filter(lambda x: x[1] == max_score,
-                                                   bleu_scores)))[0]
+    from chatbot_core.utils.similarity import get_similarity_engine
+    closest_answer = get_similarity_engine().closest(algorithm, sentence,
+                                                     options)
+    if closest_answer is not None and algorithm != 'random':
         LOG.info(f'Closest answer is {closest_answer}')
-    elif algorithm == 'damerau_levenshtein_distance':
-        closest_distance = None
-        closest_answer = None
-        try:
-            import jellyfish
-            for option in options.items():
-                distance = jellyfish.damerau_levenshtein_distance(option[1],
-                                                                  sentence)
-                if not closest_distance or closest_distance > distance:
-                    closest_distance = distance
-                    closest_answer = option[0]
-            LOG.info(f'Closest answer is {closest_answer}')
-        except ImportError:
-            jellyfish = None
-            LOG.warning("`jellyfish` not installed. install "
-                        "`chatbot-core[lang]` to install NLU packages.")
-        except Exception as e:
-            LOG.error(e)
-    else:
-        LOG.error(f'Unknown algorithm supplied:{algorithm}')
-        return None
     return closest_answer
 
 
@@ -657,6 +610,51 @@ def run_sio_bot(chatbot_name: str, domain: str = None,
     return bot
 
 
+def start_bots_parallel(constructors: Dict[str, Callable[[], ChatBotABC]],
+                        max_workers: Optional[int] = None,
+                        errors: Optional[Dict[str, Exception]] = None) -> \
+        Dict[str, ChatBotABC]:
+    """
+    Construct (and so log in) several bots at once rather than one after
+    another. Bots that start but fail to log in are logged and included.
+    If a bot fails to start, the exception it raised is re-raised once all
+    other bots have started, unless `errors` is specified.
+    @param constructors: dict of bot name to callable returning a started bot
+    @param max_workers: maximum number of bots to start concurrently
+    @param errors: optional dict to add the name and exception of each bot
+        that fails to start to, instead of raising; these bots are omitted
+        from the result
+    @returns: dict of bot name to started bot, in the order requested
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if not constructors:
+        return dict()
+    with ThreadPoolExecutor(max_workers=max_workers or len(constructors),
+                            thread_name_prefix="bot_login") as executor:
+        futures = {name: executor.submit(constructor)
+                   for name, constructor in constructors.items()}
+    bots = dict()
+    failed = dict()
+    for name, future in futures.items():
+        try:
+            bots[name] = future.result()
+        except Exception as e:
+            LOG.error(f"Failed to start {name}: {e}")
+            failed[name] = e
+            continue
+        if getattr(bots[name], "login_failed", False):
+            LOG.warning(f"{name} started but failed to log in")
+            continue
+        latency = getattr(bots[name], "login_latency", None)
+        if latency is not None:
+            LOG.info(f"{name} logged in after {round(latency, 3)}s")
+    if errors is not None:
+        errors.update(failed)
+    elif failed:
+        raise next(iter(failed.values()))
+    return bots
+
+
 def run_all_bots(domain: str = None) -> List[ChatBotABC]:
     """
     Run all installed chatbots, connecting to the configured server, considering
@@ -666,10 +664,12 @@ def run_all_bots(domain: str = None) -> List[ChatBotABC]:
     from chatbot_core.utils.version_utils import get_current_version
     chatbot_version = get_current_version()
     chatbots = list()
+    if chatbot_version == 1:
+        return list(start_bots_parallel(
+            {bot: partial(run_sio_bot, bot, domain=domain)
+             for bot in bots.keys()}).values())
     for bot in bots.keys():
-        if chatbot_version == 1:
-            chatbots.append(run_sio_bot(bot, domain=domain))
-        elif chatbot_version == 2:
+        if chatbot_version == 2:
             chatbots.append(run_mq_bot(bot))
         else:
             from chatbot_core.utils.version_utils import InvalidVersionError
@@ -697,10 +697,14 @@ def run_local_discussion(prompter_bot: str):
     # Load all installed subminds and facilitators
     os.environ['CHATBOT_VERSION'] = 'v1'
     bots = _find_bot_modules()
-    chatbots = list()
-    for name, clazz in bots.items():
-        chatbots.append(clazz(socket=start_socket("0.0.0.0"), domain="local",
-                              username=name, password=name))
+
+    def start_local_bot(name: str, clazz: Type[ChatBotV1]) -> ChatBotV1:
+        return clazz(socket=start_socket("0.0.0.0"), domain="local",
+                     username=name, password=name)
+
+    chatbots = list(start_bots_parallel(
+        {name: partial(start_local_bot, name, clazz)
+         for name, clazz in bots.items()}).values())
 
     prompter_clazz = bots.get(prompter_bot)
     prompter = prompter_clazz(socket=start_socket("0.0.0.0"), domain="private",
@@ -18,29 +18,253 @@
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
 from collections import OrderedDict
-from typing import Optional
+from threading import Lock
+from time import monotonic
+from typing import Hashable, Optional
 
 
-class FIFOCache:
+class CacheStats:
+    __slots__ = ('hits', 'misses', 'evictions', 'expirations')
 
-    def __init__(self, capacity: int = 10):
+    def __init__(self):
         """
-        Initialize an instance of the first-in-first-out cache with a set capacity
+        Counters of cache lookups and evictions
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Share of lookups that found a value, 0 if there were no lookups
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hit_rate}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.as_dict()})"
+
+
+class _CacheStripe:
+    __slots__ = ('data', 'expires', 'lock', 'stats')
+
+    def __init__(self):
+        self.data = OrderedDict()
+        self.expires = dict()
+        self.lock = Lock()
+        self.stats = CacheStats()
+
+
+class LRUCache:
+    # If False, lookups do not refresh a key and keys are evicted in
+    # insertion order
+    _refresh_on_get = True
+
+    def __init__(self, capacity: int = 128, ttl: Optional[float] = None,
+                 stripes: int = 1):
+        """
+        Initialize a thread-safe cache that evicts the least recently used
+        entries once `capacity` is reached
         :param capacity: a maximum number of entries to store in the cache at the same time
+        :param ttl: seconds after which an entry expires, default never
+        :param stripes: number of independently locked segments; keys are
+            spread by hash, each segment holding up to capacity / stripes
+            entries, so threads using different keys rarely wait on a lock
         """
-        self.cache = OrderedDict()
         self.capacity = capacity
+        self.ttl = ttl
+        self._stripes = [_CacheStripe() for _ in range(max(stripes, 1))]
+        self._stripe_capacity = -(-capacity // len(self._stripes))
+
+    def _stripe(self, key: Hashable) -> _CacheStripe:
+        if len(self._stripes) == 1:
+            return self._stripes[0]
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    @staticmethod
+    def _expired(stripe: _CacheStripe, key: Hashable, now: float) -> bool:
+        expires = stripe.expires.get(key)
+        if expires is None or expires > now:
+            return False
+        del stripe.data[key]
+        del stripe.expires[key]
+        stripe.stats.expirations += 1
+        return True
+
+    def _evict(self, stripe: _CacheStripe):
+        while len(stripe.data) > self._stripe_capacity:
+            key, _ = stripe.data.popitem(last=False)
+            stripe.expires.pop(key, None)
+            stripe.stats.evictions += 1
 
-    def get(self, key: str) -> Optional[str]:
+    def get(self, key: Hashable, default=None):
         """
-        Lookup the cache using a string key
+        Lookup the cache using a key
         :param key: a key in the key-value pair
-        :return: a value associated with the provided key or None
+        :param default: value to return if the key is not cached
+        :return: a value associated with the provided key or `default`
         """
-        if key not in self.cache:
-            return None
-        else:
-            return self.cache[key]
+        stripe = self._stripe(key)
+        with stripe.lock:
+            if key not in stripe.data or \
+                    (self.ttl is not None and
+                     self._expired(stripe, key, monotonic())):
+                stripe.stats.misses += 1
+                return default
+            stripe.stats.hits += 1
+            if self._refresh_on_get:
+                stripe.data.move_to_end(key)
+            return stripe.data[key]
+
+    def put(self, key: Hashable, value) -> None:
+        """
+        Put the key-value into cache, replacing any value cached for the key
+        :param key: a key to use in the cache dict
+        :param value: a value associated with the key
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.data[key] = value
+            stripe.data.move_to_end(key)
+            if self.ttl is not None:
+                stripe.expires[key] = monotonic() + self.ttl
+            self._evict(stripe)
+
+    def add(self, key: Hashable, value) -> bool:
+        """
+        Put the key-value into cache if the key is not in the cache already
+        :param key: a key to use in the cache dict
+        :param value: a value associated with the key
+        :return: True if the value was added
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            if key in stripe.data and not (
+                    self.ttl is not None and
+                    self._expired(stripe, key, monotonic())):
+                return False
+            stripe.data[key] = value
+            if self.ttl is not None:
+                stripe.expires[key] = monotonic() + self.ttl
+            self._evict(stripe)
+            return True
+
+    def pop(self, key: Hashable, default=None):
+        """
+        Remove a key from the cache
+        :param key: a key in the key-value pair
+        :param default: value to return if the key is not cached
+        :return: the value that was cached for the key or `default`
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.expires.pop(key, None)
+            return stripe.data.pop(key, default)
+
+    def clear(self) -> None:
+        """
+        Remove all entries; statistics are kept
+        """
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.data.clear()
+                stripe.expires.clear()
+
+    def expire(self) -> int:
+        """
+        Remove all expired entries
+        :return: number of entries removed
+        """
+        if self.ttl is None:
+            return 0
+        removed = 0
+        now = monotonic()
+        for stripe in self._stripes:
+            with stripe.lock:
+                for key in [k for k, expires in stripe.expires.items()
+                            if expires <= now]:
+                    removed += self._expired(stripe, key, now)
+        return removed
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Get hit, miss and eviction counts summed over all stripes
+        """
+        stats = CacheStats()
+        for stripe in self._stripes:
+            for name in CacheStats.__slots__:
+                setattr(stats, name,
+                        getattr(stats, name) + getattr(stripe.stats, name))
+        return stats
+
+    def reset_stats(self) -> None:
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.stats = CacheStats()
+
+    @property
+    def cache(self) -> OrderedDict:
+        """
+        Cached key-value pairs, oldest first. With several stripes this is a
+        merged copy.
+        """
+        if len(self._stripes) == 1:
+            return self._stripes[0].data
+        merged = OrderedDict()
+        for stripe in self._stripes:
+            with stripe.lock:
+                merged.update(stripe.data)
+        return merged
+
+    def __contains__(self, key: Hashable) -> bool:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            if key not in stripe.data:
+                return False
+            return self.ttl is None or \
+                not self._expired(stripe, key, monotonic())
+
+    def __len__(self) -> int:
+        return sum(len(stripe.data) for stripe in self._stripes)
+
+
+class TTLCache(LRUCache):
+    def __init__(self, capacity: int = 128, ttl: float = 300,
+                 stripes: int = 1):
+        """
+        Initialize a thread-safe cache whose entries expire `ttl` seconds
+        after they are put; the least recently used entries are evicted
+        first once `capacity` is reached
+        :param capacity: a maximum number of entries to store in the cache at the same time
+        :param ttl: seconds after which an entry expires
+        :param stripes: number of independently locked segments
+        """
+        LRUCache.__init__(self, capacity, ttl, stripes)
+
+
+class FIFOCache(LRUCache):
+    """
+    First-in-first-out cache, superseded by `LRUCache`. Kept for
+    compatibility; lookups do not refresh keys and `put` does not replace
+    cached values.
+    """
+    _refresh_on_get = False
+
+    def __init__(self, capacity: int = 10):
+        """
+        Initialize an instance of the first-in-first-out cache with a set capacity
+        :param capacity: a maximum number of entries to store in the cache at the same time
+        """
+        LRUCache.__init__(self, capacity)
 
     def put(self, key: str, value: str) -> None:
         """
@@ -49,8 +273,50 @@ class FIFOCache:
         :param value: a value associated with the key
         :return: None
         """
-        if key not in self.cache:
-            self.cache[key] = value
-            self.cache.move_to_end(key)
-            if len(self.cache) > self.capacity:
-                self.cache.popitem(last=False)
+        self.add(key, value)
+
+
+class DuplicateFilter:
+
+    def __init__(self, capacity: int = 1024, window: float = 300):
+        """
+        Initialize a bounded, time-windowed set of seen keys. Memory is
+        constant; the oldest keys are evicted once `capacity` is reached.
+        :param capacity: a maximum number of keys to remember at the same time
+        :param window: seconds after which a seen key is forgotten
+        """
+        self.seen = OrderedDict()
+        self.capacity = capacity
+        self.window = window
+        self.duplicates = 0
+        self._lock = Lock()
+
+    def check(self, key: Hashable) -> bool:
+        """
+        Check if a key was seen within the window and record it as seen
+        :param key: a key identifying a unique message
+        :return: True if the key is a duplicate, else False
+        """
+        now = monotonic()
+        with self._lock:
+            while self.seen:
+                oldest, timestamp = next(iter(self.seen.items()))
+                if now - timestamp <= self.window:
+                    break
+                self.seen.pop(oldest)
+            if key in self.seen:
+                self.duplicates += 1
+                return True
+            self.seen[key] = now
+            if len(self.seen) > self.capacity:
+                self.seen.popitem(last=False)
+            return False
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            timestamp = self.seen.get(key)
+        return timestamp is not None and monotonic() - timestamp <= self.window
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.seen)
@@ -0,0 +1,388 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import json
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from functools import lru_cache, wraps
+from typing import Dict, List, Optional, Tuple, Union
+
+import pika
+
+from neon_mq_connector.utils.network_utils import b64_to_dict, dict_to_b64
+from ovos_utils.log import LOG
+from pika.exchange_type import ExchangeType
+
+
+class MessageCodec(ABC):
+    """Serializes MQ message bodies exchanged by chatbots"""
+
+    # Name used to select this codec in configuration
+    name: str = None
+    # Value of the MQ `content_type` header identifying encoded messages
+    content_type: Optional[str] = None
+
+    @abstractmethod
+    def encode(self, data: dict) -> bytes:
+        """
+        Encode a message body
+        :param data: dict message body to encode
+        :return: bytes to publish to MQ
+        """
+
+    @abstractmethod
+    def decode(self, data: bytes) -> dict:
+        """
+        Decode a message body
+        :param data: bytes received from MQ
+        :return: decoded dict message body
+        """
+
+
+class ProjectingCodec(MessageCodec):
+    """
+    Message codec able to decode individual fields of a message body without
+    decoding the whole message
+    """
+
+    @abstractmethod
+    def index_fields(self, data: bytes) -> Dict[str, Tuple[int, int]]:
+        """
+        Index the top-level fields of a message body without decoding values
+        :param data: bytes received from MQ
+        :return: dict of message keys to (start, end) offsets of the value
+        """
+
+    @abstractmethod
+    def decode_value(self, data: bytes, span: Tuple[int, int]):
+        """
+        Decode a single value from a message body
+        :param data: bytes received from MQ
+        :param span: (start, end) offsets of the value from `index_fields`
+        :return: decoded value
+        """
+
+
+class B64Codec(MessageCodec):
+    """
+    Default encoding used by `neon_mq_connector`. Messages without a
+    `content_type` header are assumed to use this codec.
+    """
+    name = "b64"
+    content_type = None
+
+    def encode(self, data: dict) -> bytes:
+        return dict_to_b64(data)
+
+    def decode(self, data: bytes) -> dict:
+        return b64_to_dict(data)
+
+
+class JsonCodec(MessageCodec):
+    """Plain UTF-8 JSON encoding"""
+    name = "json"
+    content_type = "application/json"
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, default=str,
+                          separators=(',', ':')).encode("utf-8")
+
+    def decode(self, data: bytes) -> dict:
+        return json.loads(data)
+
+
+class MsgpackCodec(ProjectingCodec):
+    """Compact binary encoding, requires `msgpack`"""
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def encode(self, data: dict) -> bytes:
+        return self._msgpack.packb(data, default=str)
+
+    def decode(self, data: bytes) -> dict:
+        return self._msgpack.unpackb(data, raw=False)
+
+    def index_fields(self, data: bytes) -> Dict[str, Tuple[int, int]]:
+        index = dict()
+        unpacker = self._msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+        for _ in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            start = unpacker.tell()
+            unpacker.skip()
+            index[key] = (start, unpacker.tell())
+        return index
+
+    def decode_value(self, data: bytes, span: Tuple[int, int]):
+        start, end = span
+        return self._msgpack.unpackb(memoryview(data)[start:end], raw=False)
+
+
+_CODECS = {codec.name: codec for codec in (B64Codec, JsonCodec, MsgpackCodec)}
+
+
+def get_codec(name: Optional[str] = None) -> MessageCodec:
+    """
+    Get a message codec by name, falling back to the default `b64` codec if
+    the requested codec is unknown or unavailable
+    :param name: name of the codec to get (`b64`, `json`, or `msgpack`)
+    :return: MessageCodec instance
+    """
+    clazz = _CODECS.get(name or B64Codec.name)
+    if not clazz:
+        LOG.error(f"Unknown message codec requested: {name}")
+        return B64Codec()
+    try:
+        return clazz()
+    except ImportError:
+        LOG.warning(f"`{name}` not installed. install "
+                    f"`neon-chatbot-core[{name}]` to use the `{name}` codec.")
+        return B64Codec()
+
+
+@lru_cache(maxsize=1)
+def _get_supported_codecs() -> Tuple[str, ...]:
+    supported = list()
+    for name, clazz in _CODECS.items():
+        try:
+            clazz()
+            supported.append(name)
+        except ImportError:
+            pass
+    return tuple(supported)
+
+
+def get_supported_codecs() -> List[str]:
+    """
+    Get the names of codecs available to decode received messages. Available
+    codecs are only checked once per process.
+    :return: list of codec names
+    """
+    return list(_get_supported_codecs())
+
+
+@lru_cache(maxsize=16)
+def get_codec_for_content_type(content_type: Optional[str]) -> MessageCodec:
+    """
+    Get the codec to use to decode a message with the specified content type.
+    Unrecognized content types are decoded with the default `b64` codec, as
+    messages were before codecs could be configured. One codec instance is
+    shared by all messages with the same content type.
+    :param content_type: MQ `content_type` header of the received message
+    :return: MessageCodec instance
+    """
+    for clazz in _CODECS.values():
+        if clazz.content_type == content_type:
+            return clazz()
+    LOG.warning(f"Unsupported content type: {content_type}. "
+                f"Decoding as {B64Codec.name}")
+    return B64Codec()
+
+
+class MessageView(Mapping):
+    """
+    Read-only view of a received message. For a `ProjectingCodec` (i.e.
+    `msgpack`), message keys are indexed on first access and only the values
+    that are accessed are decoded. Messages encoded with other codecs are
+    decoded whole, once, on first access, so they are not decoded any faster
+    than a dict: the default `b64` encoding holds a Python literal that can
+    only be evaluated whole, and indexing `json` fields in Python is slower
+    than `json.loads` of the whole message.
+    The raw message is kept so it may be passed along without being
+    re-encoded.
+    """
+    # Fields included in the string representation of a message
+    _summary_keys = ('messageID', 'cid', 'nick', 'prompt_id',
+                     'conversation_state')
+
+    def __init__(self, raw: bytes, codec: MessageCodec):
+        """
+        :param raw: message body received from MQ
+        :param codec: MessageCodec the message was encoded with
+        """
+        self._raw = raw
+        self._codec = codec
+        self._index = None
+        self._fields = dict()
+        self._data = None
+
+    @property
+    def raw(self) -> bytes:
+        """Message body as received from MQ"""
+        return self._raw
+
+    @property
+    def content_type(self) -> Optional[str]:
+        """MQ `content_type` of the raw message"""
+        return self._codec.content_type
+
+    def _decoded(self) -> dict:
+        if self._data is None:
+            self._data = self._codec.decode(self._raw)
+        return self._data
+
+    @property
+    def _projected(self) -> bool:
+        return self._data is None and isinstance(self._codec, ProjectingCodec)
+
+    def _keys(self):
+        if not self._projected:
+            return self._decoded().keys()
+        if self._index is None:
+            self._index = self._codec.index_fields(self._raw)
+        return self._index.keys()
+
+    def __getitem__(self, key):
+        if not self._projected:
+            return self._decoded()[key]
+        if key not in self._fields:
+            if key not in self._keys():
+                raise KeyError(key)
+            self._fields[key] = self._codec.decode_value(self._raw,
+                                                         self._index[key])
+        return self._fields[key]
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __bool__(self):
+        # Received messages are never empty; avoid decoding to check length
+        return True
+
+    def to_dict(self) -> dict:
+        """
+        Get a mutable copy of the fully-decoded message
+        """
+        return dict(self._decoded())
+
+    def __repr__(self):
+        summary = {key: self.get(key) for key in self._summary_keys}
+        return f"MessageView({summary}, size={len(self._raw)})"
+
+
+def _get_received_codec(body: Union[bytes, dict],
+                        properties: Optional[pika.BasicProperties] = None) \
+        -> MessageCodec:
+    if not body or not isinstance(body, bytes):
+        raise TypeError(f'Invalid body received, expected: bytes string; '
+                        f'got: {type(body)}')
+    content_type = getattr(properties, 'content_type', None) or None
+    return get_codec_for_content_type(content_type)
+
+
+def decode_message(body: Union[bytes, dict],
+                   properties: Optional[pika.BasicProperties] = None) -> dict:
+    """
+    Decode a received message body based on its `content_type` header
+    :param body: message body received from MQ
+    :param properties: MQ properties of the received message
+    :return: decoded dict message body
+    """
+    if isinstance(body, Mapping):
+        return body
+    return _get_received_codec(body, properties).decode(body)
+
+
+def create_codec_callback(lazy: bool = False):
+    """
+    Creates MQ callback method receiving a decoded `body`, similar to
+    `neon_mq_connector.utils.rabbit_utils.create_mq_callback`, but decoding
+    messages with the codec specified in the message `content_type` header.
+    :param lazy: if True, pass received messages as a `MessageView` that
+        decodes fields as they are accessed
+    """
+    def wrapper(f):
+        @wraps(f)
+        def wrapped(self, channel=None, method=None, properties=None,
+                    body=None):
+            try:
+                if lazy and not isinstance(body, Mapping):
+                    body = MessageView(body, _get_received_codec(body,
+                                                                 properties))
+                else:
+                    body = decode_message(body, properties)
+                return f(self, body=body)
+            except Exception as ex:
+                LOG.error(f'Execution of {f.__name__} failed due to '
+                          f'exception={ex}')
+        return wrapped
+    return wrapper
+
+
+def emit_encoded_message(connection: pika.BlockingConnection,
+                         request_data: dict,
+                         codec: MessageCodec,
+                         exchange: Optional[str] = '',
+                         queue: Optional[str] = '',
+                         exchange_type: Union[str, ExchangeType] =
+                         ExchangeType.direct.value,
+                         expiration: int = 1000) -> str:
+    """
+    Emits a message encoded with the specified codec. This mirrors
+    `MQConnector.emit_mq_message` and sets the `content_type` header so
+    receivers can select the matching codec.
+    :param connection: pika connection object
+    :param request_data: dictionary with the request data
+    :param codec: MessageCodec to encode `request_data` with
+    :param exchange: name of the exchange (optional)
+    :param queue: name of the queue to publish in
+    :param exchange_type: type of exchange to declare (defaults to direct)
+    :param expiration: mq message expiration time in millis
+    :returns message_id: id of the sent message
+    """
+    from neon_mq_connector import MQConnector
+
+    if not isinstance(request_data, dict):
+        raise TypeError(f"Expected dict and got {type(request_data)}")
+    if not request_data:
+        raise ValueError('No request data provided')
+    request_data = dict(request_data)
+    if request_data.get('message_id') is None:
+        request_data['message_id'] = \
+            request_data.get("context", {}).get("mq", {}).get("message_id") \
+            or MQConnector.create_unique_id()
+    if isinstance(exchange_type, ExchangeType):
+        exchange_type = exchange_type.value
+
+    channel = connection.channel()
+    if exchange:
+        channel.exchange_declare(exchange=exchange,
+                                 exchange_type=exchange_type,
+                                 auto_delete=False)
+    if queue:
+        declared_queue = channel.queue_declare(queue=queue, auto_delete=False)
+        if exchange_type == ExchangeType.fanout.value:
+            channel.queue_bind(queue=declared_queue.method.queue,
+                               exchange=exchange)
+    channel.basic_publish(exchange=exchange or '',
+                          routing_key=queue,
+                          body=codec.encode(request_data),
+                          properties=pika.BasicProperties(
+                              content_type=codec.content_type,
+                              expiration=str(expiration)))
+    channel.close()
+    return request_data['message_id']
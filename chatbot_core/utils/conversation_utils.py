@@ -17,15 +17,441 @@
 # US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
+from collections import OrderedDict
+from hashlib import blake2b
+from enum import IntEnum
 from itertools import cycle
+from sys import getsizeof
+from threading import RLock
+from time import monotonic
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+from chatbot_core.utils.enum import ConversationState
+from chatbot_core.utils.history import HistoryArchive, LRUDict
+from chatbot_core.utils.shout_parser import NickIndex
+from chatbot_core.utils.state_store import StateStore
 
 
 def create_conversation_cycle() -> cycle:
     """Cycle through conversation states"""
-    from chatbot_core.utils.enum import ConversationState
-
     return cycle([ConversationState.RESP,
                   ConversationState.DISC,
                   ConversationState.VOTE,
                   ConversationState.PICK,
                   ConversationState.IDLE])
+
+
+def cid_digest(cid: str) -> int:
+    """
+    Get a 64-bit digest of a cid; digests of a set of cids are combined with
+    XOR into an order-independent hash of the set
+    :param cid: conversation ID
+    :return: int digest
+    """
+    return int.from_bytes(blake2b(cid.encode(), digest_size=8).digest(),
+                          'big')
+
+
+def get_cids_hash(cids: Iterable[str]) -> str:
+    """
+    Get the order-independent hash of a set of cids, as reported by
+    `ConversationRegistry.cids_hash`
+    :param cids: conversation IDs
+    :return: str hex hash
+    """
+    digest = 0
+    for cid in set(cids):
+        digest ^= cid_digest(cid)
+    return f"{digest:016x}"
+
+
+class ConversationRecord:
+    """State of a conversation tracked by a `ConversationRegistry`"""
+    __slots__ = ('cid', 'state', 'data', 'joined', 'last_active')
+
+    def __init__(self, cid: str, data: Optional[dict] = None,
+                 state: Optional[IntEnum] = None):
+        """
+        :param cid: conversation ID
+        :param data: conversation properties (i.e. from an invitation)
+        :param state: current ConversationState of the conversation
+        """
+        self.cid = cid
+        self.data = data or dict()
+        self.state = ConversationState.IDLE if state is None else state
+        self.joined = self.last_active = monotonic()
+
+    def get(self, key: str, default=None):
+        """
+        Get `state` or a conversation property, for compatibility with
+        records stored as dicts
+        """
+        if key == 'state':
+            return self.state
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str):
+        if key == 'state':
+            return self.state
+        return self.data[key]
+
+    def __setitem__(self, key: str, value):
+        if key == 'state':
+            self.state = value
+        else:
+            self.data[key] = value
+
+    def __repr__(self):
+        return f"ConversationRecord(cid={self.cid}, state={self.state!r})"
+
+
+class ConversationContext:
+    """Prompt state of one conversation a v1 bot takes part in"""
+    __slots__ = ('cid', 'dom', 'users', 'nick_index', 'state',
+                 'active_prompt', 'prompt_id', 'proposed_responses',
+                 'id_to_prompt', 'options_snapshot', 'options_source')
+
+    def __init__(self, cid: Optional[str] = None, dom: Optional[str] = None,
+                 users: Optional[Iterable[str]] = None,
+                 max_prompts: Optional[int] = None,
+                 archive: Optional[HistoryArchive] = None):
+        """
+        :param cid: conversation ID, None for the bot's current conversation
+        :param dom: domain of the conversation
+        :param users: nicks of users known to be in the conversation
+        :param max_prompts: number of prompts to keep responses for
+        :param archive: optional archive for evicted prompts
+        """
+        self.cid = cid
+        self.dom = dom
+        self.users = list(users or [])
+        self.nick_index = NickIndex()
+        # Users of the current conversation are indexed when first needed
+        if cid is not None:
+            self.nick_index.update(self.users)
+        self.state = ConversationState.IDLE
+        self.active_prompt = None
+        self.prompt_id = None
+        # Archived prompts of other conversations are named by cid
+        prefix = f"{cid}:" if cid else ""
+        self.proposed_responses = LRUDict(
+            max_prompts, f"{prefix}proposed_responses", archive)
+        self.id_to_prompt = LRUDict(max_prompts, f"{prefix}id_to_prompt",
+                                    archive)
+        self.options_snapshot = None
+        self.options_source = None
+
+    def add_user(self, nick: str):
+        """
+        Add a user to this conversation if they are not already known
+        :param nick: nick of a user who shouted in this conversation
+        """
+        if self.nick_index.add(nick):
+            self.users.append(nick)
+
+    def __repr__(self):
+        return f"ConversationContext(cid={self.cid}, state={self.state!r}, " \
+               f"active_prompt={self.active_prompt!r})"
+
+
+class ConversationRegistry:
+    """
+    Thread-safe registry of the conversations a bot participates in.
+    Conversations idle for longer than `ttl` seconds are evicted, as are the
+    least recently active conversations once `capacity` is exceeded.
+    Conversation states are kept in memory and written through to a
+    `StateStore`, if specified, which is only read to restore states on init.
+
+    The set of tracked cids is summarized by a `version`, incremented on each
+    join or leave, and an order-independent `cids_hash` that is updated
+    incrementally, so peers can verify their copy of the set without
+    exchanging it.
+    """
+
+    def __init__(self, ttl: Optional[float] = None,
+                 capacity: Optional[int] = None,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 store: Optional[StateStore] = None,
+                 on_change: Optional[Callable[[str, str, int, str],
+                                              None]] = None):
+        """
+        :param ttl: seconds of inactivity after which a conversation is evicted
+        :param capacity: max number of conversations to track
+        :param on_evict: optional callback called with each evicted cid
+        :param store: optional StateStore to persist conversation states to;
+            conversations in the store are restored on init
+        :param on_change: optional callback called with (`join` or `leave`,
+            cid, version, cids_hash) when a conversation is added or removed
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self.on_change = on_change
+        self.store = store
+        self.version = 0
+        self._hash = 0
+        self._changes = list()
+        self._records: Dict[str, ConversationRecord] = OrderedDict()
+        self._lock = RLock()
+        if store:
+            for cid, state in store.items().items():
+                self._records[cid] = ConversationRecord(
+                    cid, state=ConversationState(state))
+                self._hash ^= cid_digest(cid)
+
+    @property
+    def cids_hash(self) -> str:
+        """
+        Order-independent hash of the tracked cids
+        """
+        return f"{self._hash:016x}"
+
+    def _changed(self, event: str, cid: str):
+        self._hash ^= cid_digest(cid)
+        self.version += 1
+        self._changes.append((event, cid, self.version, self.cids_hash))
+
+    def _notify_changes(self):
+        # Callbacks are called outside of the lock, in order of the changes
+        with self._lock:
+            changes, self._changes = self._changes, list()
+        if not self.on_change:
+            return
+        for change in changes:
+            try:
+                self.on_change(*change)
+            except Exception as e:
+                LOG.error(f"Change callback failed for {change}: {e}")
+
+    def _is_expired(self, record: ConversationRecord, now: float) -> bool:
+        return bool(self.ttl) and now - record.last_active > self.ttl
+
+    def add(self, cid: str, data: Optional[dict] = None) -> ConversationRecord:
+        """
+        Add a conversation, replacing any existing record for the cid
+        :param cid: conversation ID
+        :param data: conversation properties (i.e. from an invitation)
+        :return: record of the added conversation
+        """
+        record = ConversationRecord(cid, data)
+        with self._lock:
+            if self._records.pop(cid, None) is None:
+                self._changed("join", cid)
+            self._records[cid] = record
+            if self.store:
+                self.store.set(cid, record.state)
+        self.evict()
+        return record
+
+    def get_record(self, cid: str, create: bool = False) \
+            -> Optional[ConversationRecord]:
+        """
+        Get the record of a conversation and mark the conversation as active
+        :param cid: conversation ID
+        :param create: if True, add the conversation if it is not tracked
+        :return: ConversationRecord, or None if `cid` is not tracked
+        """
+        with self._lock:
+            record = self._records.get(cid)
+            if record and self._is_expired(record, monotonic()):
+                self._evict(cid)
+                record = None
+            if record:
+                self._touch(record)
+        if record:
+            return record
+        self._notify_changes()
+        if create:
+            return self.add(cid)
+        return None
+
+    def touch(self, cid: str) -> bool:
+        """
+        Mark a conversation as active
+        :param cid: conversation ID
+        :return: True if the conversation is tracked
+        """
+        return self.get_record(cid) is not None
+
+    def _touch(self, record: ConversationRecord):
+        record.last_active = monotonic()
+        self._records.move_to_end(record.cid)
+
+    def get_state(self, cid: str, default=None):
+        """
+        Get the ConversationState of a conversation
+        :param cid: conversation ID
+        :param default: value to return if `cid` is not tracked
+        """
+        # States are read from memory; the store is only written through to
+        record = self._records.get(cid)
+        if not record:
+            return default
+        return record.state
+
+    def set_state(self, cid: str, state: IntEnum):
+        """
+        Set the ConversationState of a conversation, adding the conversation
+        if it is not tracked
+        :param cid: conversation ID
+        :param state: new ConversationState
+        """
+        # Added conversations are notified to `on_change` outside the lock
+        record = self.get_record(cid, create=True)
+        with self._lock:
+            record.state = state
+            if self.store and self._records.get(cid) is record:
+                self.store.set(cid, state)
+
+    def evict(self) -> List[str]:
+        """
+        Evict idle conversations and conversations in excess of `capacity`
+        :return: list of evicted cids
+        """
+        evicted = list()
+        now = monotonic()
+        with self._lock:
+            # Records are ordered by last activity
+            for cid, record in list(self._records.items()):
+                if not self._is_expired(record, now):
+                    break
+                evicted.append(self._evict(cid))
+            while self.capacity and len(self._records) > self.capacity:
+                evicted.append(self._evict(next(iter(self._records))))
+        self._notify_changes()
+        return evicted
+
+    def _evict(self, cid: str) -> str:
+        if self._records.pop(cid, None) is not None:
+            self._changed("leave", cid)
+        if self.store:
+            self.store.delete(cid)
+        LOG.info(f"Evicted inactive conversation: {cid}")
+        if self.on_evict:
+            try:
+                self.on_evict(cid)
+            except Exception as e:
+                LOG.error(f"Eviction callback failed for {cid}: {e}")
+        return cid
+
+    def pop(self, cid: str, default=None):
+        """
+        Remove a conversation
+        :param cid: conversation ID
+        :param default: value to return if `cid` is not tracked
+        :return: removed ConversationRecord or `default`
+        """
+        with self._lock:
+            record = self._records.pop(cid, None)
+            if record is not None:
+                self._changed("leave", cid)
+                if self.store:
+                    self.store.delete(cid)
+        self._notify_changes()
+        return default if record is None else record
+
+    def get(self, cid: str, default=None):
+        with self._lock:
+            return self._records.get(cid, default)
+
+    @property
+    def memory_usage(self) -> int:
+        """
+        Approximate memory used by tracked conversations in bytes
+        """
+        with self._lock:
+            return sum(getsizeof(record) + getsizeof(record.cid) +
+                       getsizeof(record.data) for record in
+                       self._records.values())
+
+    def snapshot(self) -> Tuple[List[str], int, str]:
+        """
+        Get a consistent snapshot of the tracked cids
+        :return: tuple of (cids, version, cids_hash)
+        """
+        with self._lock:
+            return list(self._records), self.version, self.cids_hash
+
+    def summary(self) -> Tuple[int, str, int]:
+        """
+        Get a consistent summary of the tracked cids without copying them
+        :return: tuple of (version, cids_hash, number of cids)
+        """
+        with self._lock:
+            return self.version, self.cids_hash, len(self._records)
+
+    def __setitem__(self, cid: str, data: Optional[dict]):
+        self.add(cid, data)
+
+    def __getitem__(self, cid: str) -> ConversationRecord:
+        with self._lock:
+            return self._records[cid]
+
+    def __delitem__(self, cid: str):
+        if self.pop(cid) is None:
+            raise KeyError(cid)
+
+    def __contains__(self, cid: str) -> bool:
+        record = self._records.get(cid)
+        return record is not None and \
+            not self._is_expired(record, monotonic())
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._records))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __repr__(self):
+        return f"ConversationRegistry(cids={list(self)})"
+
+
+class ConversationSetTracker:
+    """
+    Tracks the cids of a peer from the `sync` messages it sends in the
+    context of its `connection` state messages. Peers send a `snapshot` with
+    all cids, `join` and `leave` events as cids change, and periodic
+    `heartbeat` messages with the `cids_version` and `cids_hash` only.
+    """
+
+    def __init__(self):
+        self.cids = set()
+        self.version = None
+        self._hash = 0
+
+    @property
+    def cids_hash(self) -> str:
+        return f"{self._hash:016x}"
+
+    def apply(self, context: dict) -> bool:
+        """
+        Apply a state message from the tracked peer
+        :param context: `context` of the received state message
+        :return: False if the tracked cids are out of sync with the peer and
+            a snapshot should be requested, else True
+        """
+        sync = context.get('sync', 'snapshot')
+        version = context.get('cids_version')
+        if 'cids' in context:
+            self.cids = set(context['cids'])
+            self._hash = int(get_cids_hash(self.cids), 16)
+            self.version = version
+        elif sync in ('join', 'leave'):
+            if self.version is None or version != self.version + 1:
+                return False
+            cid = context.get('cid')
+            if (sync == 'join') != (cid in self.cids):
+                self._hash ^= cid_digest(cid)
+            if sync == 'join':
+                self.cids.add(cid)
+            else:
+                self.cids.discard(cid)
+            self.version = version
+        elif self.version is None:
+            return False
+        if context.get('cids_hash') not in (None, self.cids_hash):
+            return False
+        return True
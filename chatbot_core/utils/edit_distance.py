@@ -0,0 +1,95 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+from typing import Optional
+
+
+def bounded_damerau_levenshtein(first: str, second: str,
+                                max_distance: Optional[int] = None) -> \
+        Optional[int]:
+    """
+    Calculate the (unrestricted) Damerau-Levenshtein distance between two
+    strings, giving up as soon as it must exceed `max_distance`. Only cells
+    within `max_distance` of the diagonal are computed and stored, and only
+    the last `max_distance + 2` rows are kept, so comparing strings of length
+    n costs O(n * max_distance) time and O(max_distance^2) memory instead of
+    O(n^2) time and memory.
+    :param first: first string
+    :param second: second string
+    :param max_distance: maximum distance of interest, default unbounded
+    :return: distance between the strings, None if it exceeds `max_distance`
+    """
+    if max_distance is None:
+        max_distance = max(len(first), len(second))
+    if abs(len(first) - len(second)) > max_distance:
+        return None
+    if first == second:
+        return 0
+    length = len(second)
+    infinity = max_distance + 1
+    band = 2 * max_distance + 1
+    # Lowrance-Wagner table; rows[i][j - i + max_distance] holds the
+    # distance of first[:i] and second[:j]. Cells outside the band exceed
+    # `max_distance`, as do transpositions from rows that are not kept.
+    initial = min(length, max_distance)
+    rows = {0: [infinity] * max_distance + list(range(initial + 1)) +
+            [infinity] * (max_distance - initial)}
+    last_row = dict()
+    for i in range(1, len(first) + 1):
+        char = first[i - 1]
+        previous = rows[i - 1]
+        row = [infinity] * band
+        if i <= max_distance:
+            row[max_distance - i] = i
+        row_min = min(i, infinity)
+        last_column = 0
+        offset = max_distance - i
+        for j in range(max(1, i - max_distance),
+                       min(length, i + max_distance) + 1):
+            k = j + offset
+            i1 = last_row.get(second[j - 1], 0)
+            j1 = last_column
+            if char == second[j - 1]:
+                cost = 0
+                last_column = j
+            else:
+                cost = 1
+            distance = previous[k] + cost
+            if k and row[k - 1] + 1 < distance:
+                distance = row[k - 1] + 1
+            if k + 1 < band and previous[k + 1] + 1 < distance:
+                distance = previous[k + 1] + 1
+            if i1 and j1:
+                k1 = j1 - i1 + max_distance
+                transposed = rows.get(i1 - 1)
+                if transposed and 0 <= k1 < band:
+                    distance = min(distance, transposed[k1] +
+                                   (i - i1 - 1) + 1 + (j - j1 - 1))
+            if distance > max_distance:
+                distance = infinity
+            row[k] = distance
+            if distance < row_min:
+                row_min = distance
+        if row_min > max_distance:
+            return None
+        rows[i] = row
+        rows.pop(i - max_distance - 2, None)
+        last_row[char] = i
+    distance = rows[len(first)][length - len(first) + max_distance]
+    return distance if distance <= max_distance else None
@@ -39,6 +39,18 @@ class ConversationState(IntEnum):
     WAIT = 5  # Bot is waiting for the proctor to ask them to respond (not participating)
 
 
+class ShoutType(IntEnum):
+    OTHER = 0  # Not a control message
+    WAIT = 1  # Proctor announcing participants for the next prompt
+    DISC = 2  # Proctor opening discussion
+    VOTE = 3  # Proctor opening voting
+    PICK = 4  # Proctor tallying votes
+    RESP = 5  # Proctor asking for responses to a prompt
+    HIST = 6  # Request for selection history
+    PROMPT = 7  # New prompt for the proctor
+    NEXT = 8  # Bot is ready for the next prompt
+
+
 class BotTypes:
     PROCTOR = 'proctor'
     SUBMIND = 'submind'
@@ -0,0 +1,90 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import zlib
+
+from typing import List, Optional, Sequence, Tuple
+
+
+class HashingVectorizer:
+    def __init__(self, n_features: int = 4096, n: int = 3):
+        """
+        Fixed-width vectorizer of character n-gram counts. N-grams are hashed
+        into `n_features` buckets, so no vocabulary or model files are needed
+        and memory use does not grow with the number of texts seen.
+        :param n_features: width of each vector
+        :param n: number of characters per n-gram
+        """
+        self.n_features = n_features
+        self.n = n
+
+    def indices(self, grams: Sequence[str]) -> Tuple[int, ...]:
+        """
+        Get the feature index of each n-gram. Hashes are stable across
+        processes.
+        :param grams: n-grams of some text
+        :return: feature index of each n-gram
+        """
+        return tuple(zlib.crc32(gram.encode('utf-8')) % self.n_features
+                     for gram in grams)
+
+    def transform(self, documents: Sequence[Sequence[int]]):
+        """
+        Get L2-normalized count vectors of some documents
+        :param documents: feature indices of each document (see `indices`)
+        :return: numpy array of shape (len(documents), n_features)
+        """
+        import numpy as np
+        rows = np.repeat(np.arange(len(documents)) * self.n_features,
+                         [len(document) for document in documents])
+        columns = np.fromiter((i for document in documents for i in document),
+                              dtype=np.intp, count=len(rows))
+        vectors = np.bincount(
+            rows + columns, minlength=len(documents) * self.n_features
+        ).reshape(len(documents), self.n_features).astype(float)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+    def similarity(self, query: Sequence[int],
+                   documents: Sequence[Sequence[int]]) -> \
+            List[Optional[float]]:
+        """
+        Get the cosine similarity of each document to a query in one batch
+        :param query: feature indices of the query
+        :param documents: feature indices of the documents to score
+        :return: similarity of each document (0-1), None for empty documents
+        """
+        import numpy as np
+        query_vector = self.transform([query])[0]
+        # Documents are scored from sparse counts, so memory use is
+        # proportional to their length rather than to `n_features`
+        rows = np.repeat(np.arange(len(documents)) * self.n_features,
+                         [len(document) for document in documents])
+        columns = np.fromiter((i for document in documents for i in document),
+                              dtype=np.intp, count=len(rows))
+        keys, counts = np.unique(rows + columns, return_counts=True)
+        rows, columns = np.divmod(keys, self.n_features)
+        norms = np.sqrt(np.bincount(rows, weights=counts.astype(float) ** 2,
+                                    minlength=len(documents)))
+        products = np.bincount(rows, weights=counts * query_vector[columns],
+                               minlength=len(documents))
+        scores = np.divide(products, norms, out=np.zeros(len(documents)),
+                           where=norms > 0)
+        return [float(min(score, 1.0)) if document else None
+                for score, document in zip(scores, documents)]
@@ -0,0 +1,166 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import json
+import os
+
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+
+def _to_json(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    return str(obj)
+
+
+class HistoryArchive:
+    def __init__(self, path: str):
+        """
+        Append-only JSON Lines file that receives entries evicted from
+        bounded histories
+        :param path: path to the archive file
+        """
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = Lock()
+
+    def write(self, history: str, entry: Any):
+        """
+        Append an evicted entry to the archive
+        :param history: name of the history the entry was evicted from
+        :param entry: evicted entry
+        """
+        line = json.dumps({"history": history, "time": time(),
+                           "entry": entry}, default=_to_json)
+        with self._lock:
+            if self._file.closed:
+                LOG.warning(f"Archive closed; dropping {history} entry")
+                return
+            self._file.write(f"{line}\n")
+
+    def read(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over archived entries, oldest first
+        :return: iterator of (history name, entry)
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                yield record["history"], record["entry"]
+
+    def close(self):
+        """
+        Flush and close the archive file
+        """
+        with self._lock:
+            self._file.close()
+
+    def __deepcopy__(self, memo):
+        # Copied histories share the same archive file
+        return self
+
+
+class HistoryBuffer(list):
+    # Defaults for copies restored (i.e. unpickled) before their attributes
+    maxlen: Optional[int] = None
+    archive: Optional[HistoryArchive] = None
+
+    def __init__(self, iterable: Iterable = (), maxlen: Optional[int] = None,
+                 name: str = "history",
+                 archive: Optional[HistoryArchive] = None):
+        """
+        List that keeps the newest `maxlen` entries, so it may be used (i.e.
+        sliced, concatenated or serialized) as the unbounded lists v1
+        histories used to be. Old entries are removed in batches of up to a
+        quarter of `maxlen`, so a full history may briefly hold more than
+        `maxlen` entries and each append takes constant amortized time.
+        :param iterable: initial entries
+        :param maxlen: maximum number of entries to keep; None is unbounded
+        :param name: name of this history in the archive
+        :param archive: optional archive to write evicted entries to
+        """
+        list.__init__(self)
+        self.maxlen = maxlen
+        self.name = name
+        self.archive = archive
+        self.extend(iterable)
+
+    def _evict(self):
+        if len(self) <= self.maxlen + self.maxlen // 4:
+            return
+        excess = len(self) - self.maxlen
+        if self.archive:
+            for entry in self[:excess]:
+                self.archive.write(self.name, entry)
+        del self[:excess]
+
+    def append(self, entry: Any):
+        list.append(self, entry)
+        if self.maxlen is not None:
+            self._evict()
+
+    def extend(self, entries: Iterable):
+        list.extend(self, entries)
+        if self.maxlen is not None:
+            self._evict()
+
+    def __iadd__(self, entries: Iterable):
+        self.extend(entries)
+        return self
+
+
+class LRUDict(OrderedDict):
+    def __init__(self, capacity: Optional[int] = None, name: str = "history",
+                 archive: Optional[HistoryArchive] = None):
+        """
+        Dict that keeps the `capacity` most recently set or touched keys
+        :param capacity: maximum number of keys to keep; None is unbounded
+        :param name: name of this history in the archive
+        :param archive: optional archive to write evicted items to
+        """
+        OrderedDict.__init__(self)
+        self.capacity = capacity
+        self.name = name
+        self.archive = archive
+
+    def touch(self, key):
+        """
+        Mark a key as recently used. Reads do not change the order of keys,
+        so only keys that are set or touched are kept.
+        :param key: key to mark as recently used
+        """
+        self.move_to_end(key)
+
+    def __setitem__(self, key, value):
+        OrderedDict.__setitem__(self, key, value)
+        self.move_to_end(key)
+        if self.capacity is not None:
+            while len(self) > self.capacity:
+                evicted = self.popitem(last=False)
+                if self.archive:
+                    self.archive.write(self.name, evicted)
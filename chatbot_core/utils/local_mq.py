@@ -0,0 +1,369 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import heapq
+import random
+import time
+
+from queue import Empty
+from threading import Condition, Event, Lock, Thread
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional, Set, Tuple
+from uuid import uuid4
+
+from ovos_utils.log import LOG
+from pika.exchange_type import ExchangeType
+
+
+class _DelayQueue:
+    """Queue of deliveries ordered by the time they are deliverable"""
+
+    def __init__(self):
+        self._heap = list()
+        self._condition = Condition()
+
+    def put(self, deliver_at: float, delivery_tag: int, delivery: tuple):
+        with self._condition:
+            heapq.heappush(self._heap, (deliver_at, delivery_tag, delivery))
+            self._condition.notify_all()
+
+    def get(self, timeout: float) -> tuple:
+        """
+        Get the next deliverable item, waiting for a delayed item to become
+        deliverable or for a new item to be put
+        :param timeout: max seconds to wait
+        :returns: next deliverable item
+        :raises Empty: if nothing is deliverable within `timeout`
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2]
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise Empty()
+                if self._heap:
+                    remaining = min(remaining, self._heap[0][0] - now)
+                self._condition.wait(remaining)
+
+
+class InMemoryBroker:
+    """
+    In-process stand-in for the RabbitMQ exchange, queue and fanout semantics
+    used by `KlatAPIMQ` and v2 chatbots. Latency and message loss may be
+    injected to load-test and regression-test conversations offline.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 loss: float = 0.0, seed: Optional[int] = None):
+        """
+        :param latency: seconds to delay delivery of every message
+        :param jitter: max additional random seconds to delay each message
+        :param loss: probability (0-1) that a published message is dropped
+        :param seed: optional seed for reproducible jitter and loss
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        # (vhost, exchange) -> (exchange_type, {(queue, routing_key)})
+        self._exchanges: Dict[Tuple[str, str],
+                              Tuple[str, Set[Tuple[str, str]]]] = dict()
+        # (vhost, queue) -> pending deliveries ordered by delivery time
+        self._queues: Dict[Tuple[str, str], _DelayQueue] = dict()
+        self._delivery_tag = 0
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0,
+                      "expired": 0, "unroutable": 0}
+
+    def connection(self, vhost: str = '/') -> 'InMemoryConnection':
+        """
+        Get a connection to this broker, usable in place of a
+        `pika.BlockingConnection`
+        :param vhost: virtual host to connect to
+        """
+        return InMemoryConnection(self, vhost)
+
+    def declare_exchange(self, vhost: str, exchange: str,
+                         exchange_type: str = ExchangeType.direct.value):
+        if isinstance(exchange_type, ExchangeType):
+            exchange_type = exchange_type.value
+        with self._lock:
+            self._exchanges.setdefault((vhost, exchange),
+                                       (exchange_type, set()))
+
+    def declare_queue(self, vhost: str, queue: str) -> str:
+        with self._lock:
+            self._queues.setdefault((vhost, queue), _DelayQueue())
+        return queue
+
+    def bind_queue(self, vhost: str, queue: str, exchange: str,
+                   routing_key: Optional[str] = None,
+                   exchange_type: str = ExchangeType.fanout.value):
+        """
+        Bind a queue to an exchange, declaring both if they do not exist
+        :param vhost: virtual host of the queue and exchange
+        :param queue: name of the queue to bind
+        :param exchange: name of the exchange to bind to
+        :param routing_key: routing key for direct exchanges (default `queue`)
+        :param exchange_type: type of the exchange, if it is not yet declared
+        """
+        self.declare_queue(vhost, queue)
+        self.declare_exchange(vhost, exchange, exchange_type)
+        with self._lock:
+            self._exchanges[(vhost, exchange)][1].add((queue,
+                                                       routing_key or queue))
+
+    def publish(self, vhost: str, exchange: str, routing_key: str,
+                body: bytes, properties=None):
+        """
+        Route a message to the matching queues
+        :param vhost: virtual host to publish to
+        :param exchange: exchange to publish to ('' for the default exchange)
+        :param routing_key: queue name for direct messages
+        :param body: encoded message body
+        :param properties: pika.BasicProperties of the message
+        """
+        with self._lock:
+            self.stats["published"] += 1
+            if exchange:
+                exchange_type, bindings = \
+                    self._exchanges.get((vhost, exchange), (None, set()))
+                if exchange_type == ExchangeType.fanout.value:
+                    queues = [queue for queue, _ in bindings]
+                else:
+                    queues = [queue for queue, key in bindings
+                              if key == routing_key]
+            else:
+                queues = [routing_key] if (vhost, routing_key) in \
+                    self._queues else []
+            if not queues:
+                self.stats["unroutable"] += 1
+            for queue in queues:
+                if self.loss and self._random.random() < self.loss:
+                    self.stats["dropped"] += 1
+                    continue
+                now = time.monotonic()
+                delay = self.latency + (self._random.uniform(0, self.jitter)
+                                        if self.jitter else 0)
+                expiration = getattr(properties, 'expiration', None)
+                expires = now + int(expiration) / 1000 if expiration else None
+                self._delivery_tag += 1
+                method = SimpleNamespace(exchange=exchange,
+                                         routing_key=routing_key,
+                                         delivery_tag=self._delivery_tag,
+                                         redelivered=False)
+                self._queues[(vhost, queue)].put(
+                    now + delay, self._delivery_tag,
+                    (expires, method, properties, body))
+
+    def consume(self, vhost: str, queue: str, callback: Callable,
+                on_error: Optional[Callable] = None) -> 'InMemoryConsumer':
+        """
+        Create a consumer thread for a queue. Consumers of the same queue
+        compete for messages, as with RabbitMQ.
+        :param vhost: virtual host of the queue
+        :param queue: name of the queue to consume
+        :param callback: method called with (channel, method, properties, body)
+        :param on_error: method called with (consumer, exception) on error
+        :returns: InMemoryConsumer (not started)
+        """
+        self.declare_queue(vhost, queue)
+        return InMemoryConsumer(self, vhost, queue, callback, on_error)
+
+    def _get(self, vhost: str, queue: str, timeout: float):
+        expires, method, properties, body = \
+            self._queues[(vhost, queue)].get(timeout)
+        with self._lock:
+            if expires and time.monotonic() > expires:
+                self.stats["expired"] += 1
+                return None
+            self.stats["delivered"] += 1
+        return method, properties, body
+
+
+class InMemoryConsumer(Thread):
+    """Thread delivering messages from an `InMemoryBroker` queue"""
+
+    def __init__(self, broker: InMemoryBroker, vhost: str, queue: str,
+                 callback: Callable, on_error: Optional[Callable] = None):
+        Thread.__init__(self, daemon=True)
+        self.broker = broker
+        self.vhost = vhost
+        self.queue = queue
+        self.callback = callback
+        self.on_error = on_error
+        self.channel = InMemoryChannel(broker, vhost)
+        self._stopping = Event()
+
+    @property
+    def is_consuming(self) -> bool:
+        return self.is_alive() and not self._stopping.is_set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                delivery = self.broker._get(self.vhost, self.queue, 0.1)
+            except Empty:
+                continue
+            if not delivery:
+                continue
+            method, properties, body = delivery
+            try:
+                self.callback(self.channel, method, properties, body)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(self, e)
+                else:
+                    LOG.error(f"{e} occurred in {self}")
+
+    def join(self, timeout: Optional[float] = None):
+        self._stopping.set()
+        if self.is_alive():
+            Thread.join(self, timeout)
+
+
+class InMemoryChannel:
+    """Subset of the `pika` channel API backed by an `InMemoryBroker`"""
+
+    def __init__(self, broker: InMemoryBroker, vhost: str):
+        self.broker = broker
+        self.vhost = vhost
+        self.is_open = True
+
+    def exchange_declare(self, exchange: str,
+                         exchange_type: str = ExchangeType.direct.value, **_):
+        self.broker.declare_exchange(self.vhost, exchange, exchange_type)
+
+    def queue_declare(self, queue: str, **_) -> SimpleNamespace:
+        queue = self.broker.declare_queue(self.vhost, queue)
+        return SimpleNamespace(method=SimpleNamespace(queue=queue))
+
+    def queue_bind(self, queue: str, exchange: str,
+                   routing_key: Optional[str] = None, **_):
+        self.broker.bind_queue(self.vhost, queue, exchange, routing_key)
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes,
+                      properties=None, **_):
+        self.broker.publish(self.vhost, exchange, routing_key, body,
+                            properties)
+
+    def basic_ack(self, *_, **__):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class InMemoryConnection:
+    """Subset of the `pika` connection API backed by an `InMemoryBroker`"""
+
+    def __init__(self, broker: InMemoryBroker, vhost: str = '/'):
+        self.broker = broker
+        self.vhost = vhost
+        self.is_open = True
+
+    def channel(self, on_open_callback: Optional[Callable] = None) \
+            -> InMemoryChannel:
+        channel = InMemoryChannel(self.broker, self.vhost)
+        if on_open_callback:
+            on_open_callback(channel)
+        return channel
+
+    def close(self):
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class InMemoryMQMixin:
+    """
+    Mixin for `MQConnector` subclasses (i.e. v2 chatbots) replacing RabbitMQ
+    connections and consumers with an `InMemoryBroker`. Use
+    `get_in_memory_class` to create a class from an existing bot class.
+    """
+    broker: InMemoryBroker = None
+
+    def create_mq_connection(self, vhost: str = '/', **_) \
+            -> InMemoryConnection:
+        return self.broker.connection(vhost)
+
+    def register_consumer(self, name: str, vhost: str, queue: str,
+                          callback: callable,
+                          on_error: Optional[callable] = None,
+                          auto_ack: bool = True, queue_reset: bool = False,
+                          exchange: str = None, exchange_type: str = None,
+                          exchange_reset: bool = False,
+                          queue_exclusive: bool = False,
+                          skip_on_existing: bool = False, **_):
+        if name in self.consumers:
+            if skip_on_existing:
+                return
+            self.stop_consumers(names=(name,))
+        if not queue:
+            # RabbitMQ assigns a unique name to each consumer's queue
+            queue = f"amq.gen-{uuid4().hex}"
+        if exchange:
+            self.broker.bind_queue(vhost, queue, exchange,
+                                   exchange_type=exchange_type or
+                                   ExchangeType.direct.value)
+        self.consumer_properties[name] = {'started': False}
+        self.consumers[name] = self.broker.consume(
+            vhost, queue, callback, on_error or self.default_error_handler)
+
+    def run_consumers(self, names: Optional[tuple] = None, daemon=True):
+        for name in names or list(self.consumers):
+            consumer = self.consumers.get(name)
+            if consumer and not consumer.is_alive():
+                consumer.start()
+                self.consumer_properties[name]['started'] = True
+
+    def stop_consumers(self, names: Optional[tuple] = None):
+        for name in names or list(self.consumers):
+            consumer = self.consumers.get(name)
+            if isinstance(consumer, InMemoryConsumer):
+                consumer.join(timeout=self.__consumer_join_timeout__)
+                self.consumer_properties[name]['started'] = False
+
+    def run(self, run_consumers: bool = True, run_sync: bool = True, **_):
+        self._setup_listeners()
+        if run_consumers:
+            self.run_consumers()
+        if run_sync:
+            self.sync_thread.start()
+        self._consumers_started = True
+        self._on_connect()
+
+
+def get_in_memory_class(clazz: type, broker: InMemoryBroker) -> type:
+    """
+    Get a subclass of an MQ-connected class (i.e. a v2 chatbot) that connects
+    to the specified in-memory broker instead of RabbitMQ
+    :param clazz: MQConnector subclass to extend
+    :param broker: InMemoryBroker to connect instances to
+    :returns: new class using `broker` for all MQ connections
+    """
+    return type(f"InMemory{clazz.__name__}", (InMemoryMQMixin, clazz),
+                {"broker": broker})
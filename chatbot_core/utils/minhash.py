@@ -0,0 +1,155 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import random
+import zlib
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from chatbot_core.utils.similarity import SimilarityEngine, \
+    get_similarity_engine
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, bands: int = 16, n: int = 3,
+                 seed: int = 1, engine: Optional[SimilarityEngine] = None):
+        """
+        Computes MinHash signatures of texts from their character n-grams
+        and groups near-duplicate texts with LSH banding. Signatures are
+        deterministic across processes for the same parameters.
+        :param num_perm: number of hash functions per signature
+        :param bands: number of LSH bands; `num_perm` must be divisible by it
+        :param n: number of characters per n-gram
+        :param seed: seed for hash function parameters
+        :param engine: engine to cache n-grams with, default a shared engine
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by "
+                             f"bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.n = n
+        self.engine = engine or get_similarity_engine()
+        rand = random.Random(seed)
+        self._params = [(rand.randrange(1, _PRIME), rand.randrange(_PRIME))
+                        for _ in range(num_perm)]
+
+    @property
+    def threshold(self) -> float:
+        """
+        Approximate Jaccard similarity above which texts are likely to
+        become LSH candidates
+        """
+        return (1.0 / self.bands) ** (1.0 / self.rows)
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        Get the MinHash signature of some text
+        :param text: raw text
+        :return: minimum hash of its n-grams for each hash function
+        """
+        hashes = [zlib.crc32(gram.encode('utf-8')) for gram in
+                  set(self.engine.char_ngrams(text, self.n))]
+        return tuple(min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes)
+                     for a, b in self._params)
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """
+        Estimate the Jaccard similarity of two texts from their signatures
+        """
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+
+    def candidates(self, signatures: Mapping[str, Tuple[int, ...]]) -> \
+            Iterable[Tuple[str, str]]:
+        """
+        Get pairs of keys whose signatures share at least one LSH band
+        :param signatures: dict of key to signature
+        :return: generator of candidate pairs, each yielded once
+        """
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = \
+            defaultdict(list)
+        for key, signature in signatures.items():
+            for band in range(self.bands):
+                start = band * self.rows
+                buckets[(band, signature[start:start + self.rows])].append(key)
+        seen = set()
+        for keys in buckets.values():
+            for i, first in enumerate(keys):
+                for second in keys[i + 1:]:
+                    if (first, second) not in seen:
+                        seen.add((first, second))
+                        yield first, second
+
+    def cluster(self, options: Mapping[str, str], threshold: float = 0.7) \
+            -> List[List[str]]:
+        """
+        Group near-duplicate options. Only pairs sharing an LSH band are
+        compared, so this is sub-quadratic for options that are not similar.
+        :param options: dict of option ID to response
+        :param threshold: minimum estimated Jaccard similarity of n-grams for
+            options to be grouped
+        :return: list of clusters of option IDs in `options` order; the first
+            ID of each cluster is its representative
+        """
+        signatures = {key: self.signature(text)
+                      for key, text in options.items()}
+        parents = {key: key for key in options}
+
+        def find(key):
+            while parents[key] != key:
+                parents[key] = parents[parents[key]]
+                key = parents[key]
+            return key
+
+        for first, second in self.candidates(signatures):
+            if find(first) != find(second) and self.similarity(
+                    signatures[first], signatures[second]) >= threshold:
+                parents[find(second)] = find(first)
+        clusters: Dict[str, List[str]] = dict()
+        for key in options:
+            clusters.setdefault(find(key), list()).append(key)
+        return list(clusters.values())
+
+
+def cluster_near_duplicates(options: Mapping[str, str],
+                            threshold: float = 0.7) -> List[List[str]]:
+    """
+    Group near-duplicate options with a shared MinHasher
+    :param options: dict of option ID to response (i.e. proposed_responses)
+    :param threshold: minimum estimated Jaccard similarity of n-grams for
+        options to be grouped
+    :return: list of clusters of option IDs; the first ID of each cluster is
+        its representative
+    """
+    return get_min_hasher().cluster(options, threshold)
+
+
+@lru_cache(maxsize=1)
+def get_min_hasher() -> MinHasher:
+    """
+    Get a MinHasher with default parameters shared within this process
+    """
+    return MinHasher()
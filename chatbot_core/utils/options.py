@@ -0,0 +1,105 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+class OptionsSnapshot(dict):
+    """
+    Read-only snapshot of proposed responses (botname: response). Snapshots
+    are shallow copies taken once per prompt; copying a snapshot returns the
+    same object.
+    """
+    __slots__ = ('_hash', '_filtered', '_clusters')
+
+    def __init__(self, options: Optional[Mapping[str, str]] = None):
+        dict.__init__(self, options or {})
+        self._hash = None
+        self._filtered: Dict[Tuple[str, Optional[str]], OptionsSnapshot] = \
+            dict()
+        self._clusters: Dict[float, List[List[str]]] = dict()
+
+    def filtered(self, exclude_nick: str = "",
+                 exclude_response: Optional[str] = None) -> 'OptionsSnapshot':
+        """
+        Get a snapshot with lowercase nicks, excluding a nick and any options
+        matching a response (i.e. a bot repeating the prompt). Filtered
+        snapshots are computed on first access and cached.
+        :param exclude_nick: nick to exclude, usually the requesting bot
+        :param exclude_response: response to exclude, usually the prompt
+        :return: filtered OptionsSnapshot
+        """
+        key = (exclude_nick.lower(), exclude_response)
+        if key not in self._filtered:
+            self._filtered[key] = OptionsSnapshot(
+                {nick.lower(): resp for nick, resp in self.items()
+                 if nick.lower() != key[0] and resp != exclude_response})
+        return self._filtered[key]
+
+    def clusters(self, threshold: float = 0.7) -> List[List[str]]:
+        """
+        Get groups of near-duplicate options, computed on first access with
+        MinHash/LSH and cached
+        :param threshold: minimum estimated Jaccard similarity of character
+            n-grams for options to be grouped
+        :return: list of clusters of nicks; the first nick of each cluster is
+            its representative
+        """
+        if threshold not in self._clusters:
+            from chatbot_core.utils.minhash import cluster_near_duplicates
+            self._clusters[threshold] = cluster_near_duplicates(self,
+                                                                threshold)
+        return self._clusters[threshold]
+
+    def deduplicated(self, threshold: float = 0.7) -> 'OptionsSnapshot':
+        """
+        Get a snapshot with only one representative option of each group of
+        near-duplicate options, so each distinct response is scored once
+        :param threshold: minimum estimated Jaccard similarity of character
+            n-grams for options to be grouped
+        :return: OptionsSnapshot of representative options
+        """
+        clusters = self.clusters(threshold)
+        if len(clusters) == len(self):
+            return self
+        return OptionsSnapshot({cluster[0]: self[cluster[0]]
+                                for cluster in clusters})
+
+    def _readonly(self, *_, **__):
+        raise TypeError(f"{self.__class__.__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict.__repr__(self)})"
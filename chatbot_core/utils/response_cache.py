@@ -0,0 +1,189 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+from threading import Lock
+from time import time
+from typing import Optional
+
+from chatbot_core.utils.cache import CacheStats, LRUCache
+from chatbot_core.utils.sqlite_utils import connect_sqlite
+
+
+class PersistentResponseCache:
+    """
+    Response cache backed by a sqlite database in WAL mode, so cached
+    responses survive restarts and may be read by several processes on the
+    same node. Recently used responses are also kept in memory, so a
+    response replaced by another process may be served from memory until it
+    is evicted. Nothing is loaded on startup; responses are read from disk as
+    they are requested.
+    """
+
+    def __init__(self, path: str, namespace: str = "",
+                 capacity: int = 10000, ttl: Optional[float] = None,
+                 memory_capacity: int = 1000, maintenance_interval: int = 100,
+                 touch_interval: float = 60.0):
+        """
+        :param path: path to the sqlite database file
+        :param namespace: namespace of cached responses (i.e. a bot name)
+        :param capacity: maximum number of responses to keep on disk; the
+            least recently used are evicted after every
+            `maintenance_interval` writes
+        :param ttl: seconds after which a response expires, default never
+        :param memory_capacity: number of responses to keep in memory
+        :param maintenance_interval: number of writes between evictions
+        :param touch_interval: seconds between updates of the last access
+            time of a response, so reads rarely need to write
+        """
+        self.path = path
+        self.namespace = namespace
+        self.capacity = capacity
+        self.ttl = ttl
+        self.maintenance_interval = maintenance_interval
+        self.touch_interval = touch_interval
+        # key -> (value, created, accessed)
+        self._memory = LRUCache(memory_capacity)
+        self._stats = CacheStats()
+        self._writes = 0
+        self._lock = Lock()
+        self._db = connect_sqlite(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS response_cache ("
+                         "namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                         "value TEXT NOT NULL, created REAL NOT NULL, "
+                         "accessed REAL NOT NULL, "
+                         "PRIMARY KEY (namespace, key))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS response_cache_accessed "
+                         "ON response_cache (namespace, accessed)")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Lookup a cached response
+        :param key: a key in the key-value pair (i.e. a prompt)
+        :return: the cached response or None
+        """
+        now = time()
+        entry = self._memory.get(key)
+        if entry is not None and self.ttl is not None and \
+                now - entry[1] > self.ttl:
+            self._memory.pop(key)
+            entry = None
+        if entry is None:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT value, created, accessed FROM response_cache "
+                    "WHERE namespace=? AND key=?",
+                    (self.namespace, key)).fetchone()
+                if row is None or (self.ttl is not None and
+                                   now - row[1] > self.ttl):
+                    self._stats.misses += 1
+                    return None
+            entry = row
+            self._memory.put(key, entry)
+        value, created, accessed = entry
+        touch = now - accessed > self.touch_interval
+        with self._lock:
+            if touch:
+                self._db.execute("UPDATE response_cache SET accessed=? "
+                                 "WHERE namespace=? AND key=?",
+                                 (now, self.namespace, key))
+            self._stats.hits += 1
+        if touch:
+            self._memory.put(key, (value, created, now))
+        return value
+
+    def put(self, key: str, value: Optional[str]) -> None:
+        """
+        Cache a response, replacing any response cached for the key. None
+        values are not cached, since `get` returns None for missing keys.
+        :param key: a key to use in the cache (i.e. a prompt)
+        :param value: a response associated with the key
+        """
+        if value is None:
+            return
+        now = time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO response_cache (namespace, key, value, "
+                "created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, value, now, now))
+            self._writes += 1
+            maintain = self._writes % self.maintenance_interval == 0
+        self._memory.put(key, (value, now, now))
+        if maintain:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired responses and the least recently used responses
+        exceeding `capacity`
+        :return: number of responses removed
+        """
+        with self._lock:
+            removed = 0
+            if self.ttl is not None:
+                removed = self._db.execute(
+                    "DELETE FROM response_cache WHERE namespace=? AND "
+                    "created<?", (self.namespace, time() - self.ttl)).rowcount
+                self._stats.expirations += removed
+            evicted = self._db.execute(
+                "DELETE FROM response_cache WHERE namespace=? AND key IN ("
+                "SELECT key FROM response_cache WHERE namespace=? "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.capacity)).rowcount
+            self._stats.evictions += evicted
+        if removed or evicted:
+            self._memory.clear()
+        return removed + evicted
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Get hit, miss and eviction counts of this process
+        """
+        return self._stats
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created FROM response_cache "
+                "WHERE namespace=? AND key=?", (self.namespace, key)).fetchone()
+        return row is not None and (self.ttl is None or
+                                    time() - row[0] <= self.ttl)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM response_cache WHERE namespace=?",
+                (self.namespace,)).fetchone()[0]
+
+    def clear(self) -> None:
+        """
+        Remove all cached responses in this namespace
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM response_cache WHERE namespace=?",
+                             (self.namespace,))
+        self._memory.clear()
+
+    def close(self):
+        """
+        Close the database connection
+        """
+        with self._lock:
+            self._db.close()
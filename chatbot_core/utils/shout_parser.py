@@ -0,0 +1,274 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import re
+
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from chatbot_core.utils.enum import ConversationControls, ShoutType
+
+PROMPT_PREFIX = "!PROMPT:"
+_PARTICIPANT_SEP = re.compile("[, ]")
+
+# Module-level names avoid class attribute lookups for every shout
+_WAIT = ConversationControls.WAIT
+_DISC = ConversationControls.DISC
+_VOTE = ConversationControls.VOTE
+_PICK = ConversationControls.PICK
+_RESP = ConversationControls.RESP
+_HIST = ConversationControls.HIST
+_NEXT = ConversationControls.NEXT
+_SHOUT_TYPES = {_WAIT: ShoutType.WAIT, _DISC: ShoutType.DISC,
+                _VOTE: ShoutType.VOTE, _PICK: ShoutType.PICK}
+_OTHER = ShoutType.OTHER
+
+
+@lru_cache(maxsize=1024)
+def normalize_nick(nick: str) -> Tuple[str, str, bool]:
+    """
+    Normalizes a nick for comparison; results are cached since a
+    conversation only includes a handful of users.
+    :param nick: raw nick, optionally including a `#` suffix
+    :return: cleaned nick, lowercase cleaned nick, True if nick is a proctor
+        by the default `ChatBot._user_is_proctor` check
+    """
+    clean = nick.split("#")[0] if "#" in nick else nick
+    lowered = clean.lower()
+    return clean, lowered, "proctor" in lowered
+
+
+class ParsedShout:
+    """
+    Result of parsing a shout once for all control message checks
+    """
+    __slots__ = ('user', 'user_lower', 'from_proctor', 'mentioned',
+                 'message', 'shout', 'lowered', 'shout_type')
+
+    def __init__(self, user: str, user_lower: str, from_proctor: bool,
+                 mentioned: bool, message: str, shout: str, lowered: str,
+                 shout_type: ShoutType):
+        self.user = user
+        self.user_lower = user_lower
+        self.from_proctor = from_proctor
+        self.mentioned = mentioned
+        self.message = message
+        self.shout = shout
+        self.lowered = lowered
+        self.shout_type = shout_type
+
+    def get_participants(self) -> Set[str]:
+        """
+        Get the lowercase nicks named in a WAIT shout
+        :return: set of participant nicks
+        """
+        participants = self.shout[:-len(_WAIT)]
+        return set(participant.lower().strip()
+                   for participant in participants.split(","))
+
+    def get_named_nicks(self) -> Set[str]:
+        """
+        Get all lowercase words in this shout, split on commas and spaces
+        :return: set of words in this shout
+        """
+        return set(_PARTICIPANT_SEP.split(self.lowered))
+
+    def __repr__(self):
+        return f"ParsedShout({self.shout_type.name}, user={self.user}, " \
+               f"shout={self.shout!r})"
+
+
+def _lower_suffix(text: str, lowered: str, start: int) -> str:
+    """
+    Slice a lowercase string at the same index as its source, unless
+    lowering changed the string length.
+    """
+    if len(text) == len(lowered):
+        return lowered[start:]
+    return text[start:].lower()
+
+
+def classify_shout(shout: str, lowered: str, from_proctor: bool,
+                   is_prompt: Optional[Callable[[str], bool]] = None) \
+        -> ShoutType:
+    """
+    Classify a shout by the ConversationControls it contains. Checks are
+    ordered to match the order they are handled in `v1.ChatBot.handle_shout`
+    :param shout: normalized shout text
+    :param lowered: lowercase shout text
+    :param from_proctor: True if the shout was sent by a proctor
+    :param is_prompt: optional function to determine if a shout is a prompt,
+        default checks for `PROMPT_PREFIX`
+    :return: ShoutType of the shout
+    """
+    if from_proctor:
+        if shout.endswith(_WAIT):
+            return _SHOUT_TYPES[_WAIT]
+        for control in (_DISC, _VOTE, _PICK):
+            if shout.startswith(control):
+                return _SHOUT_TYPES[control]
+    if _HIST in lowered:
+        return ShoutType.HIST
+    if is_prompt(shout) if is_prompt else shout.startswith(PROMPT_PREFIX):
+        return ShoutType.PROMPT
+    if from_proctor and _RESP in shout:
+        return ShoutType.RESP
+    if shout == _NEXT:
+        return ShoutType.NEXT
+    return _OTHER
+
+
+def parse_shout(user: str, shout: str, nick: Optional[str] = None,
+                is_prompt: Optional[Callable[[str], bool]] = None,
+                is_proctor: Optional[Callable[[str], bool]] = None,
+                nick_index: Optional['NickIndex'] = None) -> ParsedShout:
+    """
+    Parse an incoming shout into a ParsedShout. The shout is lowercased once
+    and `@nick` mentions and `!prompt:` prefixes are normalized.
+    :param user: user associated with shout
+    :param shout: text shouted by user
+    :param nick: nick of the bot handling this shout, used to detect mentions
+    :param is_prompt: optional function to determine if a normalized shout is
+        a prompt (i.e. `ChatBot._shout_is_prompt`)
+    :param is_proctor: optional function to determine if a nick without its
+        `#` suffix belongs to a proctor (i.e. `ChatBot._user_is_proctor`)
+    :param nick_index: optional NickIndex of the bot handling this shout,
+        used to detect mentions of `nick`
+    :return: ParsedShout
+    """
+    lowered = shout.lower()
+    message = shout
+    mentioned = False
+    if nick:
+        mentioned = nick_index.is_mention(lowered, nick) if nick_index \
+            else lowered.startswith(f"@{nick.lower()}")
+        if mentioned and " " in shout:
+            idx = shout.index(" ") + 1
+            message = shout[idx:]
+            lowered = _lower_suffix(shout, lowered, idx)
+
+    text = message
+    if not text.startswith(PROMPT_PREFIX) and lowered.startswith("!prompt:"):
+        text = f"{PROMPT_PREFIX}{text.split(':', 1)[1].strip()}"
+        lowered = text.lower()
+
+    user, user_lower, from_proctor = normalize_nick(user)
+    if is_proctor:
+        from_proctor = is_proctor(user)
+    return ParsedShout(user, user_lower, from_proctor, mentioned, message,
+                       text, lowered, classify_shout(text, lowered,
+                                                     from_proctor, is_prompt))
+
+
+class NickIndex:
+    def __init__(self):
+        """
+        Lowercase index of the nicks in a conversation, updated only when
+        conversation membership changes. An index is `stale` until it is
+        first updated and after it is invalidated.
+        """
+        self.stale = True
+        self._nicks: Dict[str, Tuple[int, str]] = dict()
+        # Copies of the indexed lists, compared to detect in-place changes
+        self._users: Optional[List[str]] = None
+        self._facilitator_nicks: Optional[List[str]] = None
+        self._facilitators: Set[str] = set()
+        self._mention: Tuple[Optional[str], str] = (None, "")
+
+    def update(self, users: Optional[List[str]]) -> bool:
+        """
+        Update the index from the list of users in the conversation
+        :param users: nicks of users in the conversation
+        :return: True if the index was rebuilt
+        """
+        users = users or []
+        self.stale = False
+        if users == self._users:
+            return False
+        nicks = dict()
+        for position, nick in enumerate(users):
+            nicks.setdefault(nick.lower(), (position, nick))
+        self._nicks = nicks
+        self._users = list(users)
+        return True
+
+    def add(self, nick: str) -> bool:
+        """
+        Add a user who joined the conversation after the users indexed
+        :param nick: nick of the user to add
+        :return: True if the user was not already indexed
+        """
+        if nick.lower() in self._nicks:
+            return False
+        if self._users is None:
+            self._users = list()
+        self._nicks[nick.lower()] = (len(self._users), nick)
+        self._users.append(nick)
+        return True
+
+    def invalidate(self):
+        """
+        Mark the index `stale` when the conversation's users were replaced,
+        so it is updated before it is next used
+        """
+        self.stale = True
+
+    def find_nick(self, tokens: Iterable[str]) -> Optional[str]:
+        """
+        Find the first conversation user named in a list of lowercase tokens
+        :param tokens: lowercase words of a shout
+        :return: nick of the user listed first in the conversation, else None
+        """
+        found = None
+        for token in tokens:
+            match = self._nicks.get(token)
+            if match and (not found or match[0] < found[0]):
+                found = match
+        return found[1] if found else None
+
+    def is_facilitator(self, nick: str, facilitators: List[str]) -> bool:
+        """
+        Check if a lowercase nick belongs to a facilitator
+        :param nick: lowercase nick to check
+        :param facilitators: nicks of facilitators (proctor, scorekeeper...),
+            indexed again only when the list changes
+        :return: True if nick is a facilitator
+        """
+        if facilitators != self._facilitator_nicks:
+            self._facilitators = set(f.lower() for f in facilitators)
+            self._facilitator_nicks = list(facilitators)
+        return nick in self._facilitators
+
+    def is_mention(self, lowered: str, nick: str) -> bool:
+        """
+        Check if a lowercase shout is directed at a nick
+        :param lowered: lowercase shout
+        :param nick: nick to check for, i.e. of the bot handling the shout
+        :return: True if the shout starts with `@nick`
+        """
+        mention = self._mention
+        if mention[0] != nick:
+            mention = self._mention = (nick, f"@{nick.lower()}")
+        return lowered.startswith(mention[1])
+
+    def __contains__(self, nick: str) -> bool:
+        return nick.lower() in self._nicks
+
+    def __len__(self):
+        return len(self._nicks)
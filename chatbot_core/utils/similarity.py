@@ -0,0 +1,437 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import random
+import re
+
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import (Callable, Dict, Hashable, List, Mapping, Optional,
+                    Sequence, Tuple)
+
+from ovos_utils.log import LOG
+
+from chatbot_core.utils.edit_distance import bounded_damerau_levenshtein
+from chatbot_core.utils.hashing_vectorizer import HashingVectorizer
+from chatbot_core.utils.tfidf import TfidfVectorizer
+
+# Algorithms score each option against a sentence; higher scores are closer
+Algorithm = Callable[['SimilarityEngine', str, Sequence[str]],
+                     List[Optional[float]]]
+_algorithms: Dict[str, Algorithm] = dict()
+_closest_algorithms: Dict[str, Algorithm] = dict()
+# Algorithms for which the first of several closest options is picked
+_ordered_ties = set()
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]+")
+
+
+def register_algorithm(name: str, random_ties: bool = True) -> \
+        Callable[[Algorithm], Algorithm]:
+    """
+    Decorator to register a similarity algorithm by name. The decorated
+    function accepts an engine, a sentence and a sequence of option texts and
+    returns a score for each option (None to exclude an option), where higher
+    scores are more similar.
+    :param name: algorithm name passed to `SimilarityEngine.score`
+    :param random_ties: if False, `closest` picks the first of several
+        equally close options instead of a random one
+    """
+    def register(func: Algorithm) -> Algorithm:
+        _algorithms[name] = func
+        if random_ties:
+            _ordered_ties.discard(name)
+        else:
+            _ordered_ties.add(name)
+        return func
+    return register
+
+
+def register_closest(name: str) -> Callable[[Algorithm], Algorithm]:
+    """
+    Decorator to register a faster variant of a similarity algorithm for
+    `SimilarityEngine.closest`. The variant may return None for any option
+    that scores lower than another option, i.e. to stop computing distances
+    that already exceed the best distance found.
+    :param name: name of the registered algorithm to speed up
+    """
+    def register(func: Algorithm) -> Algorithm:
+        _closest_algorithms[name] = func
+        return func
+    return register
+
+
+def get_algorithms() -> List[str]:
+    """
+    Get the names of all registered similarity algorithms
+    """
+    return list(_algorithms.keys())
+
+
+def _pick_closest(algorithm: str,
+                  scores: Optional[Dict[str, float]]) -> Optional[str]:
+    if not scores:
+        return None
+    max_score = max(scores.values())
+    closest = [option for option, score in scores.items()
+               if score == max_score]
+    if algorithm in _ordered_ties:
+        return closest[0]
+    return random.choice(closest)
+
+
+def _regex_tokenize(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text)
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Callable[[str], List[str]]:
+    """
+    Load the word tokenizer once per process. Uses `nltk.word_tokenize` if
+    `nltk` and its tokenizer data are available, else a regex tokenizer.
+    """
+    try:
+        from nltk import word_tokenize
+    except ImportError:
+        LOG.warning("`nltk` not installed. install "
+                    "`chatbot-core[lang]` to install NLU packages.")
+        return _regex_tokenize
+    try:
+        word_tokenize("test")
+    except LookupError:
+        import nltk
+        for package in ("punkt", "punkt_tab"):
+            nltk.download(package, quiet=True)
+        try:
+            word_tokenize("test")
+        except LookupError:
+            LOG.warning("`nltk` tokenizer data not available, using a "
+                        "regex tokenizer")
+            return _regex_tokenize
+    return word_tokenize
+
+
+class SimilarityEngine:
+    def __init__(self, cache_size: int = 4096):
+        """
+        Scores options against a sentence with a registered algorithm.
+        Normalized and tokenized texts are cached, so options scored for
+        several sentences (i.e. once per vote) are only tokenized once.
+        :param cache_size: maximum number of texts to keep tokenized forms of
+        """
+        self.cache_size = cache_size
+        self.tfidf = TfidfVectorizer()
+        self.hashing = HashingVectorizer()
+        self._tokens: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize text for comparison
+        :param text: raw text
+        :return: lowercase text without surrounding whitespace
+        """
+        return text.lower().strip()
+
+    def _cached(self, key: Hashable, func: Callable[[], tuple]) -> tuple:
+        with self._lock:
+            value = self._tokens.get(key)
+            if value is not None:
+                self._tokens.move_to_end(key)
+                return value
+        value = func()
+        with self._lock:
+            self._tokens[key] = value
+            if len(self._tokens) > self.cache_size:
+                self._tokens.popitem(last=False)
+        return value
+
+    def tokenize(self, text: str) -> Tuple[str, ...]:
+        """
+        Get the normalized tokens of some text
+        :param text: raw text
+        :return: tuple of lowercase tokens
+        """
+        return self._cached(text, lambda: tuple(get_tokenizer()(
+            self.normalize(text))))
+
+    def char_ngrams(self, text: str, n: int = 3) -> Tuple[str, ...]:
+        """
+        Get the character n-grams of some normalized text, padded with a
+        space so that short texts and word boundaries are represented
+        :param text: raw text
+        :param n: number of characters per n-gram
+        :return: tuple of n-grams in the order they occur
+        """
+        def get_ngrams():
+            padded = f" {' '.join(self.normalize(text).split())} "
+            return tuple(padded[i:i + n]
+                         for i in range(max(len(padded) - n + 1, 1)))
+        return self._cached(("char", n, text), get_ngrams)
+
+    def within_distance(self, sentence: str, options: Mapping[str, str],
+                        max_distance: int) -> Dict[str, int]:
+        """
+        Get the Damerau-Levenshtein distance of each option that is within
+        `max_distance` edits of a sentence. Distances are only computed up to
+        `max_distance`, so distant options are rejected early.
+        :param sentence: base sentence
+        :param options: dict of option ID to response to compare
+        :param max_distance: maximum number of edits
+        :return: dict of option ID to distance for options within range
+        """
+        distances = dict()
+        for option, text in options.items():
+            distance = bounded_damerau_levenshtein(text, sentence,
+                                                   max_distance)
+            if distance is not None:
+                distances[option] = distance
+        return distances
+
+    def hashed_ngrams(self, text: str) -> Tuple[int, ...]:
+        """
+        Get the hashed feature indices of the character n-grams of some text
+        :param text: raw text
+        :return: tuple of feature indices of `self.hashing`
+        """
+        hashing = self.hashing
+        return self._cached(
+            ("hashed", hashing.n, hashing.n_features, text),
+            lambda: hashing.indices(self.char_ngrams(text, hashing.n)))
+
+    def clear_cache(self):
+        """
+        Remove all cached texts
+        """
+        with self._lock:
+            self._tokens.clear()
+
+    def score(self, algorithm: str, sentence: str,
+              options: Mapping[str, str]) -> Optional[Dict[str, float]]:
+        """
+        Score all options against a sentence in one call
+        :param algorithm: name of a registered algorithm
+        :param sentence: base sentence
+        :param options: dict of option ID to response to compare
+        :return: dict of option ID to score (higher is closer), excluding
+            options the algorithm cannot score; None if the algorithm is
+            unknown or unavailable
+        """
+        return self._score(_algorithms.get(algorithm), algorithm, sentence,
+                           options)
+
+    def _score(self, func: Optional[Algorithm], algorithm: str,
+               sentence: str, options: Mapping[str, str]) -> \
+            Optional[Dict[str, float]]:
+        if not func:
+            LOG.error(f'Unknown algorithm supplied:{algorithm}')
+            return None
+        option_ids = list(options.keys())
+        try:
+            scores = func(self, sentence, [options[o] for o in option_ids])
+        except ImportError as e:
+            LOG.warning(f"{e}. install `chatbot-core[lang]` to install NLU "
+                        f"packages.")
+            return None
+        return {option: score for option, score in zip(option_ids, scores)
+                if score is not None}
+
+    def closest(self, algorithm: str, sentence: str,
+                options: Mapping[str, str]) -> Optional[str]:
+        """
+        Determine which option is most similar to a sentence. Ties are
+        broken randomly, unless the algorithm was registered with
+        `random_ties=False`.
+        :param algorithm: name of a registered algorithm
+        :param sentence: base sentence
+        :param options: dict of option ID to response to compare
+        :return: ID of the closest option, None if no option could be scored
+        """
+        func = _closest_algorithms.get(algorithm) or \
+            _algorithms.get(algorithm)
+        return _pick_closest(algorithm,
+                             self._score(func, algorithm, sentence, options))
+
+
+class PromptSimilarityCache:
+    def __init__(self, engine: Optional[SimilarityEngine] = None,
+                 max_prompts: int = 16):
+        """
+        Caches similarity scores per prompt, keyed by hashes of the sentence
+        and option texts, so options scored while discussing a prompt are
+        not scored again while voting on it.
+        :param engine: engine to score options with, default a shared engine
+        :param max_prompts: maximum number of open prompts to keep scores of
+        """
+        self.engine = engine or get_similarity_engine()
+        self.max_prompts = max_prompts
+        self._prompts: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self._prompts
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+    def score(self, prompt_id: str, algorithm: str, sentence: str,
+              options: Mapping[str, str]) -> Optional[Dict[str, float]]:
+        """
+        Score options against a sentence, reusing scores cached for a prompt
+        :param prompt_id: ID of the prompt the options were proposed for
+        :param algorithm: name of a registered algorithm
+        :param sentence: base sentence
+        :param options: dict of option ID to response to compare
+        :return: dict of option ID to score as `SimilarityEngine.score`
+        """
+        with self._lock:
+            scores = self._prompts.get(prompt_id)
+            if scores is None:
+                scores = self._prompts[prompt_id] = dict()
+                if len(self._prompts) > self.max_prompts:
+                    self._prompts.popitem(last=False)
+            else:
+                self._prompts.move_to_end(prompt_id)
+            sentence_hash = hash(sentence)
+            keys = {option: (algorithm, sentence_hash, hash(text))
+                    for option, text in options.items()}
+            missing = {option: options[option]
+                       for option, key in keys.items() if key not in scores}
+        if missing:
+            new_scores = self.engine.score(algorithm, sentence, missing)
+            if new_scores is None:
+                return None
+            with self._lock:
+                for option in missing:
+                    # Options the algorithm cannot score are cached as None
+                    scores[keys[option]] = new_scores.get(option)
+        return {option: scores[key] for option, key in keys.items()
+                if scores.get(key) is not None}
+
+    def closest(self, prompt_id: str, algorithm: str, sentence: str,
+                options: Mapping[str, str]) -> Optional[str]:
+        """
+        Determine which option is most similar to a sentence, reusing scores
+        cached for a prompt. Ties are broken as in `SimilarityEngine.closest`.
+        :param prompt_id: ID of the prompt the options were proposed for
+        :param algorithm: name of a registered algorithm
+        :param sentence: base sentence
+        :param options: dict of option ID to response to compare
+        :return: ID of the closest option, None if no option could be scored
+        """
+        return _pick_closest(algorithm, self.score(prompt_id, algorithm,
+                                                   sentence, options))
+
+    def close(self, prompt_id: str):
+        """
+        Remove the scores cached for a prompt once it is closed
+        :param prompt_id: ID of the closed prompt
+        """
+        with self._lock:
+            self._prompts.pop(prompt_id, None)
+
+
+@lru_cache(maxsize=1)
+def get_similarity_engine() -> SimilarityEngine:
+    """
+    Get an engine shared within this process
+    """
+    return SimilarityEngine()
+
+
+@register_algorithm("random")
+def random_similarity(engine: SimilarityEngine, sentence: str,
+                      options: Sequence[str]) -> List[float]:
+    return [0.0] * len(options)
+
+
+@register_algorithm("bleu_score")
+def bleu_similarity(engine: SimilarityEngine, sentence: str,
+                    options: Sequence[str]) -> List[Optional[float]]:
+    from nltk.translate.bleu_score import sentence_bleu
+    reference = [engine.tokenize(sentence)]
+    scores = list()
+    for option in options:
+        hypothesis = engine.tokenize(option)
+        if not hypothesis:
+            scores.append(None)
+            continue
+        n = min(len(reference[0]), len(hypothesis), 4)
+        weights = (1.0 / n,) * n if n else (0.25,) * 4
+        scores.append(sentence_bleu(reference, hypothesis, weights=weights))
+    return scores
+
+
+@register_algorithm("damerau_levenshtein_distance", random_ties=False)
+def damerau_levenshtein_similarity(engine: SimilarityEngine, sentence: str,
+                                   options: Sequence[str]) -> List[float]:
+    try:
+        from jellyfish import damerau_levenshtein_distance
+    except ImportError:
+        damerau_levenshtein_distance = bounded_damerau_levenshtein
+    return [-damerau_levenshtein_distance(option, sentence)
+            for option in options]
+
+
+@register_closest("damerau_levenshtein_distance")
+def closest_damerau_levenshtein(engine: SimilarityEngine, sentence: str,
+                                options: Sequence[str]) -> \
+        List[Optional[float]]:
+    # Options are bounded by the best distance so far; ties are kept
+    scores = list()
+    best = None
+    for option in sorted(range(len(options)),
+                         key=lambda i: abs(len(options[i]) - len(sentence))):
+        distance = bounded_damerau_levenshtein(options[option], sentence,
+                                               best)
+        if distance is not None:
+            best = distance
+        scores.append((option, distance))
+    scores.sort()
+    return [-distance if distance is not None else None
+            for _, distance in scores]
+
+
+@register_algorithm("jaccard")
+def jaccard_similarity(engine: SimilarityEngine, sentence: str,
+                       options: Sequence[str]) -> List[float]:
+    tokens = set(engine.tokenize(sentence))
+    scores = list()
+    for option in options:
+        option_tokens = set(engine.tokenize(option))
+        union = len(tokens | option_tokens)
+        scores.append(len(tokens & option_tokens) / union if union else 0.0)
+    return scores
+
+
+@register_algorithm("tfidf_cosine")
+def tfidf_cosine_similarity(engine: SimilarityEngine, sentence: str,
+                            options: Sequence[str]) -> List[Optional[float]]:
+    return engine.tfidf.similarity(engine.tokenize(sentence),
+                                   [engine.tokenize(option)
+                                    for option in options])
+
+
+@register_algorithm("hashed_ngram_cosine")
+def hashed_ngram_similarity(engine: SimilarityEngine, sentence: str,
+                            options: Sequence[str]) -> List[Optional[float]]:
+    return engine.hashing.similarity(engine.hashed_ngrams(sentence),
+                                     [engine.hashed_ngrams(option)
+                                      for option in options])
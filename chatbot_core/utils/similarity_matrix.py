@@ -0,0 +1,187 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ovos_utils.log import LOG
+
+from chatbot_core.utils.similarity import SimilarityEngine, \
+    get_similarity_engine
+
+METRICS = ("cosine", "jaccard")
+FEATURES = ("char", "token")
+# Maximum number of count matrix entries held in memory at once
+_SLICE_SIZE = 1 << 20
+
+
+class SimilarityMatrix:
+    """
+    Read-only square matrix of pairwise similarities between options,
+    labelled by option ID. Values are in the range 0-1 and higher values are
+    more similar.
+    """
+    __slots__ = ('labels', 'values', '_index')
+
+    def __init__(self, labels: Sequence[str], values):
+        """
+        :param labels: option IDs in matrix order
+        :param values: numpy array of shape (len(labels), len(labels))
+        """
+        self.labels: Tuple[str, ...] = tuple(labels)
+        self.values = values
+        self.values.flags.writeable = False
+        self._index = {label: i for i, label in enumerate(self.labels)}
+
+    def __getitem__(self, key: Tuple[str, str]) -> float:
+        first, second = key
+        return float(self.values[self._index[first], self._index[second]])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._index
+
+    @property
+    def distances(self):
+        """
+        Get pairwise distances (1 - similarity) as a numpy array
+        """
+        return 1.0 - self.values
+
+    def row(self, label: str) -> Dict[str, float]:
+        """
+        Get the similarity of one option to every option
+        :param label: option ID
+        :return: dict of option ID to similarity
+        """
+        row = self.values[self._index[label]]
+        return {other: float(row[i]) for i, other in enumerate(self.labels)}
+
+    def totals(self, among: Optional[Sequence[str]] = None) -> \
+            Dict[str, float]:
+        """
+        Get the total similarity of each option to the other options
+        :param among: option IDs to compare with, default all options
+        :return: dict of option ID to summed similarity, excluding itself
+        """
+        columns = [self._index[label] for label in among] \
+            if among is not None else slice(None)
+        totals = self.values[:, columns].sum(axis=1)
+        if among is None:
+            totals = totals - self.values.diagonal()
+        else:
+            totals = totals - [self.values[i, i] if label in among else 0.0
+                               for i, label in enumerate(self.labels)]
+        return {label: float(totals[i]) for i, label in enumerate(self.labels)}
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {label: self.row(label) for label in self.labels}
+
+
+def _get_features(engine: SimilarityEngine, texts: Sequence[str],
+                  features: str, n: int) -> List[Tuple[str, ...]]:
+    if features == "char":
+        return [engine.char_ngrams(text, n) for text in texts]
+    return [engine.tokenize(text) for text in texts]
+
+
+def pairwise_similarity(options: Mapping[str, str], metric: str = "cosine",
+                        features: str = "char", n: int = 3,
+                        engine: Optional[SimilarityEngine] = None) -> \
+        Optional[SimilarityMatrix]:
+    """
+    Compare every option with every other option in one vectorized pass
+    :param options: dict of option ID to response (i.e. proposed_responses)
+    :param metric: `cosine` of feature counts or `jaccard` of feature sets
+    :param features: `char` n-grams or word `token`s
+    :param n: number of characters per n-gram for `char` features
+    :param engine: engine to cache features with, default a shared engine
+    :return: labelled similarity matrix, None if numpy is not available
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if features not in FEATURES:
+        raise ValueError(f"Unknown features: {features}")
+    try:
+        import numpy as np
+    except ImportError:
+        LOG.warning("`numpy` not installed. install "
+                    "`chatbot-core[lang]` to install NLU packages.")
+        return None
+    engine = engine or get_similarity_engine()
+    labels = list(options.keys())
+    grams = _get_features(engine, [options[label] for label in labels],
+                          features, n)
+
+    # Count features per option in slices of the vocabulary, so the whole
+    # (options x vocabulary) count matrix is never built
+    vocabulary = dict()
+    rows, columns = list(), list()
+    for row, option_grams in enumerate(grams):
+        for gram in option_grams:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(gram, len(vocabulary)))
+    products = _gram(np.asarray(rows, dtype=np.intp),
+                     np.asarray(columns, dtype=np.intp), len(labels),
+                     len(vocabulary), binary=metric == "jaccard")
+
+    sizes = products.diagonal()
+    if metric == "cosine":
+        norms = np.sqrt(sizes)
+        scale = norms[:, None] * norms[None, :]
+        values = np.clip(np.divide(products, scale,
+                                   out=np.zeros_like(products),
+                                   where=scale > 0), 0.0, 1.0)
+    else:
+        union = sizes[:, None] + sizes[None, :] - products
+        values = np.divide(products, union, out=np.zeros_like(products),
+                           where=union > 0)
+    return SimilarityMatrix(labels, values)
+
+
+def _gram(rows, columns, size: int, num_columns: int,
+          binary: bool = False):
+    """
+    Get the dot products between the rows of a sparse count matrix, counting
+    `_SLICE_SIZE` matrix entries at a time with `bincount`
+    :param rows: row index of each counted feature
+    :param columns: column index of each counted feature
+    :param size: number of rows
+    :param num_columns: number of columns
+    :param binary: if True, count only whether each feature is present
+    :return: numpy array of shape (size, size)
+    """
+    import numpy as np
+    products = np.zeros((size, size))
+    width = max(_SLICE_SIZE // max(size, 1), 1)
+    if num_columns > width:
+        # Sort features by column so each slice is a contiguous range
+        order = np.argsort(columns, kind="stable")
+        rows, columns = rows[order], columns[order]
+    for first in range(0, num_columns, width):
+        span = min(width, num_columns - first)
+        start, end = np.searchsorted(columns, (first, first + span)) \
+            if span < num_columns else (0, len(columns))
+        counts = np.bincount(rows[start:end] * span +
+                             columns[start:end] - first,
+                             minlength=size * span).reshape(size, span)
+        counts = (counts > 0 if binary else counts).astype(float)
+        products += counts @ counts.T
+    return products
@@ -0,0 +1,44 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import sqlite3
+
+from os import makedirs
+from os.path import dirname, expanduser
+
+
+def connect_sqlite(path: str, timeout: float = 5.0) -> sqlite3.Connection:
+    """
+    Open a sqlite database in WAL mode, so that several processes on a node
+    may read while one writes
+    :param path: path to the database file (created if it does not exist)
+    :param timeout: seconds to wait for a lock held by another process
+    :return: sqlite3.Connection usable from any thread; callers are
+        responsible for serializing access
+    """
+    path = expanduser(path)
+    if dirname(path):
+        makedirs(dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=timeout,
+                                 check_same_thread=False,
+                                 isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+    return connection
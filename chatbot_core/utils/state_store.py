@@ -0,0 +1,219 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+from abc import ABC, abstractmethod
+from os.path import join
+from threading import Lock
+from time import time
+from typing import Dict, Optional
+
+from ovos_utils.log import LOG
+from ovos_utils.xdg_utils import xdg_state_home
+
+from chatbot_core.utils.cache import LRUCache
+from chatbot_core.utils.sqlite_utils import connect_sqlite
+
+
+class StateStore(ABC):
+    """
+    Storage for the state of each conversation a bot participates in.
+    States are stored as int `ConversationState` values by cid.
+    """
+
+    @abstractmethod
+    def get(self, cid: str, default: Optional[int] = None) -> Optional[int]:
+        """
+        Get the state of a conversation
+        :param cid: conversation ID
+        :param default: value to return if `cid` is not stored
+        :return: int ConversationState value or `default`
+        """
+
+    @abstractmethod
+    def set(self, cid: str, state: int):
+        """
+        Set the state of a conversation
+        :param cid: conversation ID
+        :param state: int ConversationState value
+        """
+
+    @abstractmethod
+    def delete(self, cid: str):
+        """
+        Remove a conversation
+        :param cid: conversation ID
+        """
+
+    @abstractmethod
+    def items(self) -> Dict[str, int]:
+        """
+        Get all stored conversations
+        :return: dict of cid to int ConversationState value
+        """
+
+    def close(self):
+        """
+        Release any resources held by this store
+        """
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local state store"""
+
+    def __init__(self):
+        self._states = dict()
+
+    def get(self, cid: str, default: Optional[int] = None) -> Optional[int]:
+        return self._states.get(cid, default)
+
+    def set(self, cid: str, state: int):
+        self._states[cid] = int(state)
+
+    def delete(self, cid: str):
+        self._states.pop(cid, None)
+
+    def items(self) -> Dict[str, int]:
+        return dict(self._states)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    State store backed by a sqlite database in WAL mode, which may be shared
+    by several bot processes on the same node. Reads are served from a local
+    cache for up to `cache_ttl` seconds, so changes made by other processes
+    are seen after at most `cache_ttl` seconds.
+
+    Replicas of a bot share the states of conversations in their namespace.
+    Each replica records which conversations it takes part in, so a
+    conversation's state is only removed once every replica has left it, and
+    a restarted replica only restores its own conversations.
+    """
+    _missing = object()
+
+    def __init__(self, path: str, namespace: str = "",
+                 cache_ttl: float = 1.0, replica: Optional[str] = None,
+                 cache_size: int = 1024):
+        """
+        :param path: path to the sqlite database file
+        :param namespace: namespace of stored states (i.e. a service name),
+            shared by replicas of the same bot
+        :param cache_ttl: seconds to serve states from the local cache
+        :param replica: name of this replica, unique among replicas sharing
+            the namespace and stable across restarts (required)
+        :param cache_size: maximum number of states to cache locally
+        """
+        if not replica:
+            # Replicas sharing a node-local database share a host name, so
+            # the host name cannot tell them apart
+            raise ValueError("A replica name is required for a sqlite state "
+                             "store")
+        self.path = path
+        self.namespace = namespace
+        self.cache_ttl = cache_ttl
+        self.replica = replica
+        # cid -> state or _missing
+        self._cache = LRUCache(cache_size, cache_ttl)
+        self._lock = Lock()
+        self._db = connect_sqlite(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS conversation_state ("
+                         "namespace TEXT NOT NULL, cid TEXT NOT NULL, "
+                         "state INTEGER NOT NULL, updated REAL NOT NULL, "
+                         "PRIMARY KEY (namespace, cid))")
+        self._db.execute("CREATE TABLE IF NOT EXISTS conversation_member ("
+                         "namespace TEXT NOT NULL, cid TEXT NOT NULL, "
+                         "replica TEXT NOT NULL, "
+                         "PRIMARY KEY (namespace, cid, replica))")
+
+    def get(self, cid: str, default: Optional[int] = None) -> Optional[int]:
+        state = self._cache.get(cid)
+        if state is None:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT state FROM conversation_state "
+                    "WHERE namespace=? AND cid=?",
+                    (self.namespace, cid)).fetchone()
+            state = row[0] if row else self._missing
+            self._cache.put(cid, state)
+        return default if state is self._missing else state
+
+    def set(self, cid: str, state: int):
+        state = int(state)
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT OR REPLACE INTO conversation_state (namespace, cid, "
+                "state, updated) VALUES (?, ?, ?, ?)",
+                (self.namespace, cid, state, time()))
+            self._db.execute(
+                "INSERT OR IGNORE INTO conversation_member (namespace, cid, "
+                "replica) VALUES (?, ?, ?)",
+                (self.namespace, cid, self.replica))
+        self._cache.put(cid, state)
+
+    def delete(self, cid: str):
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM conversation_member "
+                             "WHERE namespace=? AND cid=? AND replica=?",
+                             (self.namespace, cid, self.replica))
+            deleted = self._db.execute(
+                "DELETE FROM conversation_state WHERE namespace=? AND cid=? "
+                "AND NOT EXISTS (SELECT 1 FROM conversation_member "
+                "WHERE namespace=? AND cid=?)",
+                (self.namespace, cid, self.namespace, cid)).rowcount
+        if deleted:
+            self._cache.put(cid, self._missing)
+        else:
+            self._cache.pop(cid)
+
+    def items(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.cid, s.state FROM conversation_state s "
+                "JOIN conversation_member m ON m.namespace=s.namespace "
+                "AND m.cid=s.cid WHERE s.namespace=? AND m.replica=?",
+                (self.namespace, self.replica)).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def get_state_store(config: Optional[dict] = None,
+                    namespace: str = "") -> StateStore:
+    """
+    Get a state store from configuration
+    :param config: dict with `backend` (`memory` or `sqlite`) and backend
+        parameters (`path`, `cache_ttl`, `replica`, `cache_size`); `replica`
+        is required for the `sqlite` backend
+    :param namespace: namespace of stored states, shared by bot replicas
+    :return: StateStore instance
+    """
+    config = config or dict()
+    backend = config.get("backend", "memory")
+    if backend == "sqlite":
+        return SQLiteStateStore(
+            config.get("path") or join(xdg_state_home(), "neon",
+                                       "chatbot_state.db"),
+            namespace, config.get("cache_ttl", 1.0), config.get("replica"),
+            config.get("cache_size", 1024))
+    if backend != "memory":
+        LOG.error(f"Unknown state store backend: {backend}")
+    return InMemoryStateStore()
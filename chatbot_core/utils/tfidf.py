@@ -0,0 +1,173 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+from collections import Counter, OrderedDict
+from math import log, sqrt
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class TfidfVectorizer:
+    def __init__(self, max_documents: int = 10000,
+                 max_features: int = 100000):
+        """
+        Sparse TF-IDF vectorizer whose vocabulary and document frequencies
+        are updated incrementally as documents are observed, so it never
+        needs to be fit on a corpus up front.
+        :param max_documents: maximum number of distinct documents to
+            remember; documents seen again within this window are not
+            counted twice
+        :param max_features: number of terms after which the least frequent
+            terms are dropped, until 3/4 of this remain, before more
+            documents are observed
+        """
+        self.max_documents = max_documents
+        self.max_features = max_features
+        self.vocabulary: Dict[str, int] = dict()
+        self.documents = 0
+        self._frequencies: List[int] = list()
+        self._seen: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def partial_fit(self, documents: Iterable[Sequence[str]]) -> int:
+        """
+        Update the vocabulary and document frequencies with some documents
+        :param documents: tokenized documents
+        :return: number of documents that had not been seen before
+        """
+        added = 0
+        with self._lock:
+            # Prune before counting, so terms of these documents are kept
+            if len(self.vocabulary) >= self.max_features:
+                self._prune(self.max_features * 3 // 4)
+            for document in documents:
+                key = tuple(document)
+                if key in self._seen:
+                    self._seen.move_to_end(key)
+                    continue
+                self._seen[key] = None
+                if len(self._seen) > self.max_documents:
+                    self._seen.popitem(last=False)
+                for term in set(key):
+                    index = self.vocabulary.get(term)
+                    if index is None:
+                        self._frequencies.append(1)
+                        self.vocabulary[term] = len(self._frequencies) - 1
+                    else:
+                        self._frequencies[index] += 1
+                self.documents += 1
+                added += 1
+        return added
+
+    def _prune(self, size: int):
+        # Keep the most frequent terms, renumbered in their previous order
+        kept = sorted(self.vocabulary.items(),
+                      key=lambda item: -self._frequencies[item[1]])[:size]
+        kept.sort(key=lambda item: item[1])
+        self.vocabulary = {term: index
+                           for index, (term, _) in enumerate(kept)}
+        self._frequencies = [self._frequencies[index] for _, index in kept]
+
+    def _weigh(self, document: Sequence[str]) -> Dict[str, float]:
+        # Callers must hold `_lock`. Only the idf of terms in this document
+        # is computed, so weighing does not scale with the vocabulary
+        log_documents = log(1.0 + self.documents)
+        weights = dict()
+        for term, count in Counter(document).items():
+            index = self.vocabulary.get(term)
+            if index is not None:
+                weights[term] = count * (log_documents - log(
+                    1.0 + self._frequencies[index]) + 1.0)
+        norm = sqrt(sum(weight * weight for weight in weights.values()))
+        if norm:
+            for term in weights:
+                weights[term] /= norm
+        return weights
+
+    def idf(self):
+        """
+        Get smoothed inverse document frequencies of the whole vocabulary as
+        a numpy array indexed by vocabulary. Scoring does not use this, since
+        it takes time proportional to the vocabulary size.
+        """
+        import numpy as np
+        with self._lock:
+            frequencies = np.asarray(self._frequencies, dtype=float)
+            documents = self.documents
+        return np.log((1.0 + documents) / (1.0 + frequencies)) + 1.0
+
+    def _transform(self, documents: Sequence[Sequence[str]]) -> \
+            Tuple[object, object, object]:
+        # Callers must hold `_lock`
+        import numpy as np
+        rows, columns, weights = list(), list(), list()
+        for row, document in enumerate(documents):
+            for term, weight in self._weigh(document).items():
+                rows.append(row)
+                columns.append(self.vocabulary[term])
+                weights.append(weight)
+        return np.asarray(rows, dtype=np.intp), \
+            np.asarray(columns, dtype=np.intp), \
+            np.asarray(weights, dtype=float)
+
+    def transform(self, documents: Sequence[Sequence[str]]) -> \
+            Tuple[object, object, object]:
+        """
+        Get L2-normalized TF-IDF vectors of some documents in coordinate
+        form. Terms that are not in the vocabulary are ignored.
+        :param documents: tokenized documents
+        :return: arrays of row (document) indices, column (term) indices and
+            weights
+        """
+        with self._lock:
+            return self._transform(documents)
+
+    def similarity(self, query: Sequence[str],
+                   documents: Sequence[Sequence[str]]) -> \
+            List[Optional[float]]:
+        """
+        Observe a query and some documents, then get the cosine similarity
+        of each document to the query as one sparse matrix-vector product.
+        The query vector is looked up by the sorted columns of its terms
+        rather than expanded over the vocabulary, so scoring takes time
+        proportional to the number of stored document weights.
+        :param query: tokenized query
+        :param documents: tokenized documents to score
+        :return: similarity of each document (0-1), None for empty documents
+        """
+        import numpy as np
+        self.partial_fit([query, *documents])
+        # Weigh the query and documents with the same document frequencies
+        with self._lock:
+            _, query_columns, query_weights = self._transform([query])
+            rows, columns, weights = self._transform(documents)
+        products = np.zeros(len(documents))
+        if len(query_columns):
+            order = np.argsort(query_columns)
+            query_columns = query_columns[order]
+            query_weights = query_weights[order]
+            # Weight of the query for each stored document term, else 0
+            positions = np.searchsorted(query_columns, columns).clip(
+                max=len(query_columns) - 1)
+            matched = np.where(query_columns[positions] == columns,
+                               query_weights[positions], 0.0)
+            products = np.bincount(rows, weights=weights * matched,
+                                   minlength=len(documents))
+        return [min(float(score), 1.0) if document else None
+                for document, score in zip(documents, products)]
@@ -18,17 +18,21 @@
 # China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
 
 import random
-import re
 import time
 
-from copy import deepcopy
+from typing import Dict, List, Optional
 from engineio.socket import Socket
-from threading import Thread
+from threading import Event, Thread, local
+from uuid import uuid4
 from klat_connector.klat_api import KlatApi
 from klat_connector import start_socket
 from ovos_utils.log import LOG
 
-from chatbot_core.utils.enum import ConversationState, ConversationControls, BotTypes
+from chatbot_core.utils.enum import ConversationState, ConversationControls, BotTypes, ShoutType
+from chatbot_core.utils.conversation_utils import ConversationContext
+from chatbot_core.utils.history import HistoryArchive, HistoryBuffer
+from chatbot_core.utils.options import OptionsSnapshot
+from chatbot_core.utils.shout_parser import NickIndex, ParsedShout, PROMPT_PREFIX, parse_shout
 from chatbot_core.utils.string_utils import remove_prefix
 from chatbot_core.chatbot_abc import ChatBotABC
 
@@ -39,6 +43,23 @@ class ChatBot(KlatApi, ChatBotABC):
             self.parse_init(*args, **kwargs)
         ChatBotABC.__init__(self, username)
         self.log.info(f"Starting {username}")
+        # Histories are bounded so long-running bots use constant memory
+        history_config = self.bot_config.get("history") or {}
+        self.max_prompts = history_config.get("max_prompts", 1000)
+        self.history_archive = HistoryArchive(history_config["archive"]) \
+            if history_config.get("archive") else None
+        # Prompt state of the current conversation and of other conversations
+        # with an added context
+        self._default_context = ConversationContext(
+            max_prompts=self.max_prompts, archive=self.history_archive)
+        self.conversation_contexts: Dict[str, ConversationContext] = dict()
+        self._local = local()
+        # Set once the bot has logged in (or joined as a guest), or once its
+        # login has failed
+        self.login_complete = Event()
+        self.login_latency: Optional[float] = None
+        self.login_failed = False
+        self._login_started = time.monotonic()
         if not socket:
             from ovos_config.config import Configuration
             sio_config = Configuration().get("socket_io", {})
@@ -54,33 +75,40 @@ class ChatBot(KlatApi, ChatBotABC):
         self.bot_type = BotTypes.OBSERVER if is_prompter else (
             BotTypes.PROCTOR) if init_nick.lower() == "proctor" else (
             BotTypes.SUBMIND)
-        self.proposed_responses = dict()
-        self.selected_history = list()
+        self.selected_history = HistoryBuffer(
+            maxlen=self.max_prompts, name="selected_history",
+            archive=self.history_archive)
 
         self.username = username
         self.password = password or self.bot_config.get("password")
 
         self.facilitator_nicks = ["proctor", "scorekeeper", "stenographer"]
+        self._nick_index = NickIndex()
         self.response_probability = 75  # % probability for a bot to respond to an input in non-proctored conversation
 
         # Do klat initialization
-        klat_timeout = time.time() + 30
+        klat_timeout = time.monotonic() + 30
         if not self.klat_ready.wait(30):
             self.log.error("Klat connection timed out!")
         elif username and password:
             self.login_klat(username, password)
-            while self.logged_in != 2 and time.time() < klat_timeout:
-                time.sleep(1)
+            if not self.login_complete.wait(
+                    max(klat_timeout - time.monotonic(), 0)):
+                # Registration may finish without another login return
+                if self.logged_in != 2:
+                    self.log.error(f"Login timed out for {username}")
+                self._set_login_complete(self.logged_in == 2)
         else:
             self.enable_responses = True
             self.log.debug(f"Responses enabled for {self.nick}")
             self.on_login()
-        self.active_prompt = None
-        self.prompt_id = None
-        self.id_to_prompt = dict()
-        self.state = ConversationState.IDLE
-        self.request_history = list()
-        self.participant_history = [set()]
+            self._set_login_complete()
+        self.request_history = HistoryBuffer(
+            maxlen=self.max_prompts, name="request_history",
+            archive=self.history_archive)
+        self.participant_history = HistoryBuffer(
+            [set()], maxlen=self.max_prompts, name="participant_history",
+            archive=self.history_archive)
 
         self.initial_prompt = "Hello."
         self.fallback_responses = ("Huh?",
@@ -92,9 +120,162 @@ class ChatBot(KlatApi, ChatBotABC):
                                    "Sorry?",
                                    "Come again?")
 
+        self._shout_handlers = {
+            ShoutType.WAIT: self._handle_wait_shout,
+            ShoutType.DISC: self._handle_disc_shout,
+            ShoutType.VOTE: self._handle_vote_shout,
+            ShoutType.PICK: self._handle_pick_shout,
+            ShoutType.HIST: self._handle_hist_shout,
+            ShoutType.PROMPT: self._handle_prompt_shout,
+            ShoutType.RESP: self._handle_resp_shout,
+        }
+        self._state_handlers = {
+            ConversationState.RESP: self._handle_resp_state,
+            ConversationState.DISC: self._handle_disc_state,
+            ConversationState.VOTE: self._handle_vote_state,
+            ConversationState.PICK: self._handle_pick_state,
+        }
+
         self.shout_thread = Thread(target=self._handle_next_shout, daemon=True)
         self.shout_thread.start()
 
+    @property
+    def _context(self) -> ConversationContext:
+        """
+        Context of the conversation the current thread is handling a shout
+        from, else the context of the current conversation
+        """
+        return getattr(self._local, "context", None) or self._default_context
+
+    @property
+    def state(self) -> ConversationState:
+        return self._context.state
+
+    @state.setter
+    def state(self, state: ConversationState):
+        context = self._context
+        context.state = state
+        if state in (ConversationState.PICK, ConversationState.IDLE) and \
+                context.prompt_id:
+            self.similarity_cache.close(context.prompt_id)
+
+    @property
+    def active_prompt(self) -> Optional[str]:
+        return self._context.active_prompt
+
+    @active_prompt.setter
+    def active_prompt(self, prompt: Optional[str]):
+        self._context.active_prompt = prompt
+
+    @property
+    def prompt_id(self) -> Optional[str]:
+        return self._context.prompt_id
+
+    @prompt_id.setter
+    def prompt_id(self, prompt_id: Optional[str]):
+        self._context.prompt_id = prompt_id
+
+    @property
+    def _similarity_prompt_id(self) -> Optional[str]:
+        return self.prompt_id
+
+    @property
+    def proposed_responses(self) -> Dict[str, Dict[str, str]]:
+        return self._context.proposed_responses
+
+    @proposed_responses.setter
+    def proposed_responses(self, responses: Dict[str, Dict[str, str]]):
+        self._context.proposed_responses = responses
+
+    @property
+    def id_to_prompt(self) -> Dict[str, str]:
+        return self._context.id_to_prompt
+
+    @id_to_prompt.setter
+    def id_to_prompt(self, prompts: Dict[str, str]):
+        self._context.id_to_prompt = prompts
+
+    @property
+    def _users(self) -> Optional[List[str]]:
+        """
+        Nicks in the current conversation, as set by KlatApi when membership
+        of the conversation changes
+        """
+        return self._klat_users
+
+    @_users.setter
+    def _users(self, users: Optional[List[str]]):
+        self._klat_users = users
+        self._default_context.nick_index.invalidate()
+
+    @property
+    def conversation_users(self) -> list:
+        """
+        Returns a list of nicks in the conversation being handled
+        """
+        context = self._context
+        if context.cid is None:
+            return super().conversation_users
+        return context.users
+
+    @property
+    def conversation_is_proctored(self) -> bool:
+        """
+        Determines if there is a Proctor in the conversation being handled
+        """
+        context = self._context
+        if context.cid is None:
+            return super().conversation_is_proctored
+        return "proctor" in context.nick_index
+
+    def add_conversation_context(self, cid: str, dom: str,
+                                 users: Optional[List[str]] = None):
+        """
+        Keep a separate prompt state for shouts from a conversation other
+        than the current conversation; responses to them are sent back to
+        the same conversation. This does not join the conversation on the
+        server, which only sends shouts from the socket's current
+        conversation, so shouts for `cid` must be passed to
+        `handle_incoming_shout` by the caller.
+        :param cid: conversation ID to keep a context for
+        :param dom: domain of the conversation
+        :param users: nicks of users known to be in the conversation
+        """
+        if cid not in self.conversation_contexts:
+            self.conversation_contexts[cid] = ConversationContext(
+                cid, dom, users, self.max_prompts, self.history_archive)
+            self.log.info(f"Added context for conversation: {cid}")
+
+    def remove_conversation_context(self, cid: str):
+        """
+        Stop handling shouts from a conversation added with
+        `add_conversation_context`
+        :param cid: conversation ID to remove the context of
+        """
+        if self.conversation_contexts.pop(cid, None):
+            self.log.info(f"Removed context for conversation: {cid}")
+
+    def is_handled_cid(self, cid: str) -> bool:
+        """
+        Checks if a cid is the current conversation or has a context added
+        with `add_conversation_context`
+        :param cid: cid to check
+        :return: True if shouts from the conversation are handled
+        """
+        return cid in self.conversation_contexts or self.is_current_cid(cid)
+
+    def send_shout(self, shout: str, cid: str = None, dom: str = None, **kwargs):
+        """
+        Shout into the conversation being handled or else passed dom/cid
+        :param shout: text to shout
+        :param cid: CID to send shout into
+        :param dom: Domain associated with cid
+        """
+        if cid is None:
+            context = self._context
+            cid, dom = context.cid, dom or context.dom
+        KlatApi.send_shout(self, shout, cid, dom, **kwargs)
+
     def parse_init(self, *args, **kwargs) -> tuple:
         """Parses dynamic params input to ChatBot v1"""
         socket, domain, username, password, on_server, is_prompter = (list(args) + [None] * 6)[:6]
@@ -130,6 +311,27 @@ class ChatBot(KlatApi, ChatBotABC):
             self.log.debug(f"Responses enabled for {self.nick}")
         self.change_domain(self.start_domain)
         self.on_login()
+        if self.logged_in == 2:
+            self._set_login_complete()
+        elif status != 888:
+            self._set_login_complete(False)
+        else:
+            # Registration is in flight; wait for it to log in or time out
+            self.log.debug(f"Waiting for {self.username} to be registered")
+
+    def _set_login_complete(self, success: bool = True):
+        """
+        Signal threads waiting on `login_complete`, recording the login
+        latency if the bot logged in or `login_failed` if it did not
+        :param success: True if the bot logged in (or joined as a guest)
+        """
+        if self.login_latency is None:
+            self.login_failed = not success
+            if success:
+                self.login_latency = time.monotonic() - self._login_started
+                self.log.debug(f"{self.nick} logged in after "
+                               f"{round(self.login_latency, 3)}s")
+        self.login_complete.set()
 
     def handle_incoming_shout(self, user: str, shout: str, cid: str, dom: str, timestamp: str):
         """
@@ -144,56 +346,44 @@ class ChatBot(KlatApi, ChatBotABC):
 
     def handle_shout(self, user: str, shout: str, cid: str, dom: str, timestamp: str):
         """
-        Handles an incoming shout into the current conversation
+        Handles an incoming shout into the current conversation or a conversation with an added context
         :param user: user associated with shout
         :param shout: text shouted by user
         :param cid: cid shout belongs to
         :param dom: domain conversation belongs to
         :param timestamp: formatted timestamp of shout
         """
+        self._local.context = self.conversation_contexts.get(cid)
+        try:
+            self._handle_shout(user, shout, cid, dom, timestamp)
+        finally:
+            self._local.context = None
+
+    def _handle_shout(self, user: str, shout: str, cid: str, dom: str, timestamp: str):
+        """
+        Handles an incoming shout in the context of its conversation
+        """
         if not shout:
             self.log.error(f"No shout (user={user})")
             return
         if not self.nick:
             self.log.error(f"No nick! user is {self.username}")
             return
-        if not self.conversation_is_proctored and not self.is_prompter:
+        if not self.is_prompter and not self.conversation_is_proctored:
             self.log.warning("Un-proctored conversation!!")
-        # if not self.is_current_cid(cid):
 
+        parsed = parse_shout(user, shout, self.nick, self._shout_is_prompt,
+                             self._user_is_proctor, self._nick_index)
+        if self._context.cid is not None:
+            self._context.add_user(parsed.user)
         # Handle @user incoming shout
-        if shout.lower().startswith(f"@{self.nick.lower()}"):
-            try:
-                shout = f'{shout.split(" ", 1)[1]}'
-            except Exception as e:
-                self.log.error(e)
+        if parsed.mentioned:
+            if parsed.message is shout:
                 self.log.error(f'@user error: {shout}')
-
-            if self.bot_type == BotTypes.PROCTOR:
-                self.log.info("@Proctor shout incoming")
-                try:
-                    self.ask_proctor(shout, user, cid, dom)
-                except Exception as e:
-                    self.log.error(e)
-                    self.log.error(f'Ignoring incoming: {shout}')
-            elif self.bot_type == BotTypes.OBSERVER:
-                self.log.info("@observer shout incoming")
-                # TODO: Consider something here DM
-                # try:
-                #     shout = f'{shout.split(" ", 1)[1]}'
-                # except Exception as e:
-                #     self.log.error(e)
-                #     self.log.error(f'Ignoring incoming: {shout}')
-            elif self.bot_type == BotTypes.SUBMIND:
-                self.log.info(f"@bot shout incoming")
-                resp = self.at_chatbot(user, shout, timestamp)
-                if self.is_prompter:
-                    self.log.info(f"Prompter bot got reply: {shout}")
-                    # private_cid = self.get_private_conversation([user])
-                    self.send_shout(resp)
-                    return
+            if not self._handle_mention(parsed, cid, dom, timestamp):
+                return
         # Ignore anything from a different conversation that isn't @ this bot
-        elif not self.is_current_cid(cid):
+        elif not self.is_handled_cid(cid):
             if self.bot_type == BotTypes.PROCTOR and self._user_is_prompter(user):
                 self.ask_proctor(shout, user, cid, dom)
             else:
@@ -204,192 +394,293 @@ class ChatBot(KlatApi, ChatBotABC):
             self.log.debug(f"Outgoing shout ignored ({shout})")
             return
         # Handle a proctor response to a prompter
-        elif self._user_is_proctor(user) and self.is_prompter:
+        elif self.is_prompter and self._user_is_proctor(user):
             resp = self.at_chatbot(user, shout, timestamp)
-            if self.is_prompter:
-                self.log.info(f"Prompter bot got reply: {shout}")
-                # private_cid = self.get_private_conversation([user])
-                self.send_shout(f"@proctor {resp}")
-                return
+            self.log.info(f"Prompter bot got reply: {shout}")
+            self.send_shout(f"@proctor {resp}")
+            return
         # Subminds ignore facilitators
-        elif not self._user_is_proctor(user) and user.lower() in self.facilitator_nicks \
-                and self.bot_type == BotTypes.SUBMIND:
+        elif self.bot_type == BotTypes.SUBMIND and not self._user_is_proctor(user) \
+                and self._nick_index.is_facilitator(parsed.user_lower,
+                                                 self.facilitator_nicks):
             self.log.debug(f"{self.nick} ignoring facilitator shout: {shout}")
-        # Cleanup nick for comparison to logged in user
-        if "#" in user:
-            user = user.split("#")[0]
 
         # Handle prompts with incorrect prefix case
-        if not shout.startswith("!PROMPT:") and shout.lower().startswith("!prompt:"):
-            content = shout.split(':', 1)[1].strip()
-            self.log.info(f"Cleaned Prompt={content}")
-            shout = f"!PROMPT:{content}"
+        if parsed.shout is not parsed.message:
+            self.log.info(f"Cleaned Prompt={remove_prefix(parsed.shout, PROMPT_PREFIX)}")
 
         # Handle Parsed Shout
         try:
-            # Proctor Control Messages
-            if shout.endswith(ConversationControls.WAIT) and self._user_is_proctor(user):  # Notify next prompt bots
-                participants = shout[:-len(ConversationControls.WAIT)]
-                participants = set(participant.lower().strip() for participant in participants.split(","))
-                self.participant_history.append(participants)
-
-                if self.bot_type == BotTypes.SUBMIND and self.nick.lower() not in re.split("[, ]", shout.lower()):
-                    self.log.info(f"{self.nick} will sit this round out.")
-                    self.state = ConversationState.WAIT
-                else:
-                    self.log.info(f"{self.nick} will participate in the next round.")
-                    self.state = ConversationState.IDLE
-
-                if self.bot_type == BotTypes.SUBMIND:  # Only subminds need to be ready for the next prompt
-                    self.send_shout(ConversationControls.NEXT)
-            elif self.state == ConversationState.WAIT and self.bot_type == BotTypes.SUBMIND:
+            if parsed.shout_type != ShoutType.WAIT and \
+                    self.state == ConversationState.WAIT and \
+                    self.bot_type == BotTypes.SUBMIND:
                 self.log.debug(f"{self.nick} is sitting this round out!")
-            elif shout.startswith(ConversationControls.DISC) and self._user_is_proctor(user):  # Discuss Options
-                self.state = ConversationState.DISC
-                start_time = time.time()
-                options: dict = deepcopy(self.proposed_responses[self.active_prompt])
-                discussion = self.ask_discusser(options)
-                if discussion:
-                    self._hesitate_before_response(start_time=start_time)
-                    self.discuss_response(discussion)
-            elif shout.startswith(ConversationControls.VOTE) and self._user_is_proctor(user):  # Vote
-                self.state = ConversationState.VOTE
-                if self.bot_type == BotTypes.SUBMIND:  # Facilitators don't participate here
-                    start_time = time.time()
-                    options: dict = self._clean_options()
-                    selected = self.ask_appraiser(options)
-                    self._hesitate_before_response(start_time)
-                    if not selected or selected == self.nick:
-                        selected = "abstain"
-                    self.vote_response(selected)
-            elif shout.startswith(ConversationControls.PICK) and self._user_is_proctor(user):  # Voting is closed
-                self.state = ConversationState.PICK
-
-            # Commands
-            elif ConversationControls.HIST in shout.lower():  # User asked for history
-                response = self.ask_history(user, shout, dom, cid)
-                if response:
-                    if not self.is_current_cid(cid):
-                        response = f"@{user} {response}"
-                    self.send_shout(response, cid, dom)
-
-            # Incoming prompt
-            elif self._shout_is_prompt(shout) and self.conversation_is_proctored:
-                # self.state = ConversationState.RESP
-                # self.active_prompt = remove_prefix(shout, "!PROMPT:")
-                if self.bot_type == BotTypes.PROCTOR:
-                    self.log.debug(f"Incoming prompt: {shout}")
-                    try:
-                        self.ask_proctor(remove_prefix(shout, "!PROMPT:"), user, cid, dom)
-                    except Exception as x:
-                        self.log.error(f"{self.nick} | {x}")
-                # else:
-                #     self.log.debug(f"{self.nick} Ignoring incoming Proctor Prompt")
-                # self.ask_chatbot(user, self.active_prompt, timestamp)
-            elif self.state == ConversationState.IDLE and self._user_is_proctor(user) \
-                    and ConversationControls.RESP in shout:
-                try:
-                    self.state = ConversationState.RESP
-                    request_user, remainder = shout.split(ConversationControls.RESP, 1)
-                    request_user = request_user.strip()
-                    self.active_prompt = remainder.rsplit("(", 1)[0].strip().strip('"')
-                    self.prompt_id = str(round(time.time()))
-                    self.id_to_prompt[self.prompt_id] = self.active_prompt
-                    self.log.debug(f"Got prompt: {self.active_prompt}")
-                    self.request_history.append((request_user, self.active_prompt))
-                    self.log.debug(self.request_history)
-                    # if len(self.request_history) != len(self.participant_history):
-                    #     LOG.error(self.request_history)
-                    #     LOG.error(self.participant_history)
-                    # if request_user in self.chat_history.keys():
-                    #     self.chat_history[request_user].append(self.active_prompt)
-                    # else:
-                    #     self.chat_history[request_user] = [self.active_prompt]
-                    self.proposed_responses[self.active_prompt] = {}
-                    self.log.debug(self.proposed_responses)
-                    start_time = time.time()
-                    try:
-                        response = self.ask_chatbot(request_user, self.active_prompt, timestamp)
-                    except Exception as x:
-                        self.log.error(x)
-                        response = None
-                    self._hesitate_before_response(start_time)
-                    self.propose_response(response)
-                except Exception as e:
-                    self.log.error(e)
-                    self.log.error(shout)
-                    self.state = ConversationState.IDLE
-
+                return
+            # Proctor control messages and commands
+            handler = self._shout_handlers.get(parsed.shout_type)
+            if handler and handler(parsed, cid, dom, timestamp) is not False:
+                return
             # Chatbot communication related to a prompt
-            elif self.state == ConversationState.RESP and not self._user_is_proctor(user):
-                self.add_proposed_response(user, self.active_prompt, shout)
-            elif self.state == ConversationState.DISC and not self._user_is_proctor(user):
-                if user != self.nick:
-                    try:
-                        self.on_discussion(user, shout)
-                    except Exception as x:
-                        self.log.error(f"{self.nick} | {x}")
-            elif self.state == ConversationState.VOTE and user.lower() not in self.facilitator_nicks:
-                candidate_bot = None
-                for candidate in self.conversation_users:
-                    if candidate.lower() in shout.lower().split():
-                        candidate_bot = candidate
-                        if self.bot_type == BotTypes.PROCTOR:
-                            self.log.debug(f"{user} votes for {candidate_bot}")
-                        self.on_vote(self.prompt_id, candidate_bot, user)
-                        break
-                if not candidate_bot:
-                    # Keywords to indicate user will not vote
-                    if "abstain" in shout.split() or "present" in shout.split():
-                        self.on_vote(self.prompt_id, "abstain", user)
-                    else:
-                        self.log.warning(f"No valid vote cast! {shout}")
-            elif self.state == ConversationState.PICK and self._user_is_proctor(user):
-                try:
-                    user, response = shout.split(":", 1)
-                    user = user.split()[-1]
-                    response = response.strip().strip('"')
-                    self.selected_history.append(user.lower())
-                    self.on_selection(self.active_prompt, user, response)
-                    if self.nick.lower() == "scorekeeper":  # Get the history (for scorekeeper)
-                        history = self.ask_history(user, shout, dom, cid)
-                        self.send_shout(history, cid, dom)
-                except Exception as x:
-                    self.log.error(x)
-                    self.log.error(shout)
-                self.state = ConversationState.IDLE
-                self.active_prompt = None
-                self.prompt_id = None
-                # if self.bot_type == "submind":  # Only subminds need to be ready for the next prompt
-                #     self.send_shout(ConversationControls.NEXT)
-            elif shout == ConversationControls.NEXT:
-                self.on_ready_for_next(user)
+            handler = self._state_handlers.get(self.state)
+            if handler and handler(parsed, cid, dom, timestamp) is not False:
+                return
+            if parsed.shout_type == ShoutType.NEXT:
+                self.on_ready_for_next(parsed.user)
             # This came from a different non-neon user and is not related to a proctored conversation
-            elif user.lower() not in ("neon", self.nick.lower(), None) and self.enable_responses:
-                if self.bot_type == BotTypes.SUBMIND:
-                    self.log.debug(f"{self.nick} handling {shout}")
-                    # Submind handle prompt
-                    if not self.conversation_is_proctored:
-                        if shout.startswith("!PROMPT:"):
-                            self.log.error(f"Prompt into unproctored conversation! {shout}")
-                            return
-                        try:
-                            if random.randint(1, 100) < self.response_probability:
-                                response = self.ask_chatbot(user, shout, timestamp)
-                                self.propose_response(response)
-                            else:
-                                self.log.info(f"{self.nick} ignoring input: {shout}")
-                        except Exception as x:
-                            self.log.error(f"{self.nick} | {x}")
-                elif self.bot_type in (BotTypes.PROCTOR, BotTypes.OBSERVER):
-                    pass
-                else:
-                    self.log.error(f"{self.nick} has unknown bot type: {self.bot_type}")
+            else:
+                self._handle_unrelated_shout(parsed, timestamp)
         except Exception as e:
             self.log.error(e)
-            self.log.error(f"{self.nick} | {shout}")
-        # else:
-        #     self.log.debug(f"{self.nick} Ignoring: {user} - {shout}")
+            self.log.error(f"{self.nick} | {parsed.shout}")
+
+    def _handle_mention(self, parsed: ParsedShout, cid: str, dom: str,
+                        timestamp: str) -> bool:
+        """
+        Handles a shout directed at this bot
+        :param parsed: parsed shout with the @mention removed
+        :param cid: cid shout belongs to
+        :param dom: domain conversation belongs to
+        :param timestamp: formatted timestamp of shout
+        :return: True if the shout should be handled further
+        """
+        shout = parsed.message
+        if self.bot_type == BotTypes.PROCTOR:
+            self.log.info("@Proctor shout incoming")
+            try:
+                self.ask_proctor(shout, parsed.user, cid, dom)
+            except Exception as e:
+                self.log.error(e)
+                self.log.error(f'Ignoring incoming: {shout}')
+        elif self.bot_type == BotTypes.OBSERVER:
+            self.log.info("@observer shout incoming")
+            # TODO: Consider something here DM
+        elif self.bot_type == BotTypes.SUBMIND:
+            self.log.info(f"@bot shout incoming")
+            resp = self.at_chatbot(parsed.user, shout, timestamp)
+            if self.is_prompter:
+                self.log.info(f"Prompter bot got reply: {shout}")
+                self.send_shout(resp)
+                return False
+        return True
+
+    def _handle_wait_shout(self, parsed: ParsedShout, *_) -> bool:
+        """
+        Handles a proctor notifying bots that will respond to the next prompt
+        """
+        self.participant_history.append(parsed.get_participants())
+        if self.bot_type == BotTypes.SUBMIND and \
+                self.nick.lower() not in parsed.get_named_nicks():
+            self.log.info(f"{self.nick} will sit this round out.")
+            self.state = ConversationState.WAIT
+        else:
+            self.log.info(f"{self.nick} will participate in the next round.")
+            self.state = ConversationState.IDLE
+
+        if self.bot_type == BotTypes.SUBMIND:  # Only subminds need to be ready for the next prompt
+            self.send_shout(ConversationControls.NEXT)
+        return True
+
+    def _handle_disc_shout(self, *_) -> bool:
+        """
+        Handles a proctor opening discussion of proposed responses
+        """
+        self.state = ConversationState.DISC
+        start_time = time.time()
+        options: OptionsSnapshot = self._collapse_options(
+            self._get_options_snapshot())
+        discussion = self.ask_discusser(options)
+        if discussion:
+            self._hesitate_before_response(start_time=start_time)
+            self.discuss_response(discussion)
+        return True
+
+    def _handle_vote_shout(self, *_) -> bool:
+        """
+        Handles a proctor opening voting on proposed responses
+        """
+        self.state = ConversationState.VOTE
+        if self.bot_type == BotTypes.SUBMIND:  # Facilitators don't participate here
+            start_time = time.time()
+            options: OptionsSnapshot = self._collapse_options(
+                self._clean_options())
+            selected = self.ask_appraiser(options)
+            self._hesitate_before_response(start_time)
+            if not selected or selected == self.nick:
+                selected = "abstain"
+            self.vote_response(selected)
+        return True
+
+    def _handle_pick_shout(self, *_) -> bool:
+        """
+        Handles a proctor closing voting
+        """
+        self.state = ConversationState.PICK
+        return True
+
+    def _handle_hist_shout(self, parsed: ParsedShout, cid: str, dom: str,
+                           _) -> bool:
+        """
+        Handles a user asking for history
+        """
+        response = self.ask_history(parsed.user, parsed.shout, dom, cid)
+        if response:
+            if not self.is_handled_cid(cid):
+                response = f"@{parsed.user} {response}"
+            self.send_shout(response, cid, dom)
+        return True
+
+    def _handle_prompt_shout(self, parsed: ParsedShout, cid: str, dom: str,
+                             _) -> bool:
+        """
+        Handles an incoming prompt
+        :return: False if the conversation is not proctored
+        """
+        if not self.conversation_is_proctored:
+            return False
+        if self.bot_type == BotTypes.PROCTOR:
+            self.log.debug(f"Incoming prompt: {parsed.shout}")
+            try:
+                self.ask_proctor(remove_prefix(parsed.shout, PROMPT_PREFIX),
+                                 parsed.user, cid, dom)
+            except Exception as x:
+                self.log.error(f"{self.nick} | {x}")
+        return True
+
+    def _handle_resp_shout(self, parsed: ParsedShout, cid: str, _,
+                           timestamp: str) -> bool:
+        """
+        Handles a proctor asking for responses to a new prompt
+        :return: False if a prompt is already active
+        """
+        if self.state != ConversationState.IDLE:
+            return False
+        try:
+            self.state = ConversationState.RESP
+            request_user, remainder = parsed.shout.split(ConversationControls.RESP, 1)
+            request_user = request_user.strip()
+            self.active_prompt = remainder.rsplit("(", 1)[0].strip().strip('"')
+            # Unique across conversations, which share the similarity cache
+            self.prompt_id = f"{cid}:{uuid4().hex}"
+            self.id_to_prompt[self.prompt_id] = self.active_prompt
+            self.log.debug(f"Got prompt: {self.active_prompt}")
+            self.request_history.append((request_user, self.active_prompt))
+            self.log.debug(self.request_history)
+            self.proposed_responses[self.active_prompt] = {}
+            self.log.debug(self.proposed_responses)
+            start_time = time.time()
+            try:
+                response = self.ask_chatbot(request_user, self.active_prompt, timestamp)
+            except Exception as x:
+                self.log.error(x)
+                response = None
+            self._hesitate_before_response(start_time)
+            self.propose_response(response)
+        except Exception as e:
+            self.log.error(e)
+            self.log.error(parsed.shout)
+            self.state = ConversationState.IDLE
+        return True
+
+    def _handle_resp_state(self, parsed: ParsedShout, *_) -> bool:
+        """
+        Handles a proposed response from another bot
+        """
+        if parsed.from_proctor:
+            return False
+        self.add_proposed_response(parsed.user, self.active_prompt,
+                                   parsed.shout)
+        return True
+
+    def _handle_disc_state(self, parsed: ParsedShout, *_) -> bool:
+        """
+        Handles discussion from another bot
+        """
+        if parsed.from_proctor:
+            return False
+        if parsed.user != self.nick:
+            try:
+                self.on_discussion(parsed.user, parsed.shout)
+            except Exception as x:
+                self.log.error(f"{self.nick} | {x}")
+        return True
+
+    def _handle_vote_state(self, parsed: ParsedShout, *_) -> bool:
+        """
+        Handles a vote from another bot
+        """
+        if self._nick_index.is_facilitator(parsed.user_lower,
+                                           self.facilitator_nicks):
+            return False
+        user = parsed.user
+        nick_index = self._context.nick_index
+        if nick_index.stale:
+            nick_index.update(self.conversation_users)
+        candidate_bot = nick_index.find_nick(parsed.lowered.split())
+        if candidate_bot:
+            if self.bot_type == BotTypes.PROCTOR:
+                self.log.debug(f"{user} votes for {candidate_bot}")
+            self.on_vote(self.prompt_id, candidate_bot, user)
+        else:
+            # Keywords to indicate user will not vote
+            words = parsed.shout.split()
+            if "abstain" in words or "present" in words:
+                self.on_vote(self.prompt_id, "abstain", user)
+            else:
+                self.log.warning(f"No valid vote cast! {parsed.shout}")
+        return True
+
+    def _handle_pick_state(self, parsed: ParsedShout, cid: str, dom: str,
+                           _) -> bool:
+        """
+        Handles a proctor announcing the selected response
+        """
+        if not parsed.from_proctor:
+            return False
+        shout = parsed.shout
+        try:
+            user, response = shout.split(":", 1)
+            user = user.split()[-1]
+            response = response.strip().strip('"')
+            self.selected_history.append(user.lower())
+            self.on_selection(self.active_prompt, user, response)
+            if self.nick.lower() == "scorekeeper":  # Get the history (for scorekeeper)
+                history = self.ask_history(user, shout, dom, cid)
+                self.send_shout(history, cid, dom)
+        except Exception as x:
+            self.log.error(x)
+            self.log.error(shout)
+        self.state = ConversationState.IDLE
+        self.active_prompt = None
+        self.prompt_id = None
+        return True
+
+    def _handle_unrelated_shout(self, parsed: ParsedShout, timestamp: str):
+        """
+        Handles a shout that is not related to a proctored conversation
+        """
+        if parsed.user_lower in ("neon", self.nick.lower()) or \
+                not self.enable_responses:
+            return
+        shout = parsed.shout
+        if self.bot_type == BotTypes.SUBMIND:
+            self.log.debug(f"{self.nick} handling {shout}")
+            # Submind handle prompt
+            if not self.conversation_is_proctored:
+                if parsed.shout_type == ShoutType.PROMPT:
+                    self.log.error(f"Prompt into unproctored conversation! {shout}")
+                    return
+                try:
+                    if random.randint(1, 100) < self.response_probability:
+                        response = self.ask_chatbot(parsed.user, shout, timestamp)
+                        self.propose_response(response)
+                    else:
+                        self.log.info(f"{self.nick} ignoring input: {shout}")
+                except Exception as x:
+                    self.log.error(f"{self.nick} | {x}")
+        elif self.bot_type in (BotTypes.PROCTOR, BotTypes.OBSERVER):
+            pass
+        else:
+            self.log.error(f"{self.nick} has unknown bot type: {self.bot_type}")
 
     def add_proposed_response(self, user, prompt, response):
         """
@@ -401,6 +692,7 @@ class ChatBot(KlatApi, ChatBotABC):
         if response and response != self.active_prompt:
             # if prompt in self.proposed_responses.keys():
             self.proposed_responses[prompt][user.lower()] = response
+            self._context.options_snapshot = None
             # else:
             #     self.proposed_responses[prompt] = {user: response}
         self.on_proposed_response()
@@ -556,7 +848,7 @@ class ChatBot(KlatApi, ChatBotABC):
     def ask_appraiser(self, options: dict) -> str:
         """
         Override in bot to handle selecting a response to the given prompt. Vote is for the name of the best responder.
-        :param options: proposed responses (botname: response)
+        :param options: read-only proposed responses (botname: response)
         :return: user selected from options or "abstain" for no vote
         """
         pass
@@ -564,7 +856,7 @@ class ChatBot(KlatApi, ChatBotABC):
     def ask_discusser(self, options: dict) -> str:
         """
         Override in bot to handle discussing options for the given prompt. Discussion can be anything.
-        :param options: proposed responses (botname: response)
+        :param options: read-only proposed responses (botname: response)
         :return: Discussion response for the current prompt
         """
         pass
@@ -594,14 +886,28 @@ class ChatBot(KlatApi, ChatBotABC):
         :param shout: incoming shout
         :return: true if shout should be considered a prompt
         """
-        return shout.startswith("!PROMPT:")
+        return shout.startswith(PROMPT_PREFIX)
+
+    def _get_options_snapshot(self) -> OptionsSnapshot:
+        """
+        Gets a read-only snapshot of the responses proposed for the active
+        prompt. The snapshot is reused until another response is proposed.
+        """
+        context = self._context
+        options = context.proposed_responses[context.active_prompt]
+        snapshot = context.options_snapshot
+        if snapshot is None or context.options_source is not options:
+            snapshot = context.options_snapshot = OptionsSnapshot(options)
+            context.options_source = options
+        return snapshot
 
-    def _clean_options(self):
+    def _clean_options(self) -> OptionsSnapshot:
         """
-        Gets a dict of options with the
+        Gets a read-only snapshot of options with lowercase nicks, excluding
+        this bot's response and any response repeating the prompt
         """
-        return {nick.lower(): resp for nick, resp in self.proposed_responses[self.active_prompt].items()
-                if nick.lower() != self.nick.lower() and resp != self.active_prompt}
+        return self._get_options_snapshot().filtered(self.nick,
+                                                     self.active_prompt)
 
     def _pause_responses(self, duration: int = 5):
         """
@@ -639,6 +945,8 @@ class ChatBot(KlatApi, ChatBotABC):
         # self.socket.disconnect()
         while not self.shout_queue.empty():
             self.shout_queue.get(timeout=1)
+        if self.history_archive:
+            self.history_archive.close()
         clean_up_bot(self)
         # self.shout_queue.put(None)
         # self.log.warning(f"EXITING")
@@ -20,20 +20,47 @@
 import os
 import time
 
+from collections.abc import Mapping
+from threading import local
+from typing import Optional
 from neon_mq_connector.utils import RepeatingTimer
-from neon_mq_connector.utils.rabbit_utils import create_mq_callback
 from klat_connector.mq_klat_api import KlatAPIMQ
+from ovos_utils.log import LOG
 from pika.exchange_type import ExchangeType
 
+from chatbot_core.utils.codec import B64Codec, MessageCodec, MessageView, \
+    create_codec_callback, emit_encoded_message, get_codec, \
+    get_supported_codecs
+from chatbot_core.utils.cache import DuplicateFilter
+from chatbot_core.utils.conversation_utils import ConversationRegistry
+from chatbot_core.utils.state_store import get_state_store
+from chatbot_core.utils.options import OptionsSnapshot
 from chatbot_core.utils.enum import ConversationState, BotTypes
 from chatbot_core.chatbot_abc import ChatBotABC
 from chatbot_core.version import __version__ as package_version
 
+# Default expiration of outgoing messages in milliseconds
+DEFAULT_MESSAGE_TTL = 1000
+# Message timestamps above this value are in milliseconds (~year 5138 in s)
+MS_TIMESTAMP_THRESHOLD = 1E11
+
 
 class ChatBot(KlatAPIMQ, ChatBotABC):
     """MQ-based chatbot implementation"""
 
     async_consumers_enabled = True
+    # If True, message handling hooks receive read-only `MessageView` objects
+    # instead of dicts. If None, views are passed only when none of
+    # `_MESSAGE_HOOKS` are overridden.
+    lazy_message_data = None
+    _MESSAGE_HOOKS = ('handle_incoming_shout', 'handle_shout',
+                      'get_chatbot_response')
+    # Invitation fields kept in the record of a joined conversation. If None,
+    # the whole invitation is kept; set a tuple of fields to discard the rest
+    invite_fields = None
+    # Fanout exchanges peers learn supported codecs from, which are always
+    # sent with the default encoding
+    _STATE_EXCHANGES = ('connection', 'disconnection')
 
     def __init__(self, *args, **kwargs):
         config, service_name, vhost, bot_type = self.parse_init(*args, **kwargs)
@@ -42,9 +69,33 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
         KlatAPIMQ.__init__(self, mq_config, service_name, vhost)
         ChatBotABC.__init__(self, service_name, bot_config)
         self.bot_type = bot_type
-        self.current_conversations = dict()
+        self.sync_mode = self.bot_config.get('sync_mode', 'full')
+        self.current_conversations = ConversationRegistry(
+            ttl=self.bot_config.get('conversation_ttl'),
+            capacity=self.bot_config.get('max_conversations'),
+            store=get_state_store(self.bot_config.get('state_store'),
+                                  service_name),
+            on_change=self._on_conversation_change)
         self.on_server = True
         self.default_response_queue = 'shout'
+        self.message_codec = get_codec(self.bot_config.get('message_codec'))
+        # If True, fanout messages are encoded with `message_codec` while all
+        # connected peers support it
+        self.fanout_codec = bool(self.bot_config.get('fanout_codec'))
+        # Codecs advertised by connected peers by nick
+        self._peer_codecs = dict()
+        self._message_ttl = self._parse_message_ttl(
+            self.bot_config.get('message_ttl'))
+        self.max_message_age = self.bot_config.get('max_message_age')
+        self._duplicate_filter = DuplicateFilter(
+            capacity=self.bot_config.get('dedup_capacity', 1024),
+            window=self.bot_config.get('dedup_window', 300))
+        # Prompt of the proctor message being handled by the current thread
+        self._local = local()
+        if self.lazy_message_data is None:
+            self.lazy_message_data = all(
+                getattr(type(self), hook) is getattr(ChatBot, hook)
+                for hook in self._MESSAGE_HOOKS)
         self.shout_thread = RepeatingTimer(function=self._handle_next_shout,
                                            interval=kwargs.get('shout_thread_interval', 10))
         self.shout_thread.start()
@@ -58,7 +109,61 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
         bot_type: repr(BotTypes) = bot_type or kwargs.get('bot_type', BotTypes.SUBMIND)
         return config, service_name, vhost, bot_type
 
-    @create_mq_callback()
+    @staticmethod
+    def _parse_message_ttl(config: Optional[dict]) -> dict:
+        """
+            Parses `message_ttl` configuration into expirations by state
+            :param config: dict of ConversationState names (or `default`) to
+                message expiration in milliseconds
+            :returns: dict of ConversationState (or None for default) to int
+        """
+        ttl = {None: DEFAULT_MESSAGE_TTL}
+        for key, value in (config or {}).items():
+            if str(key).lower() == 'default':
+                ttl[None] = int(value)
+                continue
+            try:
+                ttl[ConversationState[str(key).upper()]] = int(value)
+            except KeyError:
+                LOG.error(f"Invalid conversation state in `message_ttl`: {key}")
+        return ttl
+
+    def get_message_ttl(self, conversation_state: ConversationState) -> int:
+        """
+            Gets the expiration of outgoing messages in a conversation state
+            :param conversation_state: current state of the conversation
+            :returns: message expiration in milliseconds
+        """
+        try:
+            conversation_state = ConversationState(conversation_state)
+        except ValueError:
+            conversation_state = None
+        return self._message_ttl.get(conversation_state,
+                                     self._message_ttl[None])
+
+    def is_expired_message(self, message_data: Mapping) -> bool:
+        """
+            Checks if an incoming message is older than the configured
+            `max_message_age`, based on its `time` or `timeCreated` in
+            epoch seconds or milliseconds
+            :param message_data: data of incoming message
+            :returns: True if the message is expired
+        """
+        if not self.max_message_age:
+            return False
+        sent = message_data.get('time') or message_data.get('timeCreated')
+        if sent is None:
+            return False
+        try:
+            sent = float(sent)
+        except (TypeError, ValueError):
+            self.log.warning(f'Unparseable message timestamp: {sent!r}')
+            return False
+        if sent > MS_TIMESTAMP_THRESHOLD:
+            sent /= 1000
+        return time.time() - sent > self.max_message_age
+
+    @create_codec_callback()
     def handle_kick_out(self, body: dict):
         """Handles incoming request to chatbot"""
         cid = body.get('cid', None)
@@ -67,29 +172,33 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
             self.send_announcement(f'{self.nick.split("-")[0]} kicked out', cid)
             self.current_conversations.pop(cid, None)
 
-    @create_mq_callback()
+    @create_codec_callback()
     def handle_invite(self, body: dict):
         """Handles incoming request to chatbot"""
         new_cid = body.pop('cid', None)
         announce_invitation = body.pop('announce_invitation', True)
         self.log.info(f'Received invitation to cid: {new_cid}')
-        if new_cid and not self.current_conversations.get(new_cid, None):
-            self.current_conversations[new_cid] = body
-            self.set_conversation_state(new_cid, ConversationState.IDLE)
+        if new_cid and new_cid not in self.current_conversations:
+            if self.invite_fields is not None:
+                body = {key: body[key] for key in self.invite_fields
+                        if key in body}
+            self.current_conversations.add(new_cid, dict(body))
             if announce_invitation:
                 self.send_announcement(f'{self.nick.split("-")[0]} joined', new_cid)
 
+    @property
+    def _similarity_prompt_id(self) -> Optional[str]:
+        return getattr(self._local, 'prompt_id', None)
+
     def get_conversation_state(self, cid) -> ConversationState:
-        return self.current_conversations.get(cid, {}).get('state', ConversationState.IDLE)
+        return self.current_conversations.get_state(cid,
+                                                    ConversationState.IDLE)
 
     def set_conversation_state(self, cid, state):
-        old_state = self.current_conversations.setdefault(cid, {}).get(
-            "state", ConversationState.IDLE)
+        old_state = self.get_conversation_state(cid)
         self.log.debug(f'State was: {old_state}')
-        self.current_conversations.setdefault(cid, {})['state'] = state
-        new_state = self.current_conversations.setdefault(cid, {}).get(
-            "state", ConversationState.IDLE)
-        self.log.debug(f'State become: {new_state}')
+        self.current_conversations.set_state(cid, state)
+        self.log.debug(f'State become: {state}')
 
     def _setup_listeners(self):
         KlatAPIMQ._setup_listeners(self)
@@ -118,10 +227,78 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
                                  self.handle_proctor_ping,
                                  self.default_error_handler,
                                  exchange='proctor_ping')
-
-    @create_mq_callback()
+        if self.sync_mode == 'delta':
+            self.register_consumer('sync_request',
+                                   self.vhost,
+                                   f'{self.nick}_sync',
+                                   self.handle_sync_request,
+                                   self.default_error_handler)
+        if not isinstance(self.message_codec, B64Codec):
+            self.register_subscriber('peer_connection',
+                                     self.vhost,
+                                     self.handle_peer_connection,
+                                     self.default_error_handler,
+                                     exchange=self.connection_exchange)
+            self.register_subscriber('peer_disconnection',
+                                     self.vhost,
+                                     self.handle_peer_disconnection,
+                                     self.default_error_handler,
+                                     exchange=self.disconnection_exchange)
+
+    @create_codec_callback()
+    def handle_peer_connection(self, body: dict):
+        """Tracks message codecs advertised by a connected peer"""
+        nick = body.get('nick')
+        codecs = (body.get('context') or {}).get('message_codecs')
+        if nick and nick != self.nick:
+            # Peers that advertise no codecs only decode the default encoding
+            self._peer_codecs[nick] = set(codecs or ())
+
+    @create_codec_callback()
+    def handle_peer_disconnection(self, body: dict):
+        """Forgets message codecs advertised by a disconnected peer"""
+        self._peer_codecs.pop(body.get('nick'), None)
+
+    def get_codec_for_queue(self, queue_name: str) -> MessageCodec:
+        """
+            Gets the codec to encode a direct message to the specified queue.
+            The configured `message_codec` is used only if the peer consuming
+            the queue advertised support for it.
+            :param queue_name: name of the direct queue to send to
+            :returns: MessageCodec to encode the message with
+        """
+        if not isinstance(self.message_codec, B64Codec):
+            for suffix in ('_invite', '_kick_out', '_shout', '_sync'):
+                if queue_name.endswith(suffix):
+                    nick = queue_name[:-len(suffix)]
+                    if self.message_codec.name in \
+                            self._peer_codecs.get(nick, ()):
+                        return self.message_codec
+                    break
+        return B64Codec()
+
+    def get_codec_for_exchange(self, exchange: str) -> MessageCodec:
+        """
+            Gets the codec to encode a fanout message to the specified
+            exchange. The configured `message_codec` is used only if
+            `fanout_codec` is enabled and every connected peer advertised
+            support for it; otherwise, and for state messages peers learn
+            codecs from, the default encoding is used.
+            :param exchange: name of the fanout exchange to send to
+            :returns: MessageCodec to encode the message with
+        """
+        if self.fanout_codec and \
+                not isinstance(self.message_codec, B64Codec) and \
+                exchange not in self._STATE_EXCHANGES:
+            peer_codecs = list(self._peer_codecs.values())
+            if peer_codecs and all(self.message_codec.name in codecs
+                                   for codecs in peer_codecs):
+                return self.message_codec
+        return B64Codec()
+
+    @create_codec_callback()
     def handle_proctor_ping(self, body: dict):
-        if body.get('cid') in list(self.current_conversations):
+        if self.current_conversations.touch(body.get('cid')):
             with self.create_mq_connection(self.vhost) as mq_connection:
                 proctor_nick = body.get('nick', '')
                 self.log.debug(f'Sending pong to {proctor_nick}')
@@ -134,25 +311,65 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
                 self.send_shout(shout='I am ready for the next prompt',
                                 cid=body.get('cid'))
 
-    @create_mq_callback()
-    def _on_mentioned_user_message(self, body: dict):
+    @create_codec_callback(lazy=True)
+    def _on_mentioned_user_message(self, body: Mapping):
         """
-            MQ handler for requesting message for current bot
+            MQ handler for requesting message for current bot. Received
+            messages are passed along as a `MessageView`, so only the fields
+            accessed while handling the message are decoded, unless
+            `lazy_message_data` is False.
         """
         if body.get('omit_reply'):
             self.log.debug(f"Explicitly requested no response: messageID="
                            f"{body.get('messageID')}")
             return
-        if body.get('cid') not in list(self.current_conversations):
+        if not self.current_conversations.touch(body.get('cid')):
             self.log.info(f"Ignoring message "
                           f"(messageID={body.get('messageID')}) outside of "
                           f"current conversations "
                           f"({self.current_conversations})")
             self.log.debug(f"{body}")
             return
+        if self.is_expired_message(body):
+            self.log.info(f"Ignoring expired message "
+                          f"(messageID={body.get('messageID')}, "
+                          f"prompt_id={body.get('prompt_id')})")
+            return
+        if self.is_duplicate_message(body):
+            self.log.info(f"Ignoring redelivered message "
+                          f"(messageID={body.get('messageID')}, "
+                          f"prompt_id={body.get('prompt_id')})")
+            return
+        if not self.lazy_message_data and isinstance(body, MessageView):
+            body = body.to_dict()
         self.handle_incoming_shout(body)
 
-    @create_mq_callback()
+    @property
+    def duplicate_count(self) -> int:
+        """Number of redelivered messages dropped since init"""
+        return self._duplicate_filter.duplicates
+
+    def is_duplicate_message(self, message_data: Mapping) -> bool:
+        """
+            Checks if a message was already received within the configured
+            `dedup_window`. Messages are identified by `messageID` and
+            `prompt_id` along with the conversation state, since a proctor
+            may send messages for each state of a prompt with the same
+            `messageID`. Messages without either ID are never duplicates.
+            :param message_data: data of incoming message
+            :returns: True if the message was already received
+        """
+        message_id = message_data.get('messageID')
+        prompt_id = message_data.get('prompt_id')
+        if not message_id and not prompt_id:
+            return False
+        key = (message_id, prompt_id,
+               str(message_data.get('conversation_state')))
+        if not message_id:
+            key += (message_data.get('nick'),)
+        return self._duplicate_filter.check(key)
+
+    @create_codec_callback()
     def _on_user_message(self, body: dict):
         """
             MQ handler for requesting message, gets processed in case its addressed to given instance or is a broadcast call
@@ -164,7 +381,7 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
                 self.nick != body.get('user', None):
             self._on_mentioned_user_message('', '', '', body)
 
-    def handle_incoming_shout(self, message_data: dict):
+    def handle_incoming_shout(self, message_data: Mapping):
         """
             Handles an incoming shout into the current conversation
             :param message_data: data of incoming message
@@ -177,12 +394,12 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
         # TODO: make it defaulting to True once all the related subminds are migrated (Kirill)
         return False
 
-    def get_chatbot_response(self, cid, message_data, shout, message_sender, is_message_from_proctor,
+    def get_chatbot_response(self, cid, message_data: Mapping, shout, message_sender, is_message_from_proctor,
                              conversation_state) -> dict:
         """
             Makes response based on incoming message data and its context
             :param cid: current conversation id
-            :param message_data: message data received
+            :param message_data: message data received (dict or MessageView)
             :param shout: incoming shout data
             :param message_sender: nick of message sender
             :param is_message_from_proctor: is message sender a Proctor
@@ -215,27 +432,39 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
             message_sender = BotTypes.PROCTOR
 
             self.set_conversation_state(cid, conversation_state)
-            if conversation_state == ConversationState.RESP:
-                response['shout'] = self.ask_chatbot(user=message_sender,
-                                                     shout=shout,
-                                                     timestamp=str(message_data.get('timeCreated', int(time.time()))),
-                                                     **context_kwargs)
-            elif conversation_state == ConversationState.DISC:
-                options: dict = message_data.get('proposed_responses', {})
-                response['shout'] = self.ask_discusser(options, **context_kwargs)
-            elif conversation_state == ConversationState.VOTE:
-                selected = self.ask_appraiser(options=message_data.get('proposed_responses', {}), **context_kwargs)
-                response['shout'] = self.vote_response(selected)
-                if 'abstain' in response['shout'].lower():
-                    selected = "abstain"
-                response['context']['selected'] = selected
-            elif conversation_state == ConversationState.WAIT:
-                response['shout'] = 'I am ready for the next prompt'
+            prompt_id = message_data.get('prompt_id') or None
+            self._local.prompt_id = prompt_id
+            try:
+                if conversation_state == ConversationState.RESP:
+                    response['shout'] = self.ask_chatbot(user=message_sender,
+                                                         shout=shout,
+                                                         timestamp=str(message_data.get('timeCreated', int(time.time()))),
+                                                         **context_kwargs)
+                elif conversation_state == ConversationState.DISC:
+                    options = self._collapse_options(OptionsSnapshot(
+                        message_data.get('proposed_responses')))
+                    response['shout'] = self.ask_discusser(options, **context_kwargs)
+                elif conversation_state == ConversationState.VOTE:
+                    options = self._collapse_options(OptionsSnapshot(
+                        message_data.get('proposed_responses')))
+                    selected = self.ask_appraiser(options=options, **context_kwargs)
+                    response['shout'] = self.vote_response(selected)
+                    if 'abstain' in response['shout'].lower():
+                        selected = "abstain"
+                    response['context']['selected'] = selected
+                elif conversation_state == ConversationState.WAIT:
+                    response['shout'] = 'I am ready for the next prompt'
+                elif conversation_state in (ConversationState.PICK,
+                                            ConversationState.IDLE) and \
+                        prompt_id:
+                    self.similarity_cache.close(prompt_id)
+            finally:
+                self._local.prompt_id = None
             response['context']['prompt_id'] = message_data.get('prompt_id', '')
         return response
 
     @staticmethod
-    def _build_submind_request_context(message_data: dict,
+    def _build_submind_request_context(message_data: Mapping,
                                        message_sender: str,
                                        is_message_from_proctor: bool,
                                        conversation_state: ConversationState) -> dict:
@@ -246,14 +475,14 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
             'conversation_state': conversation_state,
         }
 
-    def handle_shout(self, message_data: dict, skip_callback: bool = False):
+    def handle_shout(self, message_data: Mapping, skip_callback: bool = False):
         """
             Handles shout for bot. If receives response - emits message into "bot_response" queue
 
-            :param message_data: dict containing message data received
+            :param message_data: dict or MessageView containing message data received
             :param skip_callback: to skip callback after handling shout (default to False)
         """
-        self.log.info(f'Message data: {message_data}')
+        self.log.info('Message data: %s', message_data)
         shout = message_data.get('shout') or message_data.get('messageText', '')
         cid = message_data.get('cid', '')
         conversation_state = ConversationState(message_data.get('conversation_state', 0))
@@ -284,18 +513,59 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
         else:
             self.log.warning(f'{self.nick}: Missing "shout" in received message data: {message_data}')
 
-    def _send_state(self):
-        self.send_shout(shout='chatbot state',
-                        context={
-                            'version': os.environ.get('SERVICE_VERSION', package_version),
-                            'bot_type': self.bot_type,
-                            'cids': list(self.current_conversations),
-                        },
+    def _send_state(self, snapshot: bool = False, **sync_context):
+        """
+            Emits this bot's state to the connection exchange. With
+            `sync_mode: delta`, the full list of cids is only sent in a
+            snapshot; otherwise only its version, hash and count are sent.
+            :param snapshot: if True, include the full list of cids
+            :param sync_context: sync fields overriding the default heartbeat
+        """
+        context = {
+            'version': os.environ.get('SERVICE_VERSION', package_version),
+            'bot_type': self.bot_type,
+            'message_codecs': get_supported_codecs(),
+        }
+        if snapshot or self.sync_mode != 'delta':
+            cids, cids_version, cids_hash = \
+                self.current_conversations.snapshot()
+            context['sync'] = 'snapshot'
+            context['cids'] = cids
+            cids_count = len(cids)
+        else:
+            # Heartbeats do not copy the list of cids
+            cids_version, cids_hash, cids_count = \
+                self.current_conversations.summary()
+            context['sync'] = 'heartbeat'
+        context.update(cids_version=cids_version, cids_hash=cids_hash,
+                       cids_count=cids_count)
+        context.update(sync_context)
+        self.send_shout(shout='chatbot state', context=context,
                         exchange='connection')
 
+    def _on_conversation_change(self, event: str, cid: str,
+                                cids_version: int, cids_hash: str):
+        """
+            Emits a join or leave event when a conversation is added or
+            removed, if `sync_mode` is `delta`
+        """
+        if self.sync_mode == 'delta' and getattr(self, '_connected', False):
+            self._send_state(sync=event, cid=cid, cids_version=cids_version,
+                             cids_hash=cids_hash,
+                             cids_count=len(self.current_conversations))
+
+    @create_codec_callback()
+    def handle_sync_request(self, body: dict):
+        """
+            Handles a request for a snapshot of this bot's conversations. A
+            snapshot is sent if the requester's `cids_hash` does not match.
+        """
+        if body.get('cids_hash') != self.current_conversations.cids_hash:
+            self._send_state(snapshot=True)
+
     def _on_connect(self):
         """Emits fanout message to connection exchange once connecting"""
-        self._send_state()
+        self._send_state(snapshot=True)
         self._connected = True
 
     def _on_disconnect(self):
@@ -316,6 +586,7 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
         """
         curr_time = int(time.time())
         self.log.debug(f'{curr_time} Emitting sync message from {self.nick}')
+        self.current_conversations.evict()
         self._send_state()
 
     def discuss_response(self, shout: str, cid: str = None):
@@ -371,6 +642,7 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
                    broadcast: bool = True,
                    context: dict = None,
                    prompt_id='',
+                   expiration: Optional[int] = None,
                    **kwargs) -> str:
         """
             Convenience method to emit shout via MQ with extensive instance properties
@@ -384,10 +656,14 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
             :param broadcast: to broadcast shout (defaults to True)
             :param context: message context to pass along with response
             :param prompt_id: id of prompt to refer shout to
+            :param expiration: MQ message expiration in milliseconds
+                (defaults to the `message_ttl` of the conversation state)
 
             :returns generated shout id
         """
         conversation_state = self.get_conversation_state(cid)
+        if expiration is None:
+            expiration = self.get_message_ttl(conversation_state)
         if isinstance(conversation_state, ConversationState):
             conversation_state = conversation_state.value
         queue_name = queue_name or self.default_response_queue
@@ -406,6 +682,7 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
             queue_name=queue_name,
             exchange=exchange,
             exchange_type=exchange_type,
+            expiration=expiration,
             message_body={
                 'nick': self.nick,
                 'bot_type': self.bot_type,
@@ -420,6 +697,48 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
                 'time': str(int(time.time())),
                 **kwargs})
 
+    def _send_shout(self, queue_name: str = '', message_body: dict = None,
+                    exchange: str = '',
+                    exchange_type: str = ExchangeType.direct.value,
+                    expiration: int = DEFAULT_MESSAGE_TTL) -> str:
+        """
+            Sends shout from current instance. Direct messages to peers that
+            advertised support for the configured `message_codec` are encoded
+            with it, as are fanout messages if `fanout_codec` is enabled and
+            all connected peers support it; all other messages use the
+            default encoding.
+
+            :param queue_name: MQ queue name for emit (optional for fanout)
+            :param message_body: dict with relevant message data
+            :param exchange: MQ exchange name for emit
+            :param exchange_type: type of exchange to use based on ExchangeType
+            :param expiration: MQ message expiration in milliseconds
+
+            :returns generated shout id
+        """
+        if not message_body:
+            self.log.warning("Cannot send shout without message")
+            return ''
+        if ExchangeType(exchange_type) == ExchangeType.fanout:
+            codec = self.get_codec_for_exchange(exchange)
+        else:
+            codec = self.get_codec_for_queue(queue_name)
+        if isinstance(codec, B64Codec):
+            return self.send_message(request_data=message_body,
+                                     vhost=self.vhost,
+                                     exchange=exchange,
+                                     queue=queue_name,
+                                     exchange_type=exchange_type,
+                                     expiration=int(expiration))
+        with self.create_mq_connection(self.vhost) as mq_connection:
+            return emit_encoded_message(mq_connection,
+                                        request_data=message_body,
+                                        codec=codec,
+                                        exchange=exchange,
+                                        queue=queue_name,
+                                        exchange_type=exchange_type,
+                                        expiration=int(expiration))
+
     def send_announcement(self, shout, cid, **kwargs):
         return self.send_shout(shout=shout,
                                cid=cid,
@@ -467,3 +786,4 @@ class ChatBot(KlatAPIMQ, ChatBotABC):
     def stop(self):
         self.stop_shout_thread()
         KlatAPIMQ.stop(self)
+        self.current_conversations.store.close()
@@ -76,5 +76,6 @@ setuptools.setup(
                                       "start-mq-bot=chatbot_core.cli:cli_start_mq_bot"]},
     install_requires=get_requirements("requirements.txt"),
     extras_require={"lgpl": get_requirements("extra-lgpl.txt"),
-                    "lang": get_requirements("extra-lang.txt")}
+                    "lang": get_requirements("extra-lang.txt"),
+                    "msgpack": get_requirements("extra-msgpack.txt")}
 )
@@ -0,0 +1,70 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import json
+import os
+
+from glob import glob
+from typing import Optional
+
+from ovos_utils.log import LOG
+
+from chatbot_core.version import __version__
+
+# Benchmarks are `unittest.TestCase`s, run with pytest like the other tests,
+# that time code with `timeit` (or `time`/`tracemalloc` for whole runs) rather
+# than depending on pytest-benchmark, and report through `write_results`.
+# Results are written to `BENCHMARK_RESULTS` if set, else here, as
+# `<benchmark>-<version>.json`. If `BENCHMARK_BASELINE` is set to a directory
+# with the results of another version, benchmarks may compare against them.
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def write_results(name: str, report: dict) -> str:
+    """
+    Write the results of a benchmark with the version they were measured on
+    :param name: benchmark name, used in the file name
+    :param report: JSON-serializable results
+    :return: path the results were written to
+    """
+    directory = os.environ.get("BENCHMARK_RESULTS") or RESULTS_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}-{__version__}.json")
+    with open(path, "w") as f:
+        json.dump({"benchmark": name, "version": __version__, **report}, f,
+                  indent=2)
+    LOG.info(f"{name} results saved to {path}")
+    return path
+
+
+def load_baseline(name: str) -> Optional[dict]:
+    """
+    Load the most recent results of a benchmark from `BENCHMARK_BASELINE`
+    :param name: benchmark name
+    :return: previous results, None if no baseline is configured or found
+    """
+    directory = os.environ.get("BENCHMARK_BASELINE")
+    if not directory:
+        return None
+    paths = glob(os.path.join(directory, f"{name}-*.json"))
+    if not paths:
+        LOG.warning(f"No {name} results in {directory}")
+        return None
+    with open(max(paths, key=os.path.getmtime)) as f:
+        return json.load(f)
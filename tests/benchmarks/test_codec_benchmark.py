@@ -0,0 +1,111 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import unittest
+
+from timeit import timeit
+
+from chatbot_core.utils.codec import B64Codec, JsonCodec, MessageView, \
+    MsgpackCodec
+from .reporting import write_results
+
+# Proctor message with the results of a completed prompt; see
+# tests/integration/v2/test_proctored_conversation.py
+PROCTOR_PAYLOAD = {
+    'nick': 'proctor-21ae7c5fa6e64cb8a1f7e4a36d0a4c4b',
+    'bot_type': 'proctor',
+    'service_name': 'proctor',
+    'cid': '6222367739332855a5cab2b6',
+    'dom': 'chatbotsforum.org',
+    'conversation_state': 3,
+    'responded_shout': None,
+    'shout': 'Voting on the response to "what is the size of Pacific Ocean?"',
+    'prompt_id': '8f292a9683de402a9d65438267e77578',
+    'time': '1650926421',
+    'omit_reply': False,
+    'no_save': False,
+    'context': {
+        'userID': 'a5a8963b9f924bec8d69',
+        'messageText': '@proctor @pard @wiz',
+        'messageID': '3628cdf9-53cd-4e35-f607-0aa534a55b4e',
+        'attachments': [],
+        'timeCreated': 1650926390,
+        'prompt': {'cid': '6222367739332855a5cab2b6',
+                   'userID': 'a5a8963b9f924bec8d69',
+                   'messageText': 'what is the size of Pacific Ocean?',
+                   'messageID': '7f61c539-bec2-4151-924a-65187cb56db7',
+                   'attachments': [],
+                   'timeCreated': 1650926421,
+                   'prompt_id': '8f292a9683de402a9d65438267e77578'},
+        'is_active': True,
+    },
+    'available_subminds': [f'submind{i}-a8fa6d5d1625421b8bd0d602cef0f639'
+                           for i in range(16)],
+    'participating_subminds': [f'submind{i}-a8fa6d5d1625421b8bd0d602cef0f639'
+                               for i in range(16)],
+    'proposed_responses': {
+        f'submind{i}-a8fa6d5d1625421b8bd0d602cef0f639':
+            f'Response number {i}: good conversation makes for good '
+            f'partners, don’t you think?' for i in range(16)},
+    'submind_opinions': {
+        f'submind{i}-a8fa6d5d1625421b8bd0d602cef0f639':
+            f"submind{(i + 1) % 16}'s proposal is most factual. Vote for "
+            f"submind{(i + 1) % 16}." for i in range(16)},
+    'votes': {f'submind{i}-a8fa6d5d1625421b8bd0d602cef0f639':
+              f'submind{(i + 1) % 16}-a8fa6d5d1625421b8bd0d602cef0f639'
+              for i in range(16)},
+}
+
+
+class CodecBenchmark(unittest.TestCase):
+    iterations = 2000
+
+    def test_codec_benchmark(self):
+        results = dict()
+        for codec in (B64Codec(), JsonCodec(), MsgpackCodec()):
+            encoded = codec.encode(PROCTOR_PAYLOAD)
+            self.assertEqual(codec.decode(encoded), PROCTOR_PAYLOAD)
+            encode_time = timeit(lambda: codec.encode(PROCTOR_PAYLOAD),
+                                 number=self.iterations)
+            decode_time = timeit(lambda: codec.decode(encoded),
+                                 number=self.iterations)
+            # Reading one field of a MessageView; only msgpack is projected
+            view_time = timeit(lambda: MessageView(encoded, codec)["cid"],
+                               number=self.iterations)
+            results[codec.name] = (len(encoded),
+                                   encode_time / self.iterations * 1E6,
+                                   decode_time / self.iterations * 1E6,
+                                   view_time / self.iterations * 1E6)
+        write_results("codec", {
+            "iterations": self.iterations,
+            "results": {name: {"bytes": size, "encode_us": encode_us,
+                               "decode_us": decode_us,
+                               "view_field_us": view_us}
+                        for name, (size, encode_us, decode_us, view_us)
+                        in results.items()}})
+
+        self.assertLess(results['msgpack'][0], results['b64'][0])
+        self.assertLess(results['msgpack'][2], results['b64'][2])
+        # Projection only pays off for msgpack; b64 and json views decode
+        # the whole message, so no speedup is asserted for them
+        self.assertLess(results['msgpack'][3], results['msgpack'][2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import random
+import unittest
+
+from timeit import timeit
+
+from chatbot_core.utils.edit_distance import bounded_damerau_levenshtein
+from chatbot_core.utils.similarity import SimilarityEngine
+from .reporting import write_results
+
+WORDS = ("the", "ocean", "pacific", "is", "about", "million", "square",
+         "miles", "large", "i", "think", "it", "covers", "of", "earth",
+         "surface", "a", "third", "deep", "water")
+
+
+def _sentence(rand: random.Random, num_words: int) -> str:
+    return " ".join(rand.choice(WORDS) for _ in range(num_words))
+
+
+class EditDistanceBenchmark(unittest.TestCase):
+    iterations = 3
+    option_counts = (8, 32, 128)
+    # Approximate option lengths in words
+    option_lengths = (5, 20, 60)
+
+    def test_closest_benchmark(self):
+        try:
+            from jellyfish import damerau_levenshtein_distance
+        except ImportError:
+            damerau_levenshtein_distance = None
+        rand = random.Random(42)
+        engine = SimilarityEngine()
+        results = list()
+        for num_words in self.option_lengths:
+            sentence = _sentence(rand, num_words)
+            for num_options in self.option_counts:
+                options = {str(i): _sentence(rand, rand.randint(
+                    num_words // 2, num_words * 2))
+                    for i in range(num_options)}
+                # One option is a near-perfect match
+                options["match"] = sentence[:-1]
+                expected = 1
+                result = {"num_options": len(options),
+                          "num_words": num_words}
+
+                def full():
+                    return min(bounded_damerau_levenshtein(o, sentence)
+                               for o in options.values())
+
+                def bounded():
+                    return engine.closest("damerau_levenshtein_distance",
+                                          sentence, options)
+
+                self.assertEqual(full(), expected)
+                self.assertEqual(bounded(), "match")
+                if damerau_levenshtein_distance:
+                    def baseline():
+                        return min(damerau_levenshtein_distance(o, sentence)
+                                   for o in options.values())
+                    self.assertEqual(baseline(), expected)
+                    candidates = [("jellyfish", baseline)]
+                else:
+                    candidates = [("python_full", full)]
+                candidates.append(("python_bounded", bounded))
+                for name, func in candidates:
+                    result[name] = timeit(func, number=self.iterations) / \
+                        self.iterations * 1E3
+                results.append(result)
+        write_results("edit_distance", {"unit": "ms", "results": results})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import unittest
+
+from timeit import timeit
+
+from chatbot_core.utils.similarity import SimilarityEngine
+from .reporting import write_results
+
+# Prompts with responses proposed by 8 subminds; some are about the prompt
+PROMPTS = {
+    "What is the size of the Pacific Ocean?": [
+        "The Pacific Ocean is about 63 million square miles.",
+        "I think the Pacific is the largest ocean on Earth.",
+        "Oceans cover most of the planet.",
+        "I like turtles.",
+        "The size of the Pacific Ocean is roughly a third of the surface.",
+        "Why do you ask?",
+        "Pacific ocean size: 165 million square kilometers",
+        "I don't know, what do you think?"],
+    "Who wrote Romeo and Juliet?": [
+        "Romeo and Juliet was written by William Shakespeare.",
+        "Shakespeare wrote it in the 1590s.",
+        "It is a tragedy about two young lovers.",
+        "I prefer comedies.",
+        "The author of Romeo and Juliet is Shakespeare.",
+        "Who is asking?",
+        "Juliet and Romeo is a play.",
+        "Let's talk about something else."],
+    "How do airplanes stay in the air?": [
+        "Airplanes stay in the air because their wings create lift.",
+        "Lift from the wings balances the weight of the plane.",
+        "Engines push the airplane forward.",
+        "I am afraid of flying.",
+        "Air flowing over the wings keeps airplanes up in the air.",
+        "Birds fly too.",
+        "Planes stay up thanks to aerodynamics.",
+        "That is a good question."],
+    "What is your favorite color?": [
+        "My favorite color is blue.",
+        "I like green the most.",
+        "Colors are how we see light.",
+        "Probably red, what is yours?",
+        "I do not have a favorite color.",
+        "The sky is blue.",
+        "Favorite? Purple, I think.",
+        "I can't see colors."],
+}
+
+
+class HashedNgramBenchmark(unittest.TestCase):
+    iterations = 50
+    algorithms = ("hashed_ngram_cosine", "bleu_score",
+                  "damerau_levenshtein_distance")
+
+    def test_hashed_ngram_benchmark(self):
+        engine = SimilarityEngine()
+        corpus = [(prompt, {f"submind_{i}": response
+                            for i, response in enumerate(responses)})
+                  for prompt, responses in PROMPTS.items()]
+
+        picks = dict()
+        latency = dict()
+        for algorithm in self.algorithms:
+            scores = [engine.score(algorithm, prompt, options)
+                      for prompt, options in corpus]
+            if any(score is None for score in scores):
+                # Algorithm dependencies are not installed
+                continue
+            picks[algorithm] = [max(score, key=score.get)
+                                for score in scores]
+            elapsed = timeit(lambda: [engine.score(algorithm, *prompt)
+                                      for prompt in corpus],
+                             number=self.iterations)
+            latency[algorithm] = elapsed / \
+                (self.iterations * len(corpus)) * 1E6
+        self.assertIn("hashed_ngram_cosine", picks)
+
+        hashed = picks["hashed_ngram_cosine"]
+        agreement = {algorithm: sum(a == b for a, b in zip(hashed, other)) /
+                     len(corpus) for algorithm, other in picks.items()
+                     if algorithm != "hashed_ngram_cosine"}
+        # Responses restating the prompt should be picked
+        for (prompt, options), pick in zip(corpus, hashed):
+            self.assertIn(pick, ("submind_0", "submind_4", "submind_6"),
+                          prompt)
+        write_results("hashed_ngram", {
+            "num_prompts": len(corpus),
+            "num_options": len(corpus[0][1]),
+            "score_latency_us": latency,
+            "agreement_with_hashed": agreement})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+import logging
+import os
+import tracemalloc
+import unittest
+
+from tempfile import TemporaryDirectory
+from threading import Timer
+from unittest.mock import patch
+
+from chatbot_core.utils.enum import ConversationControls
+from chatbot_core.v1 import ChatBot
+from .reporting import write_results
+
+SOAK_LOG = logging.getLogger("history_soak")
+
+
+class StubSocket:
+    """
+    Socket that answers the requests a v1 `ChatBot` makes of the Klat server
+    and discards shouts
+    """
+    connected = True
+
+    def __init__(self, nick: str, users: list):
+        self.nick = nick
+        self.users = users
+        self.handlers = dict()
+
+    def on(self, event: str, handler):
+        self.handlers[event] = handler
+
+    def emit(self, event: str, *args):
+        if event == "get conversation list 2":
+            self.handlers["nickname"](self.nick, [], {})
+        elif event == "get nicks for cid":
+            # Replies arrive after the bot starts waiting for them
+            Timer(0.001, self.handlers["new nick list"],
+                  (args[0], list(self.users))).start()
+
+    def disconnect(self):
+        pass
+
+
+class SoakBot(ChatBot):
+    @property
+    def log(self):
+        return SOAK_LOG
+
+    def ask_chatbot(self, user: str, shout: str, timestamp: str) -> str:
+        return f"{self.nick} says {shout}"
+
+    def ask_discusser(self, options: dict) -> str:
+        return "I like them all"
+
+    def ask_appraiser(self, options: dict) -> str:
+        return next(iter(options))
+
+    @staticmethod
+    def _hesitate_before_response(start_time, timeout: int = 5):
+        pass
+
+
+class HistorySoakBenchmark(unittest.TestCase):
+    num_prompts = 20000
+    # Spilling to disk is slower; it is checked over fewer prompts
+    num_archived_prompts = 10000
+    max_prompts = 200
+    subminds = [f"Submind{i}" for i in range(8)]
+    # Prompts alternate between the current conversation and one with an
+    # added context
+    cids = ["cid_current", "cid_other"]
+
+    def setUp(self):
+        # Log names are built from the call stack on every call, which would
+        # dominate the runtime of the soak without holding any memory
+        for target in ("chatbot_core.v1.LOG",
+                       "klat_connector.api.sio_klat_api.LOG"):
+            patcher = patch(target, SOAK_LOG)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _start_bot(self, archive_path=None) -> SoakBot:
+        users = ["Proctor", "Soak"] + self.subminds
+        history = {"max_prompts": self.max_prompts}
+        if archive_path:
+            history["archive"] = archive_path
+        config = {"chatbots": {"soak": {"history": history}}}
+        with patch("chatbot_core.chatbot_abc.Configuration",
+                   return_value=config):
+            bot = SoakBot(StubSocket("Soak", users), "dom", "soak", "")
+        bot._cid = self.cids[0]
+        bot._dom = "dom"
+        for cid in self.cids[1:]:
+            bot.add_conversation_context(cid, "dom", users)
+        return bot
+
+    def _run_prompt(self, bot: SoakBot, i: int):
+        cid = self.cids[i % len(self.cids)]
+        prompt = f"What is the answer to question number {i}?"
+
+        def shout(user, text):
+            bot.handle_shout(user, text, cid, "dom", "")
+
+        shout("Proctor", f'user{ConversationControls.RESP} "{prompt}" (5s)')
+        for nick in self.subminds:
+            shout(nick, f"{nick} says {i}")
+        shout("Proctor", f'{ConversationControls.VOTE}"{prompt}"')
+        for idx, nick in enumerate(self.subminds):
+            voted = self.subminds[(idx + 1) % len(self.subminds)]
+            shout(nick, f"I vote for {voted}")
+        shout("Proctor", f'{ConversationControls.PICK}"{prompt}"')
+        selected = self.subminds[i % len(self.subminds)]
+        shout("Proctor", f'The selected response is from {selected}: '
+                         f'"{selected} says {i}"')
+
+    def _soak(self, bot: SoakBot, num_prompts: int) -> list:
+        """
+        Run prompts through the prompt and vote handlers of a v1 bot and
+        return traced memory (KiB) at each checkpoint.
+        """
+        usage = list()
+        tracemalloc.start()
+        checkpoint = num_prompts // 10
+        for i in range(num_prompts):
+            self._run_prompt(bot, i)
+            if (i + 1) % checkpoint == 0:
+                usage.append(tracemalloc.get_traced_memory()[0] // 1024)
+        tracemalloc.stop()
+        for context in [bot._default_context,
+                        *bot.conversation_contexts.values()]:
+            self.assertEqual(len(context.proposed_responses),
+                             self.max_prompts)
+            self.assertEqual(len(context.id_to_prompt), self.max_prompts)
+        self.assertLessEqual(len(bot.request_history),
+                             self.max_prompts * 1.25)
+        bot.exit()
+        return usage
+
+    def test_history_soak(self):
+        results = {"memory": self._soak(self._start_bot(),
+                                        self.num_prompts)}
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.jsonl")
+            results["archive"] = self._soak(self._start_bot(path),
+                                            self.num_archived_prompts)
+            archive_kib = os.path.getsize(path) // 1024
+        write_results("history_soak", {
+            "unit": "KiB",
+            "num_prompts": self.num_prompts,
+            "num_archived_prompts": self.num_archived_prompts,
+            "max_prompts": self.max_prompts,
+            "conversations": len(self.cids),
+            "archive_kib": archive_kib,
+            "results": results})
+        for usage in results.values():
+            # Histories are full after the first checkpoint
+            self.assertLess(max(usage), usage[0] * 1.1)
+        self.assertGreater(archive_kib, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import time
+import unittest
+
+from uuid import uuid4
+
+from chatbot_core.utils.enum import ConversationState
+from chatbot_core.utils.local_mq import InMemoryBroker, get_in_memory_class
+from ..integration.v2.mocks import MockSubmind, MockProctor
+from .reporting import write_results
+
+
+class InMemoryConversationBenchmark(unittest.TestCase):
+    vhost = "/benchmark"
+    num_bots = 8
+    num_rounds = 5
+    # Rounds complete when a majority of subminds vote, as lost messages
+    # would otherwise stall every round until it times out
+    quorum = num_bots // 2 + 1
+
+    def _run_rounds(self, broker: InMemoryBroker, timeout: float) -> dict:
+        clazz = get_in_memory_class(MockSubmind, broker)
+        bots = [clazz(config={"MQ": {"server": "localhost"},
+                              "chatbots": {f"submind_{i}": {}}},
+                      service_name=f"submind_{i}", vhost=self.vhost,
+                      shout_thread_interval=0.01)
+                for i in range(self.num_bots)]
+        proctor = MockProctor(broker, self.vhost)
+        cid = uuid4().hex
+        for bot in bots:
+            bot.run(run_sync=False)
+            # Invitations are not subject to loss for this benchmark
+            bot.current_conversations[cid] = {}
+        completed = 0
+        responses = 0
+        votes = 0
+        round_times = list()
+        for _ in range(self.num_rounds):
+            start = time.monotonic()
+            prompt_id = uuid4().hex
+            proctor.send(cid, prompt_id, ConversationState.RESP, "Hello?")
+            proposed = {nick: shout["shout"] for nick, shout in
+                        proctor.collect(self.num_bots, prompt_id,
+                                        timeout).items()}
+            proctor.send(cid, prompt_id, ConversationState.VOTE, "Vote",
+                         proposed_responses=proposed)
+            round_votes = proctor.collect(self.num_bots, prompt_id, timeout)
+            round_times.append(time.monotonic() - start)
+            responses += len(proposed)
+            votes += len(round_votes)
+            if len(round_votes) >= self.quorum:
+                completed += 1
+        for bot in bots:
+            bot.shout_queue.put(None)
+            bot.stop()
+        proctor.stop()
+        expected = self.num_bots * self.num_rounds
+        return {"completed_rounds": completed,
+                "response_ratio": responses / expected,
+                "vote_ratio": votes / expected,
+                "mean_round_ms": sum(round_times) / len(round_times) * 1000,
+                "max_round_ms": max(round_times) * 1000,
+                **broker.stats}
+
+    def test_conversation_benchmark(self):
+        results = {
+            "baseline": self._run_rounds(InMemoryBroker(), 2),
+            "latency": self._run_rounds(InMemoryBroker(latency=0.005,
+                                                       jitter=0.005), 2),
+            "lossy": self._run_rounds(InMemoryBroker(loss=0.05, seed=1),
+                                      0.5),
+        }
+        write_results("mq_conversation", {"num_bots": self.num_bots,
+                                          "num_rounds": self.num_rounds,
+                                          "results": results})
+        for name in ("baseline", "latency"):
+            self.assertEqual(results[name]["completed_rounds"],
+                             self.num_rounds)
+            self.assertEqual(results[name]["vote_ratio"], 1)
+        self.assertEqual(results["lossy"]["completed_rounds"],
+                         self.num_rounds)
+        self.assertGreater(results["lossy"]["dropped"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
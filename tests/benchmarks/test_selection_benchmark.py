@@ -0,0 +1,196 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import random
+import tracemalloc
+import unittest
+
+from timeit import repeat
+from typing import Dict, List, Tuple
+
+from chatbot_core.utils.similarity import SimilarityEngine, get_algorithms
+from .reporting import load_baseline, write_results
+
+WORDS = ("i", "think", "the", "answer", "is", "about", "pacific", "ocean",
+         "million", "square", "miles", "that", "depends", "on", "who", "you",
+         "ask", "really", "good", "question", "probably", "not", "sure",
+         "water", "covers", "most", "of", "earth", "largest", "deep", "blue",
+         "maybe", "we", "should", "look", "it", "up", "my", "favorite", "is",
+         "color", "music", "weather", "today", "tomorrow", "yes", "no",
+         "shakespeare", "wrote", "plays", "airplanes", "fly", "wings", "lift")
+
+
+def _sentence(rand: random.Random, num_words: int) -> str:
+    words = [rand.choice(WORDS) for _ in range(num_words)]
+    return f"{' '.join(words).capitalize()}{rand.choice('.!?')}"
+
+
+def _paraphrase(rand: random.Random, sentence: str) -> str:
+    """
+    Change a few words and add a typo, as another submind might answer
+    """
+    words = sentence.rstrip(".!?").split()
+    for _ in range(max(1, len(words) // 5)):
+        words[rand.randrange(len(words))] = rand.choice(WORDS)
+    word = rand.randrange(len(words))
+    if len(words[word]) > 2:
+        chars = list(words[word])
+        i = rand.randrange(len(chars) - 1)
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        words[word] = "".join(chars)
+    return " ".join(words)
+
+
+def make_option_sets(num_options: int, num_sets: int, seed: int = 0) -> \
+        List[Tuple[str, Dict[str, str], str]]:
+    """
+    Generate synthetic option sets of chat length (4-30 words per response)
+    :param num_options: number of options per set
+    :param num_sets: number of sets
+    :param seed: random seed
+    :return: list of (sentence, options, ID of the option paraphrasing the
+        sentence)
+    """
+    rand = random.Random(seed * 100003 + num_options)
+    option_sets = list()
+    for _ in range(num_sets):
+        sentence = _sentence(rand, rand.randint(6, 20))
+        options = {f"submind_{i}": _sentence(rand, rand.randint(4, 30))
+                   for i in range(num_options)}
+        expected = rand.choice(list(options))
+        options[expected] = _paraphrase(rand, sentence)
+        option_sets.append((sentence, options, expected))
+    return option_sets
+
+
+def compare_results(baseline: dict, results: dict) -> List[dict]:
+    """
+    Compare benchmark results with the results of another version
+    :param baseline: previous results
+    :param results: current results
+    :return: per-case ratios of current to baseline latency and memory, and
+        changes in hit rate
+    """
+    previous = {(case["algorithm"], case["num_options"]): case
+                for case in baseline["results"]}
+    changes = list()
+    for case in results["results"]:
+        old = previous.get((case["algorithm"], case["num_options"]))
+        if not old:
+            continue
+        changes.append({
+            "algorithm": case["algorithm"],
+            "num_options": case["num_options"],
+            "latency_ratio": case["latency_ms"] / old["latency_ms"]
+            if old["latency_ms"] else None,
+            "peak_kib_ratio": case["peak_kib"] / old["peak_kib"]
+            if old["peak_kib"] else None,
+            "hit_rate_change": case["hit_rate"] - old["hit_rate"]})
+    return changes
+
+
+class SelectionBenchmark(unittest.TestCase):
+    option_counts = (2, 10, 100, 1000)
+    num_sets = 3
+    repeats = 3
+    reference = "bleu_score"
+
+    def _measure(self, algorithm: str, option_sets: list) -> \
+            Tuple[dict, List[str]]:
+        cold, warm, peaks, picks = list(), list(), list(), list()
+        for sentence, options, _ in option_sets:
+            # First call with empty caches, then repeated calls
+            engine = SimilarityEngine()
+            cold.append(repeat(lambda: picks.append(engine.closest(
+                algorithm, sentence, options)), number=1, repeat=1)[0])
+            warm.append(min(repeat(lambda: engine.closest(
+                algorithm, sentence, options), number=1,
+                repeat=self.repeats)))
+            # Memory is traced separately since tracing slows calls down
+            engine = SimilarityEngine()
+            tracemalloc.start()
+            engine.closest(algorithm, sentence, options)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+        hits = sum(pick == expected for pick, (_, _, expected)
+                   in zip(picks, option_sets))
+        return {"algorithm": algorithm,
+                "num_options": len(option_sets[0][1]),
+                "cold_ms": sum(cold) / len(cold) * 1E3,
+                "latency_ms": sum(warm) / len(warm) * 1E3,
+                "peak_kib": max(peaks),
+                "hit_rate": hits / len(option_sets)}, picks
+
+    def test_selection_benchmark(self):
+        engine = SimilarityEngine()
+        probe = make_option_sets(2, 1)[0]
+        algorithms = [a for a in get_algorithms()
+                      if engine.score(a, probe[0], probe[1]) is not None]
+        skipped = sorted(set(get_algorithms()) - set(algorithms))
+        self.assertIn("random", algorithms)
+
+        results = list()
+        for num_options in self.option_counts:
+            option_sets = make_option_sets(num_options, self.num_sets)
+            picks = dict()
+            for algorithm in algorithms:
+                result, picks[algorithm] = self._measure(algorithm,
+                                                         option_sets)
+                results.append(result)
+            reference = picks.get(self.reference)
+            for result in results[-len(algorithms):]:
+                result["agreement"] = None if reference is None else \
+                    sum(a == b for a, b in zip(picks[result["algorithm"]],
+                                               reference)) / self.num_sets
+        for result in results:
+            self.assertGreater(result["latency_ms"], 0)
+
+        report = {"reference": self.reference,
+                  "skipped": skipped,
+                  "results": results}
+        baseline = load_baseline("selection")
+        if baseline:
+            report["baseline_version"] = baseline.get("version")
+            report["changes"] = compare_results(baseline, report)
+        write_results("selection", report)
+
+
+class SelectionBenchmarkUtilTests(unittest.TestCase):
+    def test_make_option_sets(self):
+        option_sets = make_option_sets(10, 2)
+        self.assertEqual(len(option_sets), 2)
+        self.assertEqual(option_sets, make_option_sets(10, 2))
+        for sentence, options, expected in option_sets:
+            self.assertEqual(len(options), 10)
+            self.assertIn(expected, options)
+            self.assertNotEqual(options[expected], sentence)
+
+    def test_compare_results(self):
+        case = {"algorithm": "random", "num_options": 2, "latency_ms": 2.0,
+                "peak_kib": 4.0, "hit_rate": 0.5}
+        baseline = {"results": [dict(case, latency_ms=1.0)]}
+        results = {"results": [case, dict(case, num_options=10)]}
+        self.assertEqual(compare_results(baseline, results),
+                         [{"algorithm": "random", "num_options": 2,
+                           "latency_ratio": 2.0, "peak_kib_ratio": 1.0,
+                           "hit_rate_change": 0.0}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import re
+import unittest
+
+from timeit import timeit
+
+from chatbot_core.utils.enum import ConversationControls as Controls, \
+    ShoutType
+from chatbot_core.utils.shout_parser import NickIndex, parse_shout
+from .reporting import write_results
+
+NICK = "Wiz"
+FACILITATORS = ["proctor", "scorekeeper", "stenographer"]
+NICK_INDEX = NickIndex()
+
+# Shouts from one proctored round with 8 subminds, as seen by a submind
+SUBMINDS = ("Wiz", "Pard", "Ima", "Ned", "Eliza", "Alice", "Kbot", "Terry")
+CORPUS = [("Proctor", f"{', '.join(SUBMINDS)}{Controls.WAIT}")] + \
+    [(nick, Controls.NEXT) for nick in SUBMINDS] + \
+    [("Prompter", "!prompt: What is the size of the Pacific Ocean?"),
+     ("Proctor", f'Prompter{Controls.RESP} "What is the size of the '
+                 f'Pacific Ocean?" (30 seconds)')] + \
+    [(nick, f"I think it is about {i}0 million square miles.")
+     for i, nick in enumerate(SUBMINDS)] + \
+    [("Proctor", f"{Controls.DISC} the responses for 20 seconds")] + \
+    [(nick, f"{SUBMINDS[i - 1]}'s response is the most factual.")
+     for i, nick in enumerate(SUBMINDS)] + \
+    [("Proctor", f'{Controls.VOTE}"What is the size of the Pacific '
+                 f'Ocean?" (20 seconds)')] + \
+    [(nick, f"I vote for {SUBMINDS[i - 1]}")
+     for i, nick in enumerate(SUBMINDS)] + \
+    [("Proctor", f'{Controls.PICK}"What is the size of the Pacific Ocean?"'),
+     ("Proctor", 'The selected response is from Ima: "I think it is about '
+                 '20 million square miles."'),
+     ("Scorekeeper", "Selection history: Ima 1"),
+     ("user", "@Wiz what do you think?"),
+     ("user#2", "@Pard hello")]
+
+
+def legacy_classify(user: str, shout: str) -> ShoutType:
+    """
+    Classify a shout with the string checks `v1.ChatBot.handle_shout` made
+    before shouts were parsed once.
+    """
+    if shout.lower().startswith(f"@{NICK.lower()}"):
+        shout = shout.split(" ", 1)[1]
+    elif "proctor" not in user.lower() and user.lower() in FACILITATORS:
+        pass
+    if "#" in user:
+        user = user.split("#")[0]
+    if not shout.startswith("!PROMPT:") and \
+            shout.lower().startswith("!prompt:"):
+        shout = f"!PROMPT:{shout.split(':', 1)[1].strip()}"
+    if shout.endswith(Controls.WAIT) and "proctor" in user.lower():
+        NICK.lower() not in re.split("[, ]", shout.lower())
+        return ShoutType.WAIT
+    if shout.startswith(Controls.DISC) and "proctor" in user.lower():
+        return ShoutType.DISC
+    if shout.startswith(Controls.VOTE) and "proctor" in user.lower():
+        return ShoutType.VOTE
+    if shout.startswith(Controls.PICK) and "proctor" in user.lower():
+        return ShoutType.PICK
+    if Controls.HIST in shout.lower():
+        return ShoutType.HIST
+    if shout.startswith("!PROMPT:"):
+        return ShoutType.PROMPT
+    if "proctor" in user.lower() and Controls.RESP in shout:
+        return ShoutType.RESP
+    if shout == Controls.NEXT:
+        return ShoutType.NEXT
+    user.lower() not in ("neon", NICK.lower(), None)
+    return ShoutType.OTHER
+
+
+def parse_classify(user: str, shout: str) -> ShoutType:
+    parsed = parse_shout(user, shout, NICK, nick_index=NICK_INDEX)
+    if not parsed.mentioned and not parsed.from_proctor and \
+            parsed.user_lower in FACILITATORS:
+        pass
+    if parsed.shout_type == ShoutType.WAIT:
+        NICK.lower() not in parsed.get_named_nicks()
+    return parsed.shout_type
+
+
+class ShoutParserBenchmark(unittest.TestCase):
+    iterations = 2000
+
+    def test_shout_parser_benchmark(self):
+        for user, shout in CORPUS:
+            self.assertEqual(legacy_classify(user, shout),
+                             parse_classify(user, shout), shout)
+
+        results = dict()
+        for name, classify in (("legacy", legacy_classify),
+                               ("parser", parse_classify)):
+            elapsed = timeit(lambda: [classify(*s) for s in CORPUS],
+                             number=self.iterations)
+            results[name] = elapsed / (self.iterations * len(CORPUS)) * 1E6
+        write_results("shout_parser", {"unit": "us",
+                                       "num_shouts": len(CORPUS),
+                                       "results": results})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import os
+import unittest
+
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from chatbot_core.utils.conversation_utils import ConversationRegistry
+from chatbot_core.utils.state_store import InMemoryStateStore, \
+    SQLiteStateStore
+from .reporting import load_baseline, write_results
+
+
+class StateStoreBenchmark(unittest.TestCase):
+    iterations = 100000
+    num_cids = 1000
+
+    def _time_reads(self, store) -> float:
+        for i in range(self.num_cids):
+            store.set(f"cid_{i}", i % 6)
+        cids = [f"cid_{i}" for i in range(self.num_cids)] * \
+            (self.iterations // self.num_cids)
+        lookups = iter(cids)
+        return timeit(lambda: store.get(next(lookups)),
+                      number=len(cids)) / len(cids) * 1E6
+
+    def _time_registry_reads(self, store) -> float:
+        # `get_state` reads the in-memory record, never the store
+        registry = ConversationRegistry(store=store)
+        for i in range(self.num_cids):
+            registry.set_state(f"cid_{i}", i % 6)
+        cids = [f"cid_{i}" for i in range(self.num_cids)] * \
+            (self.iterations // self.num_cids)
+        lookups = iter(cids)
+        return timeit(lambda: registry.get_state(next(lookups)),
+                      number=len(cids)) / len(cids) * 1E6
+
+    def test_state_store_benchmark(self):
+        results = {"memory": self._time_reads(InMemoryStateStore())}
+        registry_reads = {
+            "memory": self._time_registry_reads(InMemoryStateStore())}
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.db")
+            for name, cache_ttl in (("sqlite_cached", 60),
+                                    ("sqlite_uncached", 0)):
+                store = SQLiteStateStore(path, name, cache_ttl, name)
+                results[name] = self._time_reads(store)
+                registry_reads[name] = self._time_registry_reads(store)
+                store.close()
+        speedup = results["sqlite_uncached"] / results["sqlite_cached"]
+        report = {"unit": "us", "results": results, "cache_speedup": speedup,
+                  "registry_reads": registry_reads}
+        baseline = load_baseline("state_store")
+        if baseline:
+            report["baseline_version"] = baseline.get("version")
+            report["changes"] = {
+                name: latency / baseline["results"][name]
+                for name, latency in results.items()
+                if baseline["results"].get(name)}
+        write_results("state_store", report)
+        # Absolute timings vary between runners; only compare within a run
+        self.assertGreater(speedup, 1)
+        self.assertLess(registry_reads["sqlite_uncached"],
+                        results["sqlite_uncached"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -107,7 +107,7 @@ class V2Bot(ChatBot):
         :param options: proposed responses (botname: response)
         """
         # save the options to choose from randomly in case there is no valid choice for Gruff
-        self.backup_options = copy.deepcopy(options)
+        self.backup_options = options
         if not self.appraised:      # There was no discussion before, so we have to set self.option_scores here
             self.option_scores = {}
             if len(self.grudge_against) == 0 or len(self.grudge_against) == len(options):
@@ -297,7 +297,7 @@ class V3Bot(ChatBot):
         :param options: proposed responses (botname: response)
         """
         # save the options to choose from randomly in case there is no valid choice for Gruff
-        self.backup_options = copy.deepcopy(options)
+        self.backup_options = options
         if not self.appraised:      # There was no discussion before, so we have to set self.option_scores here
             self.option_scores = {}
             if len(self.grudge_against) == 0 or len(self.grudge_against) == len(options):
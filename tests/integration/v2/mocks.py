@@ -20,13 +20,20 @@
 import json
 import re
 import time
+from queue import Queue, Empty
 from typing import Optional
+from uuid import uuid4
 
 import pika
 from ovos_utils.log import LOG
 from neon_mq_connector import MQConnector
+from neon_mq_connector.utils.network_utils import dict_to_b64
 from neon_utils.socket_utils import b64_to_dict
 
+from chatbot_core.utils.enum import ConversationState
+from chatbot_core.utils.local_mq import InMemoryBroker
+from chatbot_core.v2 import ChatBot
+
 
 class ChatBotObserverMock(MQConnector):
 
@@ -158,3 +165,65 @@ class ChatBotObserverMock(MQConnector):
             else:
                 self.connected_bots[new_nick] = dict_data
                 LOG.info(f'{new_nick} added to connected bots')
+
+
+class MockSubmind(ChatBot):
+    def ask_chatbot(self, user: str, shout: str, timestamp: str,
+                    context: dict = None) -> str:
+        return f"{self.service_name} response to: {shout}"
+
+    def ask_discusser(self, options: dict, context: dict = None) -> str:
+        return f"{self.service_name} likes {sorted(options)[0]}"
+
+    def ask_appraiser(self, options: dict, context: dict = None) -> str:
+        return sorted(nick for nick in options if nick != self.nick)[0]
+
+
+class MockProctor:
+    """Publishes proctor messages and collects submind shouts"""
+    nick = "proctor-mock"
+
+    def __init__(self, broker: InMemoryBroker, vhost: str):
+        self.broker = broker
+        self.vhost = vhost
+        self.shouts = Queue()
+        self.consumer = broker.consume(vhost, "proctor_mock_shout",
+                                       self._on_shout)
+        broker.bind_queue(vhost, "proctor_mock_shout", "shout")
+        self.consumer.start()
+
+    def _on_shout(self, channel, method, properties, body):
+        self.shouts.put(b64_to_dict(body))
+
+    def invite(self, nick: str, cid: str):
+        with self.broker.connection(self.vhost) as connection:
+            connection.channel().basic_publish(
+                exchange='', routing_key=f"{nick}_invite",
+                body=dict_to_b64({"cid": cid,
+                                  "announce_invitation": False}))
+
+    def send(self, cid: str, prompt_id: str, state: ConversationState,
+             shout: str, **kwargs):
+        with self.broker.connection(self.vhost) as connection:
+            connection.channel().basic_publish(
+                exchange='proctor_shout', routing_key='',
+                body=dict_to_b64({"nick": self.nick, "cid": cid,
+                                  "shout": shout,
+                                  "messageID": uuid4().hex,
+                                  "conversation_state": state.value,
+                                  "prompt_id": prompt_id, **kwargs}))
+
+    def collect(self, count: int, prompt_id: str, timeout: float = 10) -> dict:
+        responses = dict()
+        expire = time.time() + timeout
+        while len(responses) < count and time.time() < expire:
+            try:
+                shout = self.shouts.get(timeout=0.1)
+            except Empty:
+                continue
+            if shout.get("context", {}).get("prompt_id") == prompt_id:
+                responses[shout["nick"]] = shout
+        return responses
+
+    def stop(self):
+        self.consumer.join(1)
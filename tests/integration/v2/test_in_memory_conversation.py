@@ -0,0 +1,116 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Development System
+#
+# Copyright 2008-2025 Neongecko.com Inc. | All Rights Reserved
+#
+# Notice of License - Duplicating this Notice of License near the start of any file containing
+# a derivative of this software is a condition of license for this software.
+# Friendly Licensing:
+# No charge, open source royalty free use of the Neon AI software source and object is offered for
+# educational users, noncommercial enthusiasts, Public Benefit Corporations (and LLCs) and
+# Social Purpose Corporations (and LLCs). Developers can contact developers@neon.ai
+# For commercial licensing, distribution of derivative works or redistribution please contact licenses@neon.ai
+# Distributed on an "AS IS” basis without warranties or conditions of any kind, either express or implied.
+# Trademarks of Neongecko: Neon AI(TM), Neon Assist (TM), Neon Communicator(TM), Klat(TM)
+# Authors: Guy Daniels, Daniel McKnight, Regina Bloomstine, Elon Gasper, Richard Leeds
+#
+# Specialized conversational reconveyance options from Conversation Processing Intelligence Corp.
+# US Patents 2008-2021: US7424516, US20140161250, US20140177813, US8638908, US8068604, US8553852, US10530923, US10530924
+# China Patent: CN102017585  -  Europe Patent: EU2156652  -  Patents Pending
+
+import time
+import unittest
+
+from uuid import uuid4
+
+from neon_mq_connector.utils.network_utils import dict_to_b64
+
+from chatbot_core.utils.enum import ConversationState
+from chatbot_core.utils.local_mq import InMemoryBroker, get_in_memory_class
+from .mocks import MockSubmind, MockProctor
+
+
+class TestInMemoryProctoredConversation(unittest.TestCase):
+    vhost = "/test_chatbots"
+    cid = "test_cid"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.broker = InMemoryBroker()
+        clazz = get_in_memory_class(MockSubmind, cls.broker)
+        cls.bots = [clazz(config={"MQ": {"server": "localhost"},
+                                  "chatbots": {f"submind_{i}": {}}},
+                          service_name=f"submind_{i}", vhost=cls.vhost,
+                          shout_thread_interval=0.1)
+                    for i in range(3)]
+        for bot in cls.bots:
+            bot.run(run_sync=False)
+        cls.proctor = MockProctor(cls.broker, cls.vhost)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        for bot in cls.bots:
+            bot.shout_queue.put(None)
+            bot.stop()
+        cls.proctor.stop()
+
+    def test_proctored_conversation(self):
+        for bot in self.bots:
+            self.proctor.invite(bot.nick, self.cid)
+        timeout = time.time() + 5
+        while time.time() < timeout and \
+                not all(self.cid in bot.current_conversations
+                        for bot in self.bots):
+            time.sleep(0.1)
+        for bot in self.bots:
+            self.assertIn(self.cid, bot.current_conversations)
+
+        prompt_id = uuid4().hex
+        self.proctor.send(self.cid, prompt_id, ConversationState.RESP,
+                          "Is the Earth flat?")
+        responses = self.proctor.collect(len(self.bots), prompt_id)
+        self.assertEqual(set(responses), {bot.nick for bot in self.bots})
+        for bot in self.bots:
+            self.assertEqual(responses[bot.nick]["shout"],
+                             f"{bot.service_name} response to: "
+                             f"Is the Earth flat?")
+            self.assertEqual(bot.get_conversation_state(self.cid),
+                             ConversationState.RESP)
+        proposed = {nick: shout["shout"] for nick, shout in responses.items()}
+
+        self.proctor.send(self.cid, prompt_id, ConversationState.DISC,
+                          "Please discuss", proposed_responses=proposed)
+        discussion = self.proctor.collect(len(self.bots), prompt_id)
+        self.assertEqual(len(discussion), len(self.bots))
+
+        self.proctor.send(self.cid, prompt_id, ConversationState.VOTE,
+                          "Please vote", proposed_responses=proposed)
+        votes = self.proctor.collect(len(self.bots), prompt_id)
+        self.assertEqual(len(votes), len(self.bots))
+        for nick, vote in votes.items():
+            selected = vote["context"]["selected"]
+            self.assertIn(selected, proposed)
+            self.assertNotEqual(selected, nick)
+            self.assertEqual(vote["shout"], f"I vote for {selected}")
+        self.assertEqual(self.broker.stats["dropped"], 0)
+
+    def test_user_message_broadcast(self):
+        cid = "broadcast_cid"
+        for bot in self.bots:
+            bot.current_conversations[cid] = {}
+        with self.broker.connection(self.vhost) as connection:
+            connection.channel().basic_publish(
+                exchange='user_message', routing_key='',
+                body=dict_to_b64({"nick": "user", "cid": cid,
+                                  "shout": "Hello everyone",
+                                  "messageID": uuid4().hex,
+                                  "broadcast": True}))
+        responses = self.proctor.collect(len(self.bots), None)
+        self.assertEqual(set(responses), {bot.nick for bot in self.bots})
+        for bot in self.bots:
+            self.assertEqual(responses[bot.nick]["shout"],
+                             f"{bot.service_name} response to: "
+                             f"Hello everyone")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,7 +20,7 @@
 import unittest
 from logging import Logger
 
-from unittest.mock import patch
+from unittest.mock import patch, Mock, MagicMock, PropertyMock
 from ovos_utils.log import LOG
 
 from .mocks import MockMQ
@@ -53,6 +53,16 @@ class ChatBotV1Tests(unittest.TestCase):
         from chatbot_core.utils.enum import BotTypes
         self.assertEqual(bot_kwargs.bot_type, BotTypes.SUBMIND)
         self.assertTrue(bot_kwargs.shout_thread.is_alive())
+        self.assertEqual(bot_kwargs.request_history.maxlen, 1000)
+        self.assertEqual(bot_kwargs.proposed_responses.capacity, 1000)
+        self.assertEqual(list(bot_kwargs.participant_history), [set()])
+        self.assertIsNone(bot_kwargs.history_archive)
+        self.assertTrue(bot_kwargs.login_complete.is_set())
+        self.assertGreaterEqual(bot_kwargs.login_latency, 0)
+        self.assertIn("scorekeeper", bot_kwargs.facilitator_nicks)
+        bot_kwargs.facilitator_nicks.append("moderator")
+        self.assertTrue(bot_kwargs._nick_index.is_facilitator(
+            "moderator", bot_kwargs.facilitator_nicks))
 
         bot_kwargs.exit()
         self.assertEqual(bot_kwargs.shout_queue.qsize(), 0)
@@ -76,7 +86,302 @@ class ChatBotV1Tests(unittest.TestCase):
         self.assertEqual(bot_args.shout_queue.qsize(), 0)
         clean_up.assert_called_with(bot_args)
 
-    # TODO
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_handle_shout(self, _):
+        from chatbot_core.v1 import ChatBot
+        from chatbot_core.utils.enum import ConversationControls, \
+            ConversationState
+        from chatbot_core.utils.options import OptionsSnapshot
+
+        bot = ChatBot(self.socket, "test_domain", "test", "")
+        bot._nick = "Wiz"
+        bot._cid = "test_cid"
+        bot.send_shout = Mock()
+        bot._hesitate_before_response = Mock()
+        bot.ask_chatbot = Mock(return_value="Hi there")
+        bot.ask_appraiser = Mock(return_value="pard")
+        bot.on_vote = Mock()
+        bot.on_selection = Mock()
+        bot.on_ready_for_next = Mock()
+        users = PropertyMock(return_value=["Proctor", "Wiz", "Pard"])
+        with patch.object(ChatBot, "conversation_users", users), \
+                patch.object(ChatBot, "conversation_is_proctored",
+                             PropertyMock(return_value=True)):
+            def shout(user, text):
+                bot.handle_shout(user, text, "test_cid", "test_domain", "")
+
+            shout("Proctor", f"Wiz, Pard{ConversationControls.WAIT}")
+            self.assertEqual(bot.state, ConversationState.IDLE)
+            bot.send_shout.assert_called_with(ConversationControls.NEXT)
+            self.assertEqual(bot.participant_history[-1], {"wiz", "pard"})
+
+            shout("Proctor", f'user{ConversationControls.RESP} "Hello" (5s)')
+            self.assertEqual(bot.state, ConversationState.RESP)
+            self.assertEqual(bot.active_prompt, "Hello")
+            bot.ask_chatbot.assert_called_once_with("user", "Hello", "")
+            bot.send_shout.assert_called_with("Hi there")
+
+            shout("Pard", "Hey")
+            self.assertEqual(bot.proposed_responses["Hello"], {"pard": "Hey"})
+            # Proctor controls from other users are handled as responses
+            shout("Pard#2", ConversationControls.DISC)
+            self.assertEqual(bot.state, ConversationState.RESP)
+            self.assertEqual(bot.proposed_responses["Hello"]["pard"],
+                             ConversationControls.DISC)
+
+            shout("Proctor", f'{ConversationControls.VOTE}"Hello"')
+            self.assertEqual(bot.state, ConversationState.VOTE)
+            bot.send_shout.assert_called_with("I vote for pard")
+            options = bot.ask_appraiser.call_args[0][0]
+            self.assertIsInstance(options, OptionsSnapshot)
+            self.assertEqual(options, {"pard": ConversationControls.DISC})
+            shout("Pard", "I vote for Wiz")
+            bot.on_vote.assert_called_once_with(bot.prompt_id, "Wiz", "Pard")
+            # Users are indexed again only when membership changes
+            calls = users.call_count
+            shout("Ned", "I vote for pard")
+            bot.on_vote.assert_called_with(bot.prompt_id, "Pard", "Ned")
+            self.assertEqual(users.call_count, calls)
+            bot._users = ["Proctor", "Wiz", "Pard", "Ned"]
+            self.assertTrue(bot._context.nick_index.stale)
+            users.return_value = ["Proctor", "Wiz", "Pard", "Ned"]
+            shout("Pard", "I vote for Ned")
+            bot.on_vote.assert_called_with(bot.prompt_id, "Ned", "Pard")
+            self.assertEqual(users.call_count, calls + 1)
+
+            prompt_id = bot.prompt_id
+            self.assertEqual(bot.score_options("jaccard", "Hello", options),
+                             {"pard": 0.0})
+            self.assertIn(prompt_id, bot.similarity_cache)
+            shout("Proctor", f'{ConversationControls.PICK}"Hello"')
+            self.assertEqual(bot.state, ConversationState.PICK)
+            self.assertNotIn(prompt_id, bot.similarity_cache)
+            shout("Proctor", 'The selected response is from Pard: "Hey"')
+            bot.on_selection.assert_called_once_with("Hello", "Pard", "Hey")
+            self.assertEqual(bot.state, ConversationState.IDLE)
+            self.assertIsNone(bot.active_prompt)
+
+            shout("Pard", ConversationControls.NEXT)
+            bot.on_ready_for_next.assert_called_once_with("Pard")
+
+            # Sit out a round
+            shout("Proctor", f"Pard{ConversationControls.WAIT}")
+            self.assertEqual(bot.state, ConversationState.WAIT)
+            shout("Proctor", f'user{ConversationControls.RESP} "Hi" (5s)')
+            self.assertEqual(bot.state, ConversationState.WAIT)
+            bot.ask_chatbot.assert_called_once()
+        bot.exit()
+
+
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_history(self, _):
+        import json
+        from chatbot_core.v1 import ChatBot
+        from chatbot_core.utils.enum import ConversationControls
+
+        class ScorekeeperBot(ChatBot):
+            def ask_history(self, user, shout, dom, cid):
+                return json.dumps({
+                    "requests": self.request_history[::-1],
+                    "selected": self.selected_history + ["none"],
+                    "responses": {prompt: self.proposed_responses[prompt]
+                                  for prompt in self.proposed_responses}})
+
+        bot = ScorekeeperBot(self.socket, "test_domain", "test", "")
+        bot._nick = "Scorekeeper"
+        bot._cid = "test_cid"
+        bot.send_shout = Mock()
+        bot._hesitate_before_response = Mock()
+        bot.ask_chatbot = Mock(return_value="Hi there")
+        with patch.object(ChatBot, "conversation_is_proctored",
+                          PropertyMock(return_value=True)):
+            for prompt in ("Hello", "Goodbye"):
+                bot.handle_shout(
+                    "Proctor", f'user{ConversationControls.RESP} "{prompt}" '
+                               f'(5s)', "test_cid", "test_domain", "")
+                bot.state = bot.state.IDLE
+            bot.handle_shout("user", "Show me the history", "test_cid",
+                             "test_domain", "")
+        history = json.loads(bot.send_shout.call_args[0][0])
+        self.assertEqual(history["requests"], [["user", "Goodbye"],
+                                               ["user", "Hello"]])
+        self.assertEqual(history["selected"], ["none"])
+        self.assertEqual(list(history["responses"]), ["Hello", "Goodbye"])
+        self.assertEqual(list(bot.proposed_responses), ["Hello", "Goodbye"])
+        bot.exit()
+
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_login_failed(self, _):
+        from chatbot_core.v1 import ChatBot
+
+        bot = ChatBot(self.socket, "test_domain", "test", "")
+        self.assertFalse(bot.login_failed)
+        bot.login_complete.clear()
+        bot.login_latency = None
+        bot._login = 1
+        bot.handle_login_return(999)
+        self.assertTrue(bot.login_complete.is_set())
+        self.assertTrue(bot.login_failed)
+        self.assertIsNone(bot.login_latency)
+
+        bot._login = 2
+        bot.handle_login_return(0)
+        self.assertFalse(bot.login_failed)
+        self.assertGreaterEqual(bot.login_latency, 0)
+        bot.exit()
+
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_login_new_user(self, _):
+        from chatbot_core.v1 import ChatBot
+
+        bot = ChatBot(self.socket, "test_domain", "test", "")
+        bot.login_complete.clear()
+        bot.login_latency = None
+        bot.password = "pass"
+
+        # Registration still in flight
+        bot.register_klat = Mock()
+        bot._login = 1
+        bot.handle_login_return(888)
+        bot.register_klat.assert_called_once_with("test", "pass")
+        self.assertFalse(bot.login_complete.is_set())
+        self.assertFalse(bot.login_failed)
+        self.assertIsNone(bot.login_latency)
+
+        # Login returned after registration
+        bot._login = 2
+        bot.handle_login_return(0)
+        self.assertTrue(bot.login_complete.is_set())
+        self.assertFalse(bot.login_failed)
+        self.assertGreaterEqual(bot.login_latency, 0)
+
+        # Registration completed before returning
+        bot.login_complete.clear()
+        bot.login_latency = None
+
+        def register(*_):
+            bot._login = 2
+        bot.register_klat = Mock(side_effect=register)
+        bot.handle_login_return(888)
+        self.assertTrue(bot.login_complete.is_set())
+        self.assertFalse(bot.login_failed)
+        self.assertGreaterEqual(bot.login_latency, 0)
+        bot.exit()
+
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_shout_is_prompt(self, _):
+        from chatbot_core.v1 import ChatBot
+        from chatbot_core.utils.enum import BotTypes
+
+        class QuestionBot(ChatBot):
+            @staticmethod
+            def _shout_is_prompt(shout):
+                return shout.startswith("Q:")
+
+        bot = QuestionBot(self.socket, "test_domain", "test", "")
+        bot._nick = "Proctor"
+        bot._cid = "test_cid"
+        bot.bot_type = BotTypes.PROCTOR
+        bot.ask_proctor = Mock()
+        with patch.object(ChatBot, "conversation_is_proctored",
+                          PropertyMock(return_value=True)):
+            bot.handle_shout("user", "Q: hello?", "test_cid", "test_domain",
+                             "")
+            bot.ask_proctor.assert_called_once_with("Q: hello?", "user",
+                                                    "test_cid", "test_domain")
+        bot.exit()
+
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_user_is_proctor(self, _):
+        from chatbot_core.v1 import ChatBot
+        from chatbot_core.utils.enum import ConversationControls, \
+            ConversationState
+
+        class ModeratedBot(ChatBot):
+            @staticmethod
+            def _user_is_proctor(nick):
+                return nick.lower() == "moderator"
+
+        bot = ModeratedBot(self.socket, "test_domain", "test", "")
+        bot._cid = "test_cid"
+        bot.ask_discusser = Mock(return_value="")
+        with patch.object(ChatBot, "conversation_is_proctored",
+                          PropertyMock(return_value=True)):
+            bot.handle_shout("Proctor", f"{ConversationControls.DISC} now",
+                             "test_cid", "test_domain", "")
+            self.assertNotEqual(bot.state, ConversationState.DISC)
+            bot.handle_shout("Moderator#1", f"{ConversationControls.DISC} now",
+                             "test_cid", "test_domain", "")
+            self.assertEqual(bot.state, ConversationState.DISC)
+        bot.exit()
+
+    @patch("chatbot_core.utils.bot_utils.clean_up_bot")
+    def test_conversation_contexts(self, _):
+        from klat_connector.klat_api import KlatApi
+        from chatbot_core.v1 import ChatBot
+        from chatbot_core.utils.enum import ConversationControls, \
+            ConversationState
+
+        bot = ChatBot(self.socket, "test_domain", "test", "")
+        bot._nick = "Wiz"
+        bot._cid = "main_cid"
+        bot._hesitate_before_response = Mock()
+        bot.ask_chatbot = Mock(side_effect=lambda u, s, t: f"Re: {s}")
+        bot.on_vote = Mock()
+        bot.add_conversation_context("cid_2", "other_domain", ["Proctor", "Wiz"])
+        self.assertTrue(bot.is_handled_cid("cid_2"))
+        self.assertTrue(bot.is_handled_cid("main_cid"))
+        self.assertFalse(bot.is_handled_cid("cid_3"))
+
+        send_shout = Mock()
+        users = PropertyMock(return_value=["Proctor", "Wiz", "Pard"])
+        with patch.object(KlatApi, "send_shout", send_shout), \
+                patch.object(KlatApi, "conversation_users", users), \
+                patch.object(KlatApi, "conversation_is_proctored",
+                             PropertyMock(return_value=True)):
+            def shout(cid, user, text):
+                bot.handle_shout(user, text, cid, "", "")
+
+            shout("main_cid", "Proctor",
+                  f'user{ConversationControls.RESP} "Hello" (5s)')
+            send_shout.assert_called_with(bot, "Re: Hello", None, None)
+            shout("cid_2", "Proctor",
+                  f'user{ConversationControls.RESP} "Hi" (5s)')
+            send_shout.assert_called_with(bot, "Re: Hi", "cid_2",
+                                          "other_domain")
+            shout("cid_3", "Proctor",
+                  f'user{ConversationControls.RESP} "Bye" (5s)')
+            self.assertEqual(bot.ask_chatbot.call_count, 2)
+
+            # Each conversation has its own prompt state
+            self.assertEqual(bot.state, ConversationState.RESP)
+            self.assertEqual(bot.active_prompt, "Hello")
+            context = bot.conversation_contexts["cid_2"]
+            self.assertEqual(context.active_prompt, "Hi")
+            shout("cid_2", "Ned", "Hey")
+            self.assertEqual(context.proposed_responses, {"Hi": {"ned": "Hey"}})
+            self.assertEqual(bot.proposed_responses, {"Hello": {}})
+            self.assertEqual(context.users, ["Proctor", "Wiz", "Ned"])
+
+            shout("cid_2", "Proctor", f'{ConversationControls.VOTE}"Hi"')
+            self.assertEqual(context.state, ConversationState.VOTE)
+            self.assertEqual(bot.state, ConversationState.RESP)
+            shout("cid_2", "Ned", "I vote for wiz")
+            bot.on_vote.assert_called_once_with(context.prompt_id, "Wiz",
+                                                "Ned")
+
+            # Prompt ids are unique across conversations
+            self.assertTrue(context.prompt_id.startswith("cid_2:"))
+            self.assertTrue(bot.prompt_id.startswith("main_cid:"))
+            self.assertEqual(context.id_to_prompt, {context.prompt_id: "Hi"})
+            self.assertEqual(context.id_to_prompt.name, "cid_2:id_to_prompt")
+            bot.score_options("jaccard", "Hello", {"wiz": "Hi"})
+            shout("cid_2", "Proctor", f'{ConversationControls.PICK}"Hi"')
+            self.assertIn(bot.prompt_id, bot.similarity_cache)
+
+        bot.remove_conversation_context("cid_2")
+        self.assertFalse(bot.is_handled_cid("cid_2"))
+        bot.exit()
 
 
 class ChatBotV2Tests(unittest.TestCase):
@@ -107,6 +412,397 @@ class ChatBotV2Tests(unittest.TestCase):
         self.assertTrue(bot_args.shout_thread.is_alive())
         bot_args.shutdown()
         self.assertFalse(bot_args.shout_thread.is_alive())
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_options_snapshot(self):
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.enum import ConversationState
+        from chatbot_core.utils.options import OptionsSnapshot
+
+        bot = ChatBot({}, "test_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        bot.ask_discusser = Mock(return_value="Pard is right")
+        bot.ask_appraiser = Mock(return_value="pard")
+        options = {"pard": "Hello", "ned": "Hi"}
+        message = {"proposed_responses": options}
+        for state in (ConversationState.DISC, ConversationState.VOTE):
+            bot.get_chatbot_response("cid", message, "shout", "proctor",
+                                     True, state)
+        discussed = bot.ask_discusser.call_args[0][0]
+        appraised = bot.ask_appraiser.call_args[1]["options"]
+        for snapshot in (discussed, appraised):
+            self.assertIsInstance(snapshot, OptionsSnapshot)
+            self.assertEqual(snapshot, options)
+        with self.assertRaises(TypeError):
+            appraised["wiz"] = "Hey"
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_similarity_cache(self):
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.enum import ConversationState
+        from chatbot_core.utils.similarity import PromptSimilarityCache, \
+            SimilarityEngine
+
+        bot = ChatBot({}, "test_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        scored = list()
+
+        def ask(options, **_):
+            scored.append((bot._similarity_prompt_id,
+                           bot.score_options("jaccard", "Hello there",
+                                             options)))
+            return "pard"
+
+        bot.ask_discusser = bot.ask_appraiser = ask
+        engine = SimilarityEngine()
+        engine.score = Mock(wraps=engine.score)
+        bot.similarity_cache = PromptSimilarityCache(engine)
+        message = {"prompt_id": "prompt_1",
+                   "proposed_responses": {"pard": "Hello", "ned": "Hi"}}
+        for state in (ConversationState.DISC, ConversationState.VOTE):
+            bot.get_chatbot_response("cid", message, "shout", "proctor",
+                                     True, state)
+        self.assertEqual(scored[0], scored[1])
+        self.assertEqual(scored[0][0], "prompt_1")
+        engine.score.assert_called_once()
+        self.assertIsNone(bot._similarity_prompt_id)
+        self.assertIn("prompt_1", bot.similarity_cache)
+        bot.get_chatbot_response("cid", message, "shout", "proctor", True,
+                                 ConversationState.PICK)
+        self.assertNotIn("prompt_1", bot.similarity_cache)
+
+        # The prompt is reset if a response fails
+        bot.ask_discusser = Mock(side_effect=RuntimeError)
+        with self.assertRaises(RuntimeError):
+            bot.get_chatbot_response("cid", message, "shout", "proctor",
+                                     True, ConversationState.DISC)
+        self.assertIsNone(bot._similarity_prompt_id)
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_message_codec(self):
+        from pika import BasicProperties
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.codec import B64Codec, MsgpackCodec
+        bot = ChatBot({}, "codec_bot", "/test")
+        self.assertIsInstance(bot.message_codec, B64Codec)
+        bot.shutdown()
+
+        bot = ChatBot({"chatbots": {"codec_bot": {"message_codec": "msgpack"}}},
+                      "codec_bot", "/test")
+        bot.send_announcement = lambda *_, **__: None
+        self.assertIsInstance(bot.message_codec, MsgpackCodec)
+        codec = MsgpackCodec()
+        bot.handle_invite(None, None,
+                          BasicProperties(content_type=codec.content_type),
+                          codec.encode({"cid": "msgpack_cid",
+                                        "users": ["user"] * 100}))
+        self.assertIn("msgpack_cid", bot.current_conversations)
+        record = bot.current_conversations["msgpack_cid"]
+        self.assertEqual(record.data, {"users": ["user"] * 100})
+        self.assertEqual(record["users"], ["user"] * 100)
+        bot.invite_fields = ("title",)
+        bot.handle_invite(None, None, BasicProperties(),
+                          B64Codec().encode({"cid": "compact_cid",
+                                             "title": "Title",
+                                             "users": ["user"] * 100}))
+        self.assertEqual(bot.current_conversations["compact_cid"].data,
+                         {"title": "Title"})
+        bot.invite_fields = None
+        bot.handle_invite(None, None, BasicProperties(),
+                          B64Codec().encode({"cid": "b64_cid"}))
+        self.assertIn("b64_cid", bot.current_conversations)
+
+        bot._on_mentioned_user_message(
+            None, None, BasicProperties(content_type=codec.content_type),
+            codec.encode({"cid": "msgpack_cid", "nick": "user",
+                          "shout": "hello"}))
+        from chatbot_core.utils.codec import MessageView
+        message = bot.shout_queue.get(timeout=1)
+        self.assertIsInstance(message, MessageView)
+        bot.ask_chatbot = Mock(return_value="response")
+        bot.send_shout = Mock()
+        with patch.object(MsgpackCodec, "decode") as decode:
+            self.assertTrue(message)
+            bot.handle_shout(message)
+            decode.assert_not_called()
+        bot.ask_chatbot.assert_called_once()
+        self.assertEqual(bot.ask_chatbot.call_args.kwargs["shout"], "hello")
+        bot.send_shout.assert_called_once()
+        self.assertEqual(bot.send_shout.call_args.kwargs["shout"], "response")
+        bot.shutdown()
+
+        class DictBot(ChatBot):
+            def handle_shout(self, message_data: dict,
+                             skip_callback: bool = False):
+                message_data["handled"] = True
+
+        bot = DictBot({}, "dict_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        self.assertFalse(bot.lazy_message_data)
+        bot.current_conversations["msgpack_cid"] = {}
+        bot._on_mentioned_user_message(
+            None, None, BasicProperties(content_type=codec.content_type),
+            codec.encode({"cid": "msgpack_cid", "nick": "user",
+                          "shout": "hello"}))
+        message = bot.shout_queue.get(timeout=1)
+        self.assertIsInstance(message, dict)
+        self.assertEqual(message["shout"], "hello")
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_message_codec_negotiation(self):
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.codec import B64Codec, get_supported_codecs
+        bot = ChatBot({"chatbots": {"codec_bot": {"message_codec": "msgpack"}}},
+                      "codec_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        bot.create_mq_connection = MagicMock()
+        bot.send_message = send = Mock()
+        with patch("chatbot_core.v2.emit_encoded_message") as emit:
+            bot._send_state()
+            send.assert_called_once()
+            emit.assert_not_called()
+            context = send.call_args.kwargs["request_data"]["context"]
+            self.assertEqual(context["message_codecs"], get_supported_codecs())
+            self.assertIn("msgpack", context["message_codecs"])
+
+            # Peer did not advertise any codecs
+            bot.send_shout("direct", queue_name="peer-1_shout",
+                           broadcast=False)
+            self.assertEqual(send.call_count, 2)
+            emit.assert_not_called()
+
+            bot.handle_peer_connection(None, None, None, B64Codec().encode(
+                {"nick": "peer-1", "context": {"message_codecs": ["b64",
+                                                                  "msgpack"]}}))
+            bot.send_shout("direct", queue_name="peer-1_shout",
+                           broadcast=False)
+            emit.assert_called_once()
+            self.assertEqual(emit.call_args.kwargs["codec"], bot.message_codec)
+            self.assertEqual(emit.call_args.kwargs["queue"], "peer-1_shout")
+
+            # Fanouts and unknown queues are always default-encoded
+            bot.send_shout("fanout")
+            bot.send_shout("direct", queue_name="peer-1_user_message",
+                           broadcast=False)
+            self.assertEqual(send.call_count, 4)
+            emit.assert_called_once()
+
+            bot.handle_peer_disconnection(None, None, None, B64Codec().encode(
+                {"nick": "peer-1"}))
+            bot.send_shout("direct", queue_name="peer-1_shout",
+                           broadcast=False)
+            self.assertEqual(send.call_count, 5)
+            emit.assert_called_once()
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_fanout_codec_negotiation(self):
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.codec import B64Codec
+        bot = ChatBot({"chatbots": {"codec_bot": {"message_codec": "msgpack",
+                                                  "fanout_codec": True}}},
+                      "codec_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        bot.create_mq_connection = MagicMock()
+        bot.send_message = send = Mock()
+
+        def connect(nick, codecs):
+            context = {"message_codecs": codecs} if codecs else {}
+            bot.handle_peer_connection(None, None, None, B64Codec().encode(
+                {"nick": nick, "context": context}))
+
+        with patch("chatbot_core.v2.emit_encoded_message") as emit:
+            # No peers known to support the codec
+            bot.send_shout("fanout")
+            self.assertEqual(send.call_count, 1)
+            emit.assert_not_called()
+
+            connect("proctor-1", ["b64", "msgpack"])
+            connect("peer-1", ["b64", "msgpack"])
+            bot.send_shout("fanout")
+            emit.assert_called_once()
+            self.assertEqual(emit.call_args.kwargs["codec"], bot.message_codec)
+            self.assertEqual(emit.call_args.kwargs["exchange"], "shout")
+            bot.send_shout("prompt", exchange="proctor_shout")
+            self.assertEqual(emit.call_count, 2)
+
+            # State messages are always default-encoded
+            bot._send_state()
+            self.assertEqual(send.call_count, 2)
+            self.assertEqual(emit.call_count, 2)
+
+            # A peer that did not advertise codecs forces the default
+            connect("legacy-1", None)
+            bot.send_shout("fanout")
+            self.assertEqual(send.call_count, 3)
+            bot.handle_peer_disconnection(None, None, None, B64Codec().encode(
+                {"nick": "legacy-1"}))
+            bot.send_shout("fanout")
+            self.assertEqual(emit.call_count, 3)
+
+        # Fanouts are default-encoded unless `fanout_codec` is enabled
+        bot.fanout_codec = False
+        self.assertIsInstance(bot.get_codec_for_exchange("shout"), B64Codec)
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_duplicate_messages(self):
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.codec import B64Codec
+        from chatbot_core.utils.enum import ConversationState
+        bot = ChatBot({}, "dedup_bot", "/test")
+        bot.current_conversations["cid"] = {}
+        codec = B64Codec()
+        message = {"cid": "cid", "nick": "user", "shout": "hello",
+                   "messageID": "message_id"}
+        for _ in range(3):
+            bot._on_mentioned_user_message(None, None, None,
+                                           codec.encode(message))
+        self.assertEqual(bot.shout_queue.qsize(), 1)
+        self.assertEqual(bot.duplicate_count, 2)
+
+        prompt = {"cid": "cid", "nick": "proctor", "prompt_id": "prompt",
+                  "conversation_state": ConversationState.RESP.value}
+        bot._on_mentioned_user_message(None, None, None, codec.encode(prompt))
+        bot._on_mentioned_user_message(None, None, None, codec.encode(prompt))
+        prompt["conversation_state"] = ConversationState.VOTE.value
+        bot._on_mentioned_user_message(None, None, None, codec.encode(prompt))
+        self.assertEqual(bot.shout_queue.qsize(), 3)
+        self.assertEqual(bot.duplicate_count, 3)
+
+        # Proctor messages for each state may share the original messageID
+        prompt = {"cid": "cid", "nick": "proctor", "prompt_id": "prompt_2",
+                  "messageID": "user_message_id",
+                  "conversation_state": ConversationState.RESP.value}
+        bot._on_mentioned_user_message(None, None, None, codec.encode(prompt))
+        prompt["conversation_state"] = ConversationState.VOTE.value
+        bot._on_mentioned_user_message(None, None, None, codec.encode(prompt))
+        bot._on_mentioned_user_message(None, None, None, codec.encode(prompt))
+        self.assertEqual(bot.shout_queue.qsize(), 5)
+        self.assertEqual(bot.duplicate_count, 4)
+        bot.shutdown()
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_message_ttl(self):
+        import time
+        from chatbot_core.v2 import ChatBot, DEFAULT_MESSAGE_TTL
+        from chatbot_core.utils.codec import B64Codec
+        from chatbot_core.utils.enum import ConversationState
+        bot = ChatBot({"chatbots": {"ttl_bot": {
+            "message_ttl": {"default": 2000, "RESP": 30000, "vote": 10000,
+                            "invalid": 1},
+            "max_message_age": 60}}}, "ttl_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        self.assertEqual(bot.get_message_ttl(ConversationState.RESP), 30000)
+        self.assertEqual(bot.get_message_ttl(ConversationState.VOTE), 10000)
+        self.assertEqual(bot.get_message_ttl(ConversationState.DISC), 2000)
+        self.assertEqual(bot.get_message_ttl(None), 2000)
+
+        bot.send_message = Mock()
+        bot.set_conversation_state("cid", ConversationState.VOTE)
+        bot.send_shout("I vote for test", cid="cid")
+        self.assertEqual(bot.send_message.call_args.kwargs["expiration"],
+                         10000)
+        bot.send_announcement("announcement", "cid")
+        self.assertEqual(bot.send_message.call_args.kwargs["expiration"],
+                         10000)
+        bot.send_shout("response", cid="cid", expiration=500)
+        self.assertEqual(bot.send_message.call_args.kwargs["expiration"],
+                         500)
+        self.assertNotIn("expiration",
+                         bot.send_message.call_args.kwargs["request_data"])
+
+        default_bot = ChatBot({}, "default_bot", "/test")
+        self.addCleanup(default_bot.shutdown)
+        self.assertEqual(default_bot.get_message_ttl(ConversationState.RESP),
+                         DEFAULT_MESSAGE_TTL)
+
+        codec = B64Codec()
+        message = {"cid": "cid", "nick": "user", "shout": "hello"}
+        bot._on_mentioned_user_message(None, None, None, codec.encode(
+            {**message, "time": str(int(time.time()) - 120)}))
+        bot._on_mentioned_user_message(None, None, None, codec.encode(
+            {**message, "timeCreated": int(time.time()) - 120}))
+        bot._on_mentioned_user_message(None, None, None, codec.encode(
+            {**message, "timeCreated": int((time.time() - 120) * 1000)}))
+        self.assertTrue(bot.shout_queue.empty())
+        bot._on_mentioned_user_message(None, None, None, codec.encode(
+            {**message, "time": str(int(time.time()))}))
+        bot._on_mentioned_user_message(None, None, None, codec.encode(
+            {**message, "timeCreated": int(time.time() * 1000)}))
+        bot._on_mentioned_user_message(None, None, None, codec.encode(message))
+        log = Mock()
+        with patch.object(ChatBot, "log", new_callable=PropertyMock,
+                          return_value=log):
+            bot._on_mentioned_user_message(None, None, None, codec.encode(
+                {**message, "time": "yesterday"}))
+        log.warning.assert_called_once()
+        self.assertEqual(bot.shout_queue.qsize(), 4)
+
+    @patch("chatbot_core.v2.KlatAPIMQ", new=MockMQ)
+    def test_delta_sync(self):
+        from chatbot_core.v2 import ChatBot
+        from chatbot_core.utils.codec import B64Codec
+        from chatbot_core.utils.conversation_utils import \
+            ConversationSetTracker
+        full_bot = ChatBot({}, "full_bot", "/test")
+        self.addCleanup(full_bot.shutdown)
+        full_bot.send_message = Mock()
+        full_bot.current_conversations.add("cid_1")
+        full_bot._send_state()
+        context = full_bot.send_message.call_args.kwargs[
+            "request_data"]["context"]
+        self.assertEqual(context["cids"], ["cid_1"])
+
+        bot = ChatBot({"chatbots": {"delta_bot": {"sync_mode": "delta"}}},
+                      "delta_bot", "/test")
+        self.addCleanup(bot.shutdown)
+        bot.send_message = Mock()
+        bot.send_announcement = Mock()
+        bot.current_conversations.add("cid_1")
+        tracker = ConversationSetTracker()
+
+        def _last_context():
+            return bot.send_message.call_args.kwargs["request_data"]["context"]
+
+        bot._on_connect()
+        context = _last_context()
+        self.assertEqual(context["sync"], "snapshot")
+        self.assertEqual(context["cids"], ["cid_1"])
+        self.assertTrue(tracker.apply(context))
+
+        with patch.object(bot.current_conversations, "snapshot") as snap:
+            bot.sync()
+            snap.assert_not_called()
+        context = _last_context()
+        self.assertEqual(context["sync"], "heartbeat")
+        self.assertNotIn("cids", context)
+        self.assertEqual(context["cids_count"], 1)
+        self.assertTrue(tracker.apply(context))
+
+        codec = B64Codec()
+        bot.handle_invite(None, None, None, codec.encode({"cid": "cid_2"}))
+        context = _last_context()
+        self.assertEqual((context["sync"], context["cid"]), ("join", "cid_2"))
+        self.assertTrue(tracker.apply(context))
+        bot.handle_kick_out(None, None, None, codec.encode({"cid": "cid_1"}))
+        context = _last_context()
+        self.assertEqual((context["sync"], context["cid"]), ("leave", "cid_1"))
+        self.assertTrue(tracker.apply(context))
+        self.assertEqual(tracker.cids, {"cid_2"})
+        self.assertEqual(tracker.cids_hash, bot.current_conversations.cids_hash)
+
+        # Missed events are detected and resolved with a snapshot
+        bot.current_conversations.add("cid_3")
+        bot.current_conversations.add("cid_4")
+        self.assertFalse(tracker.apply(_last_context()))
+        calls = bot.send_message.call_count
+        bot.handle_sync_request(None, None, None, codec.encode(
+            {"nick": "observer", "cids_hash": tracker.cids_hash}))
+        self.assertEqual(bot.send_message.call_count, calls + 1)
+        self.assertTrue(tracker.apply(_last_context()))
+        self.assertEqual(tracker.cids, {"cid_2", "cid_3", "cid_4"})
+        bot.handle_sync_request(None, None, None, codec.encode(
+            {"nick": "observer", "cids_hash": tracker.cids_hash}))
+        self.assertEqual(bot.send_message.call_count, calls + 1)
     # TODO
 
 
@@ -135,6 +831,43 @@ class ParlaiTests(unittest.TestCase):
     from chatbot_core.parlai import ParlaiBot
     # TODO Implement tests or deprecate base class
 
+    def test_response_cache(self):
+        import os
+        from concurrent.futures import ThreadPoolExecutor
+        from tempfile import TemporaryDirectory
+        from threading import Lock
+        from chatbot_core.parlai import ParlaiBot
+
+        class TestParlaiBot(ParlaiBot):
+            def __init__(self, cache_path):
+                # Skip loading spacy and starting a ParlAI world
+                self._cache_config = {"path": cache_path,
+                                      "capacity": 10, "ttl": None}
+                self._cache_lock = Lock()
+                self._response_cache = None
+
+            def _construct_reply(self):
+                return dict()
+
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            bot = TestParlaiBot(path)
+            self.assertIsNone(bot._lookup_cache("hello"))
+            bot._update_cache("hello", "Hi there")
+            self.assertEqual(bot._lookup_cache("hello"), "Hi there")
+            self.assertEqual(bot.response_cache.namespace, "TestParlaiBot")
+            bot.shutdown()
+            self.assertIsNone(bot._response_cache)
+
+            # Concurrent first calls share one cache
+            restarted = TestParlaiBot(path)
+            with ThreadPoolExecutor(8) as executor:
+                caches = set(executor.map(
+                    lambda _: id(restarted.response_cache), range(8)))
+            self.assertEqual(len(caches), 1)
+            self.assertEqual(restarted._lookup_cache("hello"), "Hi there")
+            restarted.shutdown()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -90,6 +90,46 @@ class BotUtilsTests(unittest.TestCase):
         from chatbot_core.utils.bot_utils import run_local_discussion
         # TODO
 
+    def test_start_bots_parallel(self):
+        from threading import Barrier
+        from unittest.mock import Mock, patch
+        from chatbot_core.utils.bot_utils import start_bots_parallel
+        # Each constructor blocks until all have started
+        barrier = Barrier(3, timeout=5)
+
+        def login(name):
+            barrier.wait()
+            return Mock(login_latency=0.1, login_failed=False, nick=name)
+
+        def fail():
+            raise RuntimeError("login failed")
+
+        def guest():
+            return Mock(login_latency=None, login_failed=True, nick="guest")
+
+        errors = dict()
+        with patch("chatbot_core.utils.bot_utils.LOG") as log:
+            bots = start_bots_parallel({"c": lambda: login("c"),
+                                        "error": fail,
+                                        "a": lambda: login("a"),
+                                        "guest": guest,
+                                        "b": lambda: login("b")},
+                                       errors=errors)
+        self.assertEqual(list(bots.keys()), ["c", "a", "guest", "b"])
+        self.assertEqual(bots["a"].nick, "a")
+        self.assertEqual(list(errors.keys()), ["error"])
+        self.assertIsInstance(errors["error"], RuntimeError)
+        log.warning.assert_called_once_with("guest started but failed to "
+                                            "log in")
+        self.assertEqual(log.info.call_count, 3)
+        self.assertEqual(start_bots_parallel(dict()), dict())
+
+        # Without `errors`, a failure is raised once all bots have started
+        started = Mock()
+        with self.assertRaises(RuntimeError):
+            start_bots_parallel({"error": fail, "guest": started})
+        started.assert_called_once()
+
     @pytest.mark.timeout(30)
     def test_start_base_bot(self):
         from ..chatbot_objects import ChatBot
@@ -177,6 +217,461 @@ class CacheTests(unittest.TestCase):
                                  self.cache.cache)
 
 
+class LRUCacheTests(unittest.TestCase):
+    def test_lru_cache(self):
+        from chatbot_core.utils.cache import LRUCache
+        cache = LRUCache(capacity=3)
+        for i in range(3):
+            cache.put(str(i), i)
+        self.assertEqual(cache.get("0"), 0)
+        cache.put("3", 3)
+        self.assertNotIn("1", cache)
+        self.assertIn("0", cache)
+        self.assertEqual(list(cache.cache), ["2", "0", "3"])
+        cache.put("2", "two")
+        self.assertEqual(cache.get("2"), "two")
+        self.assertFalse(cache.add("2", 2))
+        self.assertTrue(cache.add("4", 4))
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get("1"))
+        self.assertEqual(cache.get("1", "default"), "default")
+        self.assertEqual(cache.pop("4"), 4)
+        self.assertIsNone(cache.pop("4"))
+
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.evictions),
+                         (2, 2, 2))
+        self.assertEqual(stats.hit_rate, 0.5)
+        self.assertEqual(stats.as_dict()["hit_rate"], 0.5)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats.hits, 2)
+        cache.reset_stats()
+        self.assertEqual(cache.stats.hit_rate, 0.0)
+
+    def test_ttl_cache(self):
+        from chatbot_core.utils.cache import TTLCache
+        cache = TTLCache(capacity=10, ttl=0.1)
+        cache.put("a", 1)
+        self.assertTrue(cache.add("b", 2))
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.15)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("a"))
+        cache.put("c", 3)
+        time.sleep(0.15)
+        self.assertTrue(cache.add("c", 4))
+        self.assertEqual(cache.get("c"), 4)
+        time.sleep(0.15)
+        self.assertEqual(cache.expire(), 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats.expirations, 4)
+
+    def test_striped_cache(self):
+        from threading import Thread
+        from chatbot_core.utils.cache import LRUCache
+        cache = LRUCache(capacity=800, stripes=4)
+
+        def worker(offset):
+            for i in range(1000):
+                key = offset + i % 50
+                if cache.get(key) is None:
+                    cache.put(key, i)
+
+        threads = [Thread(target=worker, args=(t * 100,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 400)
+        self.assertEqual(len(cache.cache), 400)
+        stats = cache.stats
+        self.assertEqual(stats.hits + stats.misses, 8000)
+        self.assertEqual(stats.misses, 400)
+        self.assertEqual(stats.evictions, 0)
+
+    def test_fifo_cache(self):
+        from chatbot_core.utils.cache import FIFOCache, LRUCache
+        cache = FIFOCache(capacity=2)
+        self.assertIsInstance(cache, LRUCache)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.put("a", "changed")
+        self.assertEqual(cache.get("a"), "1")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats.evictions, 1)
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_persistent_response_cache(self):
+        from tempfile import TemporaryDirectory
+        from chatbot_core.utils.response_cache import PersistentResponseCache
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "responses.db")
+            cache = PersistentResponseCache(path, "bot", capacity=3,
+                                            maintenance_interval=1,
+                                            touch_interval=0)
+            cache.put("hello", "Hi there")
+            self.assertEqual(cache.get("hello"), "Hi there")
+            self.assertIsNone(cache.get("missing"))
+            self.assertIn("hello", cache)
+            self.assertEqual(len(cache), 1)
+            # Failed responses are not cached
+            cache.put("failed", None)
+            self.assertNotIn("failed", cache)
+            self.assertEqual(len(cache), 1)
+
+            # Other processes and restarted bots read the same responses
+            reader = PersistentResponseCache(path, "bot")
+            self.addCleanup(reader.close)
+            other_bot = PersistentResponseCache(path, "other_bot")
+            self.addCleanup(other_bot.close)
+            self.assertEqual(reader.get("hello"), "Hi there")
+            self.assertIsNone(other_bot.get("hello"))
+            cache.put("hello", "Hello")
+            restarted = PersistentResponseCache(path, "bot")
+            self.assertEqual(restarted.get("hello"), "Hello")
+            restarted.close()
+
+            # Least recently used responses are evicted
+            for i in range(3):
+                time.sleep(0.01)
+                cache.put(str(i), str(i))
+                self.assertEqual(cache.get("hello"), "Hello")
+            self.assertEqual(len(cache), 3)
+            self.assertNotIn("0", cache)
+            self.assertIn("hello", cache)
+            self.assertEqual(cache.stats.evictions, 1)
+            self.assertEqual(cache.stats.misses, 1)
+            cache.clear()
+            self.assertEqual(len(cache), 0)
+            self.assertIsNone(cache.get("hello"))
+            self.assertEqual(reader.stats.hits, 1)
+            cache.close()
+
+    def test_persistent_response_cache_ttl(self):
+        from tempfile import TemporaryDirectory
+        from chatbot_core.utils.response_cache import PersistentResponseCache
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            cache = PersistentResponseCache(path, ttl=0.1)
+            self.addCleanup(cache.close)
+            cache.put("hello", "Hi there")
+            self.assertEqual(cache.get("hello"), "Hi there")
+            time.sleep(0.15)
+            self.assertIsNone(cache.get("hello"))
+            self.assertNotIn("hello", cache)
+            self.assertEqual(cache.evict(), 1)
+            self.assertEqual(cache.stats.expirations, 1)
+
+
+class DuplicateFilterTests(unittest.TestCase):
+    def test_check(self):
+        from chatbot_core.utils.cache import DuplicateFilter
+        dedup = DuplicateFilter(capacity=3, window=60)
+        self.assertFalse(dedup.check("a"))
+        self.assertTrue(dedup.check("a"))
+        self.assertIn("a", dedup)
+        self.assertEqual(dedup.duplicates, 1)
+        for key in ("b", "c", "d"):
+            self.assertFalse(dedup.check(key))
+        self.assertEqual(len(dedup), dedup.capacity)
+        self.assertNotIn("a", dedup)
+        self.assertFalse(dedup.check("a"))
+
+    def test_window(self):
+        from chatbot_core.utils.cache import DuplicateFilter
+        dedup = DuplicateFilter(window=0.1)
+        self.assertFalse(dedup.check(("cid", "prompt", "RESP")))
+        time.sleep(0.15)
+        self.assertNotIn(("cid", "prompt", "RESP"), dedup)
+        self.assertFalse(dedup.check(("cid", "prompt", "RESP")))
+        self.assertEqual(len(dedup), 1)
+        self.assertEqual(dedup.duplicates, 0)
+
+
+class CodecTests(unittest.TestCase):
+    message = {'cid': 'test_cid',
+               'nick': 'proctor-test',
+               'conversation_state': 3,
+               'shout': 'Voting on the response to "test prompt"',
+               'proposed_responses': {'pard': 'Good conversation.',
+                                      'wiz': 'I do not have information'},
+               'context': {}}
+
+    def test_codecs(self):
+        from chatbot_core.utils.codec import B64Codec, JsonCodec, \
+            MsgpackCodec, get_codec_for_content_type
+        for clazz in (B64Codec, JsonCodec, MsgpackCodec):
+            codec = clazz()
+            encoded = codec.encode(self.message)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(codec.decode(encoded), self.message)
+            self.assertIsInstance(
+                get_codec_for_content_type(codec.content_type), clazz)
+            # One instance is shared by messages with the same content type
+            self.assertIs(get_codec_for_content_type(codec.content_type),
+                          get_codec_for_content_type(codec.content_type))
+        self.assertLess(len(MsgpackCodec().encode(self.message)),
+                        len(B64Codec().encode(self.message)))
+        self.assertIsInstance(get_codec_for_content_type("text/plain"),
+                              B64Codec)
+
+    def test_get_codec(self):
+        from chatbot_core.utils.codec import get_codec, B64Codec, MsgpackCodec
+        self.assertIsInstance(get_codec(), B64Codec)
+        self.assertIsInstance(get_codec("msgpack"), MsgpackCodec)
+        self.assertIsInstance(get_codec("invalid"), B64Codec)
+
+    def test_decode_message(self):
+        from pika import BasicProperties
+        from chatbot_core.utils.codec import decode_message, MsgpackCodec
+        from neon_mq_connector.utils.network_utils import dict_to_b64
+        self.assertEqual(decode_message(self.message), self.message)
+        self.assertEqual(decode_message(dict_to_b64(self.message)),
+                         self.message)
+        self.assertEqual(decode_message(dict_to_b64(self.message),
+                                        BasicProperties()), self.message)
+        codec = MsgpackCodec()
+        self.assertEqual(decode_message(codec.encode(self.message),
+                                        BasicProperties(
+                                            content_type=codec.content_type)),
+                         self.message)
+        with self.assertRaises(TypeError):
+            decode_message(None)
+
+    def test_message_view(self):
+        from unittest.mock import patch
+        from chatbot_core.utils.codec import MessageView, MsgpackCodec, \
+            B64Codec
+        codec = MsgpackCodec()
+        raw = codec.encode(self.message)
+        view = MessageView(raw, codec)
+        self.assertEqual(view.raw, raw)
+        self.assertEqual(view.content_type, codec.content_type)
+        with patch.object(codec, "decode") as decode:
+            self.assertEqual(view['cid'], self.message['cid'])
+            self.assertEqual(view.get('proposed_responses'),
+                             self.message['proposed_responses'])
+            self.assertIsNone(view.get('messageID'))
+            self.assertNotIn('messageID', view)
+            self.assertIn('cid', repr(view))
+            decode.assert_not_called()
+        self.assertEqual(dict(view), self.message)
+        self.assertEqual(view.to_dict(), self.message)
+        self.assertEqual(len(view), len(self.message))
+
+        # Other codecs decode the whole message once, on first access
+        codec = B64Codec()
+        view = MessageView(codec.encode(self.message), codec)
+        with patch.object(codec, "decode",
+                          wraps=codec.decode) as decode:
+            self.assertTrue(view)
+            decode.assert_not_called()
+            self.assertEqual(view['shout'], self.message['shout'])
+            self.assertEqual(view['cid'], self.message['cid'])
+            decode.assert_called_once()
+        with self.assertRaises(KeyError):
+            _ = view['messageID']
+        with self.assertRaises(TypeError):
+            view['cid'] = 'new_cid'
+
+
+class InMemoryBrokerTests(unittest.TestCase):
+    vhost = "/test"
+
+    def _consume(self, broker, queue):
+        from queue import Queue
+        received = Queue()
+        consumer = broker.consume(self.vhost, queue,
+                                  lambda *args: received.put(args[3]))
+        consumer.start()
+        self.addCleanup(consumer.join)
+        return received
+
+    def test_routing(self):
+        from queue import Empty
+        from chatbot_core.utils.local_mq import InMemoryBroker
+        broker = InMemoryBroker()
+        channel = broker.connection(self.vhost).channel()
+        channel.exchange_declare("fanout", exchange_type="fanout")
+        channel.queue_bind("fanout_1", "fanout")
+        channel.queue_bind("fanout_2", "fanout")
+        channel.queue_declare("direct")
+        fanout_1 = self._consume(broker, "fanout_1")
+        fanout_2 = self._consume(broker, "fanout_2")
+        direct = self._consume(broker, "direct")
+
+        channel.basic_publish(exchange="fanout", routing_key="", body=b"all")
+        self.assertEqual(fanout_1.get(timeout=1), b"all")
+        self.assertEqual(fanout_2.get(timeout=1), b"all")
+        channel.basic_publish(exchange="", routing_key="direct", body=b"one")
+        self.assertEqual(direct.get(timeout=1), b"one")
+        with self.assertRaises(Empty):
+            fanout_1.get(timeout=0.2)
+
+        channel.basic_publish(exchange="", routing_key="missing", body=b"")
+        self.assertEqual(broker.stats["unroutable"], 1)
+        self.assertEqual(broker.stats["delivered"], 3)
+
+    def test_fault_injection(self):
+        from pika import BasicProperties
+        from chatbot_core.utils.local_mq import InMemoryBroker
+        broker = InMemoryBroker(loss=1.0)
+        broker.declare_queue(self.vhost, "lossy")
+        broker.publish(self.vhost, "", "lossy", b"dropped")
+        self.assertEqual(broker.stats["dropped"], 1)
+
+        broker = InMemoryBroker(latency=0.2)
+        broker.declare_queue(self.vhost, "slow")
+        broker.publish(self.vhost, "", "slow", b"expired",
+                       BasicProperties(expiration="100"))
+        broker.publish(self.vhost, "", "slow", b"delayed")
+        start = time.monotonic()
+        received = self._consume(broker, "slow")
+        self.assertEqual(received.get(timeout=1), b"delayed")
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        self.assertEqual(broker.stats["expired"], 1)
+
+        # Deliveries are ordered by delivery time, not publish order
+        broker = InMemoryBroker()
+        broker.declare_queue(self.vhost, "jitter")
+        broker.latency = 0.3
+        broker.publish(self.vhost, "", "jitter", b"slow")
+        broker.latency = 0.0
+        broker.publish(self.vhost, "", "jitter", b"fast")
+        received = self._consume(broker, "jitter")
+        start = time.monotonic()
+        self.assertEqual(received.get(timeout=1), b"fast")
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(received.get(timeout=1), b"slow")
+
+    def test_consumer_queues(self):
+        from neon_mq_connector import MQConnector
+        from chatbot_core.utils.local_mq import InMemoryBroker, \
+            get_in_memory_class
+        from unittest.mock import Mock
+        broker = InMemoryBroker()
+        clazz = get_in_memory_class(MQConnector, broker)
+        consumers = list()
+        for i in range(2):
+            connector = clazz({"server": "localhost"}, f"test_{i}")
+            connector.register_consumer("broadcast", self.vhost, "", Mock(),
+                                        exchange="fanout",
+                                        exchange_type="fanout")
+            connector.register_consumer("direct", self.vhost, "direct_queue",
+                                        Mock(), exchange="direct",
+                                        exchange_type="direct")
+            consumers.append(connector.consumers)
+        self.assertNotEqual(consumers[0]["broadcast"].queue,
+                            consumers[1]["broadcast"].queue)
+        self.assertEqual(consumers[0]["direct"].queue, "direct_queue")
+        self.assertEqual(broker._exchanges[(self.vhost, "direct")][0],
+                         "direct")
+        broker.publish(self.vhost, "direct", "other_queue", b"")
+        self.assertEqual(broker.stats["unroutable"], 1)
+        broker.publish(self.vhost, "fanout", "", b"")
+        self.assertEqual(broker.stats["unroutable"], 1)
+
+
+class StateStoreTests(unittest.TestCase):
+    def test_in_memory_state_store(self):
+        from chatbot_core.utils.state_store import InMemoryStateStore, \
+            get_state_store
+        store = get_state_store()
+        self.assertIsInstance(store, InMemoryStateStore)
+        self.assertIsNone(store.get("cid"))
+        self.assertEqual(store.get("cid", 0), 0)
+        store.set("cid", 2)
+        self.assertEqual(store.get("cid"), 2)
+        self.assertEqual(store.items(), {"cid": 2})
+        store.delete("cid")
+        self.assertEqual(store.items(), {})
+
+    def test_sqlite_state_store(self):
+        from tempfile import TemporaryDirectory
+        from chatbot_core.utils.state_store import SQLiteStateStore, \
+            get_state_store
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state", "state.db")
+            with self.assertRaises(ValueError):
+                get_state_store({"backend": "sqlite", "path": path}, "bot")
+            store = get_state_store({"backend": "sqlite", "path": path,
+                                     "cache_ttl": 0.1, "replica": "main"},
+                                    "bot")
+            self.addCleanup(store.close)
+            self.assertIsInstance(store, SQLiteStateStore)
+            replica = SQLiteStateStore(path, "bot", 0.1, "main")
+            self.addCleanup(replica.close)
+            other_bot = SQLiteStateStore(path, "other_bot", replica="main")
+            self.addCleanup(other_bot.close)
+
+            self.assertIsNone(replica.get("cid"))
+            store.set("cid", 1)
+            self.assertEqual(store.get("cid"), 1)
+            # A second handle on the same replica reads through its cache
+            self.assertIsNone(replica.get("cid"))
+            time.sleep(0.15)
+            self.assertEqual(replica.get("cid"), 1)
+            self.assertEqual(replica.items(), {"cid": 1})
+            self.assertEqual(other_bot.items(), {})
+
+            replica.delete("cid")
+            self.assertIsNone(replica.get("cid"))
+            time.sleep(0.15)
+            self.assertIsNone(store.get("cid"))
+
+            # States are kept until every replica leaves a conversation
+            first = SQLiteStateStore(path, "bot", 0.1, "first")
+            self.addCleanup(first.close)
+            second = SQLiteStateStore(path, "bot", 0.1, "second")
+            self.addCleanup(second.close)
+            first.set("shared", 1)
+            first.set("first_only", 2)
+            second.set("shared", 3)
+            self.assertEqual(first.items(), {"shared": 3, "first_only": 2})
+            self.assertEqual(second.items(), {"shared": 3})
+            first.delete("shared")
+            self.assertEqual(first.items(), {"first_only": 2})
+            self.assertEqual(second.get("shared"), 3)
+            self.assertEqual(first.get("shared"), 3)
+            second.delete("shared")
+            self.assertIsNone(second.get("shared"))
+
+            # Cached states are bounded
+            small = SQLiteStateStore(path, "bot", 60, "first", cache_size=2)
+            self.addCleanup(small.close)
+            for cid in ("a", "b", "c", "d"):
+                small.get(cid)
+            self.assertEqual(len(small._cache), 2)
+
+    def test_registry_state_store(self):
+        from unittest.mock import patch
+        from chatbot_core.utils.conversation_utils import ConversationRegistry
+        from chatbot_core.utils.enum import ConversationState
+        from chatbot_core.utils.state_store import InMemoryStateStore
+        store = InMemoryStateStore()
+        registry = ConversationRegistry(store=store)
+        registry.add("cid_1")
+        registry.set_state("cid_2", ConversationState.VOTE)
+        self.assertEqual(store.items(), {"cid_1": 0, "cid_2": 3})
+
+        restored = ConversationRegistry(store=store)
+        self.assertEqual(set(restored), {"cid_1", "cid_2"})
+        self.assertEqual(restored.get_state("cid_2"), ConversationState.VOTE)
+        # States are read from memory and written through to the store
+        store.set("cid_2", ConversationState.PICK)
+        with patch.object(store, "get") as get:
+            self.assertEqual(registry.get_state("cid_2"),
+                             ConversationState.VOTE)
+            get.assert_not_called()
+        registry.set_state("cid_2", ConversationState.IDLE)
+        self.assertEqual(store.get("cid_2"), ConversationState.IDLE)
+        registry.pop("cid_1")
+        self.assertEqual(store.items(), {"cid_2": 0})
+
+
 class TestConversationUtils(unittest.TestCase):
     def test_create_conversation_cycle(self):
         from chatbot_core.utils.conversation_utils import create_conversation_cycle
@@ -189,6 +684,83 @@ class TestConversationUtils(unittest.TestCase):
         self.assertEqual(next(convo), ConversationState.IDLE)
         self.assertEqual(next(convo), ConversationState.RESP)
 
+    def test_conversation_registry(self):
+        from unittest.mock import Mock
+        from chatbot_core.utils.conversation_utils import \
+            ConversationRegistry, ConversationRecord
+        from chatbot_core.utils.enum import ConversationState
+        on_evict = Mock()
+        registry = ConversationRegistry(capacity=2, on_evict=on_evict)
+        registry.add("cid_1", {"title": "first"})
+        registry["cid_2"] = {}
+        self.assertIn("cid_1", registry)
+        self.assertNotIn("cid_3", registry)
+        self.assertEqual(list(registry), ["cid_1", "cid_2"])
+        self.assertIsInstance(registry["cid_1"], ConversationRecord)
+        self.assertEqual(registry["cid_1"].get("title"), "first")
+        self.assertEqual(registry.get_state("cid_1"), ConversationState.IDLE)
+        self.assertIsNone(registry.get_state("cid_3"))
+        self.assertGreater(registry.memory_usage, 0)
+
+        # Least recently active conversation is evicted
+        self.assertTrue(registry.touch("cid_1"))
+        self.assertFalse(registry.touch("cid_3"))
+        registry.set_state("cid_3", ConversationState.RESP)
+        self.assertEqual(registry.get_state("cid_3"), ConversationState.RESP)
+        self.assertEqual(len(registry), 2)
+        self.assertNotIn("cid_2", registry)
+        on_evict.assert_called_once_with("cid_2")
+
+        self.assertIsInstance(registry.pop("cid_1"), ConversationRecord)
+        self.assertIsNone(registry.pop("cid_1"))
+        self.assertEqual(list(registry), ["cid_3"])
+
+    def test_conversation_registry_hash(self):
+        from unittest.mock import Mock
+        from chatbot_core.utils.conversation_utils import \
+            ConversationRegistry, get_cids_hash
+        from chatbot_core.utils.enum import ConversationState
+        on_change = Mock()
+        registry = ConversationRegistry(on_change=on_change)
+        empty_hash = registry.cids_hash
+        for cid in ("a", "b", "c"):
+            registry.add(cid)
+        registry.add("a")
+        self.assertEqual(registry.version, 3)
+        self.assertEqual(registry.cids_hash, get_cids_hash(["c", "b", "a"]))
+        registry.pop("b")
+        self.assertEqual(registry.cids_hash, get_cids_hash(["a", "c"]))
+        on_change.assert_called_with("leave", "b", 4, registry.cids_hash)
+        self.assertEqual(registry.snapshot(),
+                         (["c", "a"], 4, registry.cids_hash))
+        self.assertEqual(registry.summary(), (4, registry.cids_hash, 2))
+        registry.pop("a")
+        registry.pop("c")
+        self.assertEqual(registry.cids_hash, empty_hash)
+        self.assertEqual(on_change.call_count, 6)
+
+        # Conversations added by `set_state` are notified outside the lock
+        held = list()
+        registry.on_change = lambda *_: held.append(registry._lock._is_owned())
+        registry.set_state("d", ConversationState.RESP)
+        self.assertEqual(held, [False])
+
+    def test_conversation_registry_ttl(self):
+        from chatbot_core.utils.conversation_utils import ConversationRegistry
+        registry = ConversationRegistry(ttl=0.2)
+        registry.add("idle")
+        registry.add("active")
+        time.sleep(0.15)
+        self.assertTrue(registry.touch("active"))
+        time.sleep(0.1)
+        self.assertNotIn("idle", registry)
+        self.assertIn("active", registry)
+        self.assertEqual(registry.evict(), ["idle"])
+        self.assertEqual(list(registry), ["active"])
+        time.sleep(0.25)
+        self.assertFalse(registry.touch("active"))
+        self.assertEqual(len(registry), 0)
+
 
 class TestEnum(unittest.TestCase):
     def test_conversation_controls(self):
@@ -217,6 +789,543 @@ class TestEnum(unittest.TestCase):
             self.assertIsInstance(CONVERSATION_STATE_ANNOUNCEMENTS[state], str)
 
 
+class HistoryTests(unittest.TestCase):
+    def test_history_buffer(self):
+        import json
+        import pickle
+        from chatbot_core.utils.history import HistoryBuffer
+        history = HistoryBuffer([set()], maxlen=3)
+        for i in range(5):
+            history.append(("user", f"prompt {i}"))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[0], ("user", "prompt 2"))
+        self.assertEqual(history[-1], ("user", "prompt 4"))
+        self.assertEqual(history[-2:], [("user", "prompt 3"),
+                                        ("user", "prompt 4")])
+        self.assertEqual(history.count(("user", "prompt 4")), 1)
+        self.assertEqual(history, [("user", f"prompt {i}") for i in (2, 3, 4)])
+        self.assertNotEqual(history, [])
+        self.assertEqual(len(HistoryBuffer(range(10))), 10)
+
+        # Histories are used as lists
+        self.assertEqual(history[::-1], [("user", f"prompt {i}")
+                                         for i in (4, 3, 2)])
+        self.assertEqual(history[::2], [history[0], history[2]])
+        self.assertEqual(len(history + [("user", "prompt 5")]), 4)
+        self.assertEqual([("user", "prompt 1")] + history,
+                         [("user", f"prompt {i}") for i in range(1, 5)])
+        self.assertEqual(json.loads(json.dumps(history)),
+                         [["user", f"prompt {i}"] for i in (2, 3, 4)])
+        history += [("user", "prompt 5")]
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[-1], ("user", "prompt 5"))
+        restored = pickle.loads(pickle.dumps(history))
+        self.assertEqual(restored, history)
+        self.assertEqual(restored.maxlen, 3)
+        self.assertIsInstance(history, list)
+
+        # Full histories are trimmed in batches
+        history = HistoryBuffer(maxlen=8)
+        history.extend(range(10))
+        self.assertEqual(history, list(range(10)))
+        history.append(10)
+        self.assertEqual(history, list(range(3, 11)))
+
+    def test_lru_dict(self):
+        from chatbot_core.utils.history import LRUDict
+        responses = LRUDict(2)
+        responses["a"] = {}
+        responses["b"] = {}
+        responses["a"]["wiz"] = "Hi"
+        # Reads do not change the order of keys
+        self.assertEqual({key: responses[key] for key in responses},
+                         {"a": {"wiz": "Hi"}, "b": {}})
+        responses.touch("a")
+        responses["c"] = {}
+        self.assertEqual(responses, {"a": {"wiz": "Hi"}, "c": {}})
+        self.assertNotIn("b", responses)
+        self.assertIsInstance(responses, dict)
+
+    def test_history_archive(self):
+        from copy import deepcopy
+        from tempfile import TemporaryDirectory
+        from chatbot_core.utils.history import HistoryArchive, \
+            HistoryBuffer, LRUDict
+        with TemporaryDirectory() as tmp:
+            archive = HistoryArchive(os.path.join(tmp, "bot", "history.jsonl"))
+            participants = HistoryBuffer([set()], 2, "participants", archive)
+            prompts = LRUDict(1, "prompts", archive)
+            for i in range(3):
+                participants.append({f"bot_{i}"})
+                prompts[str(i)] = f"prompt {i}"
+            self.assertIs(deepcopy(prompts).archive, archive)
+            self.assertEqual(list(archive.read()),
+                             [("participants", []),
+                              ("prompts", ["0", "prompt 0"]),
+                              ("participants", ["bot_0"]),
+                              ("prompts", ["1", "prompt 1"])])
+            archive.close()
+            participants.append(set())
+            self.assertEqual(len(list(archive.read())), 4)
+
+
+class OptionsTests(unittest.TestCase):
+    def test_options_snapshot(self):
+        from copy import copy, deepcopy
+        from pickle import dumps, loads
+        from chatbot_core.utils.options import OptionsSnapshot
+        options = {"Wiz": "Hello", "Pard": "Hi", "Ned": "Prompt"}
+        snapshot = OptionsSnapshot(options)
+        self.assertIsInstance(snapshot, dict)
+        self.assertEqual(snapshot, options)
+        options["Ima"] = "Late response"
+        self.assertNotIn("Ima", snapshot)
+        self.assertEqual(OptionsSnapshot(), {})
+
+        for method, args in (("__setitem__", ("Ima", "Hey")),
+                             ("__delitem__", ("Wiz",)), ("clear", ()),
+                             ("pop", ("Wiz",)), ("popitem", ()),
+                             ("setdefault", ("Ima", "Hey")),
+                             ("update", ({"Ima": "Hey"},))):
+            with self.assertRaises(TypeError):
+                getattr(snapshot, method)(*args)
+        self.assertEqual(len(snapshot), 3)
+
+        self.assertIs(copy(snapshot), snapshot)
+        self.assertIs(deepcopy(snapshot), snapshot)
+        self.assertEqual(loads(dumps(snapshot)), snapshot)
+        reordered = OptionsSnapshot(dict(reversed(list(snapshot.items()))))
+        self.assertEqual(hash(snapshot), hash(reordered))
+        self.assertEqual(len({snapshot, reordered}), 1)
+
+        filtered = snapshot.filtered("WIZ", "Prompt")
+        self.assertEqual(filtered, {"pard": "Hi"})
+        self.assertIsInstance(filtered, OptionsSnapshot)
+        self.assertIs(snapshot.filtered("wiz", "Prompt"), filtered)
+
+    def test_options_snapshot_deduplicated(self):
+        from chatbot_core.utils.options import OptionsSnapshot
+        snapshot = OptionsSnapshot({
+            "Wiz": "The capital of France is Paris.",
+            "Pard": "I don't know",
+            "Ned": "the capital of france is paris",
+            "Ima": "The capital of France is Paris!"})
+        clusters = snapshot.clusters()
+        self.assertEqual(clusters, [["Wiz", "Ned", "Ima"], ["Pard"]])
+        self.assertIs(snapshot.clusters(), clusters)
+        deduplicated = snapshot.deduplicated()
+        self.assertIsInstance(deduplicated, OptionsSnapshot)
+        self.assertEqual(deduplicated, {"Wiz": snapshot["Wiz"],
+                                        "Pard": "I don't know"})
+        self.assertIs(snapshot.deduplicated(1.1), snapshot)
+
+
+class MinHashTests(unittest.TestCase):
+    def test_min_hasher(self):
+        from chatbot_core.utils.minhash import MinHasher, \
+            cluster_near_duplicates
+        hasher = MinHasher(num_perm=32, bands=8)
+        self.assertAlmostEqual(hasher.threshold, (1 / 8) ** 0.25)
+        signature = hasher.signature("Hello there")
+        self.assertEqual(len(signature), 32)
+        self.assertEqual(signature, MinHasher(num_perm=32, bands=8)
+                         .signature("hello there "))
+        self.assertEqual(hasher.similarity(signature, signature), 1.0)
+        self.assertLess(hasher.similarity(
+            signature, hasher.signature("Something else entirely")), 0.5)
+        with self.assertRaises(ValueError):
+            MinHasher(num_perm=30, bands=8)
+
+        unique = iter(["Cats are great", "I prefer tea over coffee",
+                       "Paris is in France", "Numbers go up to eleven",
+                       "What a lovely morning"])
+        options = {str(i): next(unique) if i % 2 else
+                   "Everyone agrees on this answer" for i in range(10)}
+        signatures = {key: hasher.signature(text)
+                      for key, text in options.items()}
+        pairs = list(hasher.candidates(signatures))
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertIn(("0", "2"), pairs)
+        clusters = hasher.cluster(options, threshold=0.9)
+        self.assertEqual(clusters[0], ["0", "2", "4", "6", "8"])
+        self.assertEqual(len(clusters), 6)
+        self.assertEqual(cluster_near_duplicates({}), [])
+        self.assertEqual(cluster_near_duplicates({"a": ""}), [["a"]])
+
+
+class ShoutParserTests(unittest.TestCase):
+    def test_normalize_nick(self):
+        from chatbot_core.utils.shout_parser import normalize_nick
+        self.assertEqual(normalize_nick("Proctor#2"),
+                         ("Proctor", "proctor", True))
+        self.assertEqual(normalize_nick("Wiz"), ("Wiz", "wiz", False))
+
+    def test_parse_shout(self):
+        from chatbot_core.utils.enum import ConversationControls, ShoutType
+        from chatbot_core.utils.shout_parser import NickIndex, parse_shout
+
+        proctor_shouts = {
+            f"wiz, pard{ConversationControls.WAIT}": ShoutType.WAIT,
+            f"{ConversationControls.DISC} for 20 seconds": ShoutType.DISC,
+            f'{ConversationControls.VOTE}"hello"': ShoutType.VOTE,
+            f'{ConversationControls.PICK}"hello"': ShoutType.PICK,
+            f'user{ConversationControls.RESP} "hello" (20 seconds)':
+                ShoutType.RESP,
+            "!PROMPT: hello": ShoutType.PROMPT,
+            "Tell me the History": ShoutType.HIST,
+            "Hello": ShoutType.OTHER,
+        }
+        for shout, shout_type in proctor_shouts.items():
+            parsed = parse_shout("Proctor", shout, "wiz")
+            self.assertEqual(parsed.shout_type, shout_type, shout)
+            self.assertTrue(parsed.from_proctor)
+            self.assertFalse(parsed.mentioned)
+
+        # Proctor controls are ignored from other users
+        parsed = parse_shout("Pard#1", f"{ConversationControls.DISC} now")
+        self.assertEqual(parsed.shout_type, ShoutType.OTHER)
+        self.assertEqual(parsed.user, "Pard")
+        self.assertFalse(parsed.from_proctor)
+        parsed = parse_shout("pard", ConversationControls.NEXT)
+        self.assertEqual(parsed.shout_type, ShoutType.NEXT)
+
+        # Mentions and prompt prefixes are normalized
+        parsed = parse_shout("user", "@Wiz !prompt: What time is it?", "wiz")
+        self.assertTrue(parsed.mentioned)
+        self.assertEqual(parsed.message, "!prompt: What time is it?")
+        self.assertEqual(parsed.shout, "!PROMPT:What time is it?")
+        self.assertEqual(parsed.lowered, "!prompt:what time is it?")
+        self.assertEqual(parsed.shout_type, ShoutType.PROMPT)
+        parsed = parse_shout("user", "@wiz", "wiz")
+        self.assertTrue(parsed.mentioned)
+        self.assertEqual(parsed.shout, "@wiz")
+        self.assertFalse(parse_shout("user", "@pard hi", "wiz").mentioned)
+        index = NickIndex()
+        self.assertTrue(parse_shout("user", "@Wiz hi", "Wiz",
+                                    nick_index=index).mentioned)
+        self.assertFalse(parse_shout("user", "@pard hi", "Wiz",
+                                     nick_index=index).mentioned)
+
+        # Prompt detection may be overridden
+        is_prompt = lambda text: text.startswith("Q:")
+        self.assertEqual(parse_shout("user", "Q: hello", "wiz",
+                                     is_prompt).shout_type, ShoutType.PROMPT)
+        self.assertEqual(parse_shout("user", "!PROMPT: hello", "wiz",
+                                     is_prompt).shout_type, ShoutType.OTHER)
+
+        # Proctor detection may be overridden
+        is_proctor = lambda nick: nick == "Moderator"
+        parsed = parse_shout("Moderator#1", f"{ConversationControls.DISC} now",
+                             is_proctor=is_proctor)
+        self.assertTrue(parsed.from_proctor)
+        self.assertEqual(parsed.shout_type, ShoutType.DISC)
+        self.assertFalse(parse_shout("Proctor", "hello",
+                                     is_proctor=is_proctor).from_proctor)
+
+        parsed = parse_shout("Proctor", f"Wiz,Pard {ConversationControls.WAIT}")
+        self.assertEqual(parsed.get_participants(), {"wiz", "pard"})
+        self.assertIn("pard", parsed.get_named_nicks())
+
+    def test_nick_index(self):
+        from chatbot_core.utils.shout_parser import NickIndex
+        index = NickIndex()
+        facilitators = ["Proctor", "Scorekeeper"]
+        self.assertTrue(index.is_facilitator("proctor", facilitators))
+        self.assertFalse(index.is_facilitator("wiz", facilitators))
+        facilitators.append("Wiz")
+        self.assertTrue(index.is_facilitator("wiz", facilitators))
+        facilitators[2] = "Pard"
+        self.assertFalse(index.is_facilitator("wiz", facilitators))
+
+        users = ["Proctor", "Wiz", "Pard", "wiz"]
+        self.assertTrue(index.stale)
+        self.assertTrue(index.update(users))
+        self.assertFalse(index.stale)
+        self.assertFalse(index.update(users))
+        self.assertEqual(len(index), 3)
+        self.assertIn("PARD", index)
+        self.assertEqual(index.find_nick("i vote for pard".split()), "Pard")
+        # Ties resolve to the user listed first in the conversation
+        self.assertEqual(index.find_nick(["pard", "wiz"]), "Wiz")
+        self.assertIsNone(index.find_nick(["abstain"]))
+
+        # Membership changes rebuild the index
+        users.append("Ned")
+        self.assertTrue(index.update(users))
+        self.assertEqual(index.find_nick(["ned"]), "Ned")
+        users[2] = "Nick"
+        self.assertTrue(index.update(users))
+        self.assertEqual(index.find_nick(["nick"]), "Nick")
+        self.assertIsNone(index.find_nick(["pard"]))
+        self.assertTrue(index.update(["Ned"]))
+        self.assertIsNone(index.find_nick(["pard"]))
+        self.assertTrue(index.update(None))
+        self.assertEqual(len(index), 0)
+
+        # Users who join are added without rebuilding the index
+        self.assertTrue(index.add("Pard"))
+        self.assertFalse(index.add("PARD"))
+        self.assertEqual(index.find_nick(["pard"]), "Pard")
+        self.assertTrue(index.add("Ned"))
+        self.assertEqual(index.find_nick(["ned", "pard"]), "Pard")
+        index.invalidate()
+        self.assertTrue(index.stale)
+
+        # Mentions are checked against the lowercase `@nick` prefix
+        self.assertTrue(index.is_mention("@wiz hello", "Wiz"))
+        self.assertFalse(index.is_mention("@pard hello", "Wiz"))
+        self.assertTrue(index.is_mention("@pard hello", "Pard"))
+
+
+class SimilarityTests(unittest.TestCase):
+    sentence = "This is a statement about testing your code."
+    options = {'1': "testing is good",
+               '2': "This is a statement about your code",
+               '3': "This is a statement about testing nothing"}
+
+    def test_tokenize(self):
+        from chatbot_core.utils.similarity import SimilarityEngine
+        engine = SimilarityEngine(cache_size=2)
+        tokens = engine.tokenize("Testing, your code!")
+        self.assertEqual(tokens[0], "testing")
+        self.assertIn("code", tokens)
+        self.assertIs(engine.tokenize("Testing, your code!"), tokens)
+        engine.tokenize("one")
+        engine.tokenize("two")
+        self.assertEqual(len(engine._tokens), 2)
+        self.assertIsNot(engine.tokenize("Testing, your code!"), tokens)
+        engine.clear_cache()
+        self.assertEqual(len(engine._tokens), 0)
+
+    def test_score(self):
+        from chatbot_core.utils.similarity import SimilarityEngine, \
+            get_algorithms
+        engine = SimilarityEngine()
+        for algorithm in ("random", "bleu_score",
+                          "damerau_levenshtein_distance", "jaccard"):
+            self.assertIn(algorithm, get_algorithms())
+            scores = engine.score(algorithm, self.sentence, self.options)
+            self.assertEqual(set(scores.keys()), set(self.options.keys()))
+        self.assertEqual(engine.closest("jaccard", self.sentence,
+                                        self.options), '2')
+        self.assertEqual(engine.closest("bleu_score", self.sentence,
+                                        self.options), '3')
+        self.assertIsNone(engine.score("invalid", self.sentence,
+                                       self.options))
+        self.assertIsNone(engine.closest("bleu_score", self.sentence,
+                                         {"1": " "}))
+
+    def test_bounded_damerau_levenshtein(self):
+        from chatbot_core.utils.edit_distance import \
+            bounded_damerau_levenshtein
+        self.assertEqual(bounded_damerau_levenshtein("", ""), 0)
+        self.assertEqual(bounded_damerau_levenshtein("abc", ""), 3)
+        self.assertEqual(bounded_damerau_levenshtein("kitten", "sitting"), 3)
+        self.assertEqual(bounded_damerau_levenshtein("teh", "the"), 1)
+        # Unrestricted transpositions, as in `jellyfish`
+        self.assertEqual(bounded_damerau_levenshtein("ca", "abc"), 2)
+        self.assertEqual(bounded_damerau_levenshtein("kitten", "sitting",
+                                                     3), 3)
+        self.assertIsNone(bounded_damerau_levenshtein("kitten", "sitting",
+                                                      2))
+        self.assertIsNone(bounded_damerau_levenshtein("a", "abcd", 2))
+        self.assertEqual(bounded_damerau_levenshtein("same", "same", 0), 0)
+        try:
+            from jellyfish import damerau_levenshtein_distance
+        except ImportError:
+            return
+        for first, second in ((self.sentence, option)
+                              for option in self.options.values()):
+            expected = damerau_levenshtein_distance(first, second)
+            self.assertEqual(bounded_damerau_levenshtein(first, second),
+                             expected)
+            self.assertEqual(bounded_damerau_levenshtein(first, second,
+                                                         expected), expected)
+            self.assertIsNone(bounded_damerau_levenshtein(first, second,
+                                                          expected - 1))
+
+    def test_closest_damerau_levenshtein(self):
+        from chatbot_core.utils.similarity import SimilarityEngine
+        engine = SimilarityEngine()
+        options = dict(self.options)
+        options['4'] = options['2']
+        scores = engine.score("damerau_levenshtein_distance", self.sentence,
+                              options)
+        self.assertEqual(len(scores), 4)
+        closest = max(scores.values())
+        self.assertIn(engine.closest("damerau_levenshtein_distance",
+                                     self.sentence, options),
+                      [o for o, score in scores.items() if score == closest])
+        self.assertEqual(engine.within_distance(self.sentence, options,
+                                                -closest),
+                         {o: -score for o, score in scores.items()
+                          if score == closest})
+        self.assertEqual(engine.within_distance(self.sentence, options, 100),
+                         {o: -score for o, score in scores.items()})
+        self.assertEqual(engine.within_distance(self.sentence, options, 0),
+                         {})
+
+    def test_tfidf_cosine(self):
+        from chatbot_core.utils.similarity import SimilarityEngine
+        from chatbot_core.utils.tfidf import TfidfVectorizer
+        engine = SimilarityEngine()
+        options = dict(self.options)
+        options['4'] = " "
+        scores = engine.score("tfidf_cosine", self.sentence, options)
+        self.assertEqual(set(scores.keys()), {'1', '2', '3'})
+        self.assertGreater(scores['2'], scores['1'])
+        self.assertTrue(all(0 <= score <= 1 for score in scores.values()))
+        self.assertEqual(engine.closest("tfidf_cosine", self.sentence,
+                                        self.options), '2')
+
+        vectorizer = TfidfVectorizer(max_documents=2)
+        self.assertEqual(vectorizer.partial_fit([("a", "b"), ("a",)]), 2)
+        self.assertEqual(vectorizer.partial_fit([("a",)]), 0)
+        self.assertEqual(vectorizer.documents, 2)
+        common, rare = vectorizer.idf()[[vectorizer.vocabulary["a"],
+                                         vectorizer.vocabulary["b"]]]
+        self.assertGreater(rare, common)
+        self.assertEqual(vectorizer.partial_fit([("c",)]), 1)
+        self.assertEqual(vectorizer.partial_fit([("a", "b")]), 1)
+        self.assertEqual(len(vectorizer.vocabulary), 3)
+        self.assertAlmostEqual(vectorizer.similarity(("a", "b"),
+                                                     [("b", "a")])[0], 1.0)
+        self.assertEqual(vectorizer.similarity(("a",), [("c",), ()]),
+                         [0.0, None])
+        self.assertEqual(vectorizer.similarity((), [("a",), ()]),
+                         [0.0, None])
+        # Scores match the dot products of transformed vectors
+        documents = [("b", "c", "c"), ("a", "d"), ("c", "a", "b")]
+        scores = vectorizer.similarity(("c", "a"), documents)
+        rows, columns, weights = vectorizer.transform([("c", "a"),
+                                                       *documents])
+        vectors = [{c: w for r, c, w in zip(rows, columns, weights)
+                    if r == row} for row in range(4)]
+        for vector, score in zip(vectors[1:], scores):
+            self.assertAlmostEqual(score, sum(
+                w * vectors[0].get(c, 0.0) for c, w in vector.items()))
+
+        # The least frequent terms are dropped once `max_features` is reached
+        vectorizer = TfidfVectorizer(max_features=4)
+        vectorizer.partial_fit([("a", "b"), ("a", "c"), ("a", "b", "d")])
+        vectorizer.partial_fit([("e",)])
+        self.assertEqual(set(vectorizer.vocabulary), {"a", "b", "c", "e"})
+        self.assertEqual(sorted(vectorizer.vocabulary.values()), [0, 1, 2, 3])
+        self.assertEqual(len(vectorizer.idf()), 4)
+        for term in "fghij":
+            score = vectorizer.similarity(("a", term), [(term, "b")])[0]
+            self.assertTrue(0 < score < 1)
+            self.assertIn(term, vectorizer.vocabulary)
+            self.assertLessEqual(len(vectorizer.vocabulary), 4)
+            self.assertEqual(len(vectorizer.idf()), len(vectorizer.vocabulary))
+
+    def test_hashed_ngram_cosine(self):
+        from chatbot_core.utils.similarity import SimilarityEngine
+        from chatbot_core.utils.hashing_vectorizer import HashingVectorizer
+        engine = SimilarityEngine()
+        scores = engine.score("hashed_ngram_cosine", self.sentence,
+                              self.options)
+        self.assertEqual(set(scores.keys()), set(self.options.keys()))
+        self.assertTrue(all(0 <= score <= 1 for score in scores.values()))
+        self.assertGreater(scores['2'], scores['1'])
+        self.assertIn(engine.closest("hashed_ngram_cosine", self.sentence,
+                                     self.options), ('2', '3'))
+        indices = engine.hashed_ngrams(self.sentence)
+        self.assertIs(engine.hashed_ngrams(self.sentence), indices)
+        self.assertTrue(all(0 <= i < engine.hashing.n_features
+                            for i in indices))
+
+        vectorizer = HashingVectorizer(n_features=16)
+        self.assertEqual(vectorizer.indices(["abc", "abc"])[0],
+                         HashingVectorizer(n_features=16).indices(["abc"])[0])
+        vectors = vectorizer.transform([(1, 1, 2), ()])
+        self.assertEqual(vectors.shape, (2, 16))
+        self.assertAlmostEqual(float((vectors[0] ** 2).sum()), 1.0)
+        self.assertEqual(float(vectors[1].sum()), 0.0)
+        self.assertEqual(vectorizer.similarity((3,), [(3, 3), (4,), ()]),
+                         [1.0, 0.0, None])
+
+    def test_prompt_similarity_cache(self):
+        from unittest.mock import Mock
+        from chatbot_core.utils.similarity import PromptSimilarityCache, \
+            SimilarityEngine
+        engine = SimilarityEngine()
+        engine.score = Mock(wraps=engine.score)
+        cache = PromptSimilarityCache(engine, max_prompts=2)
+        scores = cache.score("p1", "jaccard", self.sentence, self.options)
+        self.assertEqual(scores, SimilarityEngine().score(
+            "jaccard", self.sentence, self.options))
+        self.assertIn("p1", cache)
+
+        # Scores are reused for the same prompt, sentence and option texts
+        renamed = {"wiz": self.options['2'], "pard": self.options['3']}
+        self.assertEqual(cache.score("p1", "jaccard", self.sentence, renamed),
+                         {"wiz": scores['2'], "pard": scores['3']})
+        self.assertEqual(cache.closest("p1", "jaccard", self.sentence,
+                                       self.options), '2')
+        engine.score.assert_called_once()
+
+        # New options, sentences and algorithms are scored
+        cache.score("p1", "jaccard", self.sentence, {"4": "new option"})
+        self.assertEqual(engine.score.call_args[0][2], {"4": "new option"})
+        cache.score("p1", "jaccard", "other sentence", self.options)
+        cache.score("p1", "random", self.sentence, self.options)
+        self.assertEqual(engine.score.call_count, 4)
+        self.assertIsNone(cache.score("p1", "invalid", self.sentence,
+                                      self.options))
+        self.assertIsNone(cache.closest("p1", "bleu_score", self.sentence,
+                                        {"1": " "}))
+
+        cache.score("p2", "jaccard", self.sentence, self.options)
+        cache.score("p3", "jaccard", self.sentence, self.options)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("p1", cache)
+        cache.close("p2")
+        cache.close("p2")
+        self.assertEqual(len(cache), 1)
+
+    def test_pairwise_similarity(self):
+        from chatbot_core.utils.similarity_matrix import pairwise_similarity
+        options = dict(self.options)
+        options['4'] = "testing is good"
+        options['5'] = ""
+        for metric in ("cosine", "jaccard"):
+            for features in ("char", "token"):
+                matrix = pairwise_similarity(options, metric, features)
+                self.assertEqual(len(matrix), 5)
+                self.assertEqual(matrix.values.shape, (5, 5))
+                self.assertAlmostEqual(matrix['1', '4'], 1.0)
+                self.assertAlmostEqual(matrix['2', '3'], matrix['3', '2'])
+                self.assertGreater(matrix['2', '3'], matrix['1', '2'])
+                self.assertTrue(((matrix.values >= 0) &
+                                 (matrix.values <= 1)).all())
+        self.assertEqual(matrix.row('1')['4'], matrix['1', '4'])
+        self.assertAlmostEqual(matrix.distances[0, 3], 0.0)
+        totals = matrix.totals()
+        self.assertAlmostEqual(totals['1'], sum(matrix['1', o] for o in
+                                                options if o != '1'))
+        self.assertAlmostEqual(matrix.totals(['4'])['1'], 1.0)
+        self.assertEqual(matrix.totals(['4'])['4'], 0.0)
+        self.assertIn('5', matrix.to_dict())
+        with self.assertRaises(ValueError):
+            matrix.values[0, 0] = 0
+        with self.assertRaises(ValueError):
+            pairwise_similarity(options, "invalid")
+
+    def test_register_algorithm(self):
+        from chatbot_core.utils.similarity import SimilarityEngine, \
+            register_algorithm, get_algorithms, _algorithms
+
+        @register_algorithm("length")
+        def length(engine, sentence, options):
+            return [-abs(len(sentence) - len(option)) for option in options]
+
+        self.addCleanup(_algorithms.pop, "length")
+        self.assertIn("length", get_algorithms())
+        self.assertEqual(SimilarityEngine().closest(
+            "length", "four", {"a": "one", "b": "four", "c": "seven"}), "b")
+
+
 class LoggerTests(unittest.TestCase):
     def test_make_logger(self):
         from chatbot_core.utils.logger import make_logger